@@ -1,7 +1,9 @@
 """Technical indicators for DeepSeek AI trading strategy."""
 
+from .bar_buffer import OHLCVRingBuffer
 from .technical_manager import TechnicalIndicatorManager
 
 __all__ = [
+    "OHLCVRingBuffer",
     "TechnicalIndicatorManager",
 ]
@@ -0,0 +1,157 @@
+"""
+OHLCV Ring Buffer for Technical Indicator Manager
+
+Fixed-capacity, array-backed storage for recent bar data.
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+
+
+class OHLCVRingBuffer:
+    """
+    Fixed-capacity ring buffer of OHLCV bar data.
+
+    Prices and volume are stored in preallocated float64 columns and the
+    bar timestamp in an int64 column. Every value is written twice (slot
+    ``i`` and slot ``i + capacity``), so the most recent ``n`` values of a
+    column are always one contiguous slice and can be returned as a NumPy
+    view without copying or building lists.
+    """
+
+    FIELDS = ("open", "high", "low", "close", "volume")
+
+    def __init__(self, capacity: int):
+        """
+        Initialize ring buffer.
+
+        Parameters
+        ----------
+        capacity : int
+            Maximum number of bars retained
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+
+        self.capacity = capacity
+        self._columns = {
+            field: np.zeros(2 * capacity, dtype=np.float64) for field in self.FIELDS
+        }
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._head = 0  # Slot of the next write
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(
+        self,
+        ts: int,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+    ):
+        """Append one bar, overwriting the oldest once capacity is reached."""
+        i = self._head
+        j = i + self.capacity
+        for field, value in zip(self.FIELDS, (open, high, low, close, volume)):
+            column = self._columns[field]
+            column[i] = value
+            column[j] = value
+        self._ts[i] = ts
+        self._ts[j] = ts
+
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def append_bar(self, bar: Any):
+        """Append a NautilusTrader ``Bar`` (or any object with OHLCV attributes)."""
+        self.append(
+            int(bar.ts_init),
+            float(bar.open),
+            float(bar.high),
+            float(bar.low),
+            float(bar.close),
+            float(bar.volume),
+        )
+
+    def extend(
+        self,
+        ts: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ):
+        """Append many bars at once (arrays oldest first), vectorized."""
+        n = len(close)
+        if n == 0:
+            return
+
+        k = min(n, self.capacity)
+        slots = (self._head + (n - k) + np.arange(k)) % self.capacity
+        for field, values in zip(self.FIELDS, (open, high, low, close, volume)):
+            column = self._columns[field]
+            tail = np.asarray(values, dtype=np.float64)[-k:]
+            column[slots] = tail
+            column[slots + self.capacity] = tail
+        tail_ts = np.asarray(ts, dtype=np.int64)[-k:]
+        self._ts[slots] = tail_ts
+        self._ts[slots + self.capacity] = tail_ts
+
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self.capacity, self._count + n)
+
+    def _slice(self, n: int) -> slice:
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    def window(self, field: str, n: Optional[int] = None) -> np.ndarray:
+        """
+        Get the most recent ``n`` values of a column (oldest first).
+
+        Parameters
+        ----------
+        field : str
+            One of ``open``, ``high``, ``low``, ``close``, ``volume`` or ``ts``
+        n : int, optional
+            Number of values (default: all stored bars)
+
+        Returns
+        -------
+        np.ndarray
+            Read-only view into the buffer; valid until the next ``append``
+        """
+        n = self._count if n is None else min(n, self._count)
+        column = self._ts if field == "ts" else self._columns[field]
+        view = column[self._slice(n)]
+        view.flags.writeable = False
+        return view
+
+    def latest(self, field: str, offset: int = 0) -> float:
+        """
+        Get a single value counted back from the newest bar.
+
+        Parameters
+        ----------
+        field : str
+            Column name (see ``window``)
+        offset : int
+            0 for the newest bar, 1 for the one before, ...
+        """
+        if offset >= self._count:
+            raise IndexError(f"offset {offset} out of range for {self._count} bars")
+        idx = self._head + self.capacity - 1 - offset
+        if field == "ts":
+            return int(self._ts[idx])
+        return float(self._columns[field][idx])
+
+    def clear(self):
+        """Drop all stored bars."""
+        self._head = 0
+        self._count = 0
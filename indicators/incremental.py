@@ -0,0 +1,175 @@
+"""
+Seedable Incremental Indicators for Technical Indicator Manager
+
+Pure-Python indicators with the same update semantics as NautilusTrader's
+built-in SMA/EMA/RSI/MACD (``update_raw``/``value``/``initialized``), plus a
+``seed`` method so their state can be set from a vectorized warm-up.
+NautilusTrader's Cython indicators expose read-only state and cannot be
+seeded, which is why the manager uses these instead.
+"""
+
+from collections import deque
+from typing import Sequence
+
+
+class SimpleMovingAverage:
+    """Simple moving average over the last ``period`` inputs."""
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError(f"period must be positive, got {period}")
+        self.period = period
+        self._inputs: deque = deque(maxlen=period)
+        self.count = 0
+        self.value = 0.0
+
+    @property
+    def initialized(self) -> bool:
+        return self.count >= self.period
+
+    def update_raw(self, value: float):
+        self._inputs.append(value)
+        self.count += 1
+        self.value = sum(self._inputs) / len(self._inputs)
+
+    def seed(self, window: Sequence[float], count: int):
+        """
+        Set state from the trailing input window.
+
+        Parameters
+        ----------
+        window : Sequence[float]
+            Last ``min(count, period)`` inputs, oldest first
+        count : int
+            Total number of inputs the window was taken from
+        """
+        self._inputs = deque((float(x) for x in window[-self.period:]), maxlen=self.period)
+        self.count = count
+        self.value = sum(self._inputs) / len(self._inputs) if self._inputs else 0.0
+
+    def reset(self):
+        self._inputs.clear()
+        self.count = 0
+        self.value = 0.0
+
+
+class ExponentialMovingAverage:
+    """Exponential moving average with ``alpha = 2 / (period + 1)``."""
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError(f"period must be positive, got {period}")
+        self.period = period
+        self.alpha = 2.0 / (period + 1.0)
+        self.count = 0
+        self.value = 0.0
+
+    @property
+    def initialized(self) -> bool:
+        return self.count >= self.period
+
+    def update_raw(self, value: float):
+        if self.count == 0:
+            self.value = value
+        else:
+            self.value = self.alpha * value + (1.0 - self.alpha) * self.value
+        self.count += 1
+
+    def seed(self, value: float, count: int):
+        """Set the current average and the number of inputs it represents."""
+        self.value = float(value)
+        self.count = count
+
+    def reset(self):
+        self.count = 0
+        self.value = 0.0
+
+
+class RelativeStrengthIndex:
+    """
+    Relative strength index using exponential average gain/loss.
+
+    Values are in the 0-1 range, matching NautilusTrader's RSI.
+    """
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError(f"period must be positive, got {period}")
+        self.period = period
+        self.average_gain = ExponentialMovingAverage(period)
+        self.average_loss = ExponentialMovingAverage(period)
+        self.last_value = 0.0
+        self.value = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.average_gain.count
+
+    @property
+    def initialized(self) -> bool:
+        return self.average_gain.initialized and self.average_loss.initialized
+
+    def update_raw(self, value: float):
+        if self.average_gain.count == 0:
+            self.last_value = value
+
+        change = value - self.last_value
+        self.average_gain.update_raw(change if change > 0 else 0.0)
+        self.average_loss.update_raw(-change if change < 0 else 0.0)
+        self.last_value = value
+        self._refresh()
+
+    def seed(self, average_gain: float, average_loss: float, last_value: float, count: int):
+        """Set average gain/loss, the last input and the number of inputs."""
+        self.average_gain.seed(average_gain, count)
+        self.average_loss.seed(average_loss, count)
+        self.last_value = float(last_value)
+        self._refresh()
+
+    def _refresh(self):
+        if self.average_loss.value == 0:
+            self.value = 1.0
+        else:
+            rs = self.average_gain.value / self.average_loss.value
+            self.value = 1.0 - 1.0 / (1.0 + rs)
+
+    def reset(self):
+        self.average_gain.reset()
+        self.average_loss.reset()
+        self.last_value = 0.0
+        self.value = 0.0
+
+
+class MovingAverageConvergenceDivergence:
+    """MACD line: fast EMA minus slow EMA of the input."""
+
+    def __init__(self, fast_period: int, slow_period: int):
+        if fast_period >= slow_period:
+            raise ValueError(
+                f"fast_period ({fast_period}) must be < slow_period ({slow_period})"
+            )
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.fast_ma = ExponentialMovingAverage(fast_period)
+        self.slow_ma = ExponentialMovingAverage(slow_period)
+        self.value = 0.0
+
+    @property
+    def initialized(self) -> bool:
+        return self.fast_ma.initialized and self.slow_ma.initialized
+
+    def update_raw(self, value: float):
+        self.fast_ma.update_raw(value)
+        self.slow_ma.update_raw(value)
+        self.value = self.fast_ma.value - self.slow_ma.value
+
+    def seed(self, fast_value: float, slow_value: float, count: int):
+        """Set both EMA states and the number of inputs."""
+        self.fast_ma.seed(fast_value, count)
+        self.slow_ma.seed(slow_value, count)
+        self.value = self.fast_ma.value - self.slow_ma.value
+
+    def reset(self):
+        self.fast_ma.reset()
+        self.slow_ma.reset()
+        self.value = 0.0
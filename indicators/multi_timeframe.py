@@ -0,0 +1,243 @@
+"""
+Multi-Timeframe Indicator Bank for NautilusTrader Strategy
+
+Aggregates base bars in-process into higher timeframes (e.g. 1h/4h/1d), each
+with its own TechnicalIndicatorManager, so a single bar subscription gives
+the strategy higher-timeframe context.
+"""
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .technical_manager import TechnicalIndicatorManager
+
+NANOS_PER_SECOND = 1_000_000_000
+
+_TIMEFRAME_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_timeframe(timeframe: str) -> int:
+    """
+    Convert a timeframe string such as ``15m``, ``4h`` or ``1d`` to seconds.
+    """
+    match = re.fullmatch(r"(\d+)([mhd])", timeframe.strip().lower())
+    if not match:
+        raise ValueError(f"Unsupported timeframe: {timeframe!r}")
+    return int(match.group(1)) * _TIMEFRAME_UNITS[match.group(2)]
+
+
+class AggregatedBar(NamedTuple):
+    """Higher-timeframe bar built from base bars (``ts_init`` is the close time)."""
+
+    ts_init: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class BarAggregator:
+    """
+    Aggregates base bars into fixed, UTC-aligned higher-timeframe bars.
+
+    Base bar timestamps are expected to be bar close times (NautilusTrader
+    convention). A higher-timeframe bar is emitted as soon as the base bar
+    that closes its bucket arrives; if bars are missing, a pending bucket is
+    flushed when the first bar of a later bucket arrives.
+    """
+
+    def __init__(self, interval_sec: int, base_interval_sec: int):
+        """
+        Initialize bar aggregator.
+
+        Parameters
+        ----------
+        interval_sec : int
+            Target timeframe in seconds
+        base_interval_sec : int
+            Timeframe of the incoming bars in seconds
+        """
+        self.interval_ns = interval_sec * NANOS_PER_SECOND
+        self.base_interval_ns = base_interval_sec * NANOS_PER_SECOND
+        self._bucket: Optional[int] = None
+        self._open = 0.0
+        self._high = 0.0
+        self._low = 0.0
+        self._close = 0.0
+        self._volume = 0.0
+
+    def update(self, ts: int, open: float, high: float, low: float, close: float, volume: float) -> List[AggregatedBar]:
+        """
+        Add one base bar.
+
+        Returns
+        -------
+        List[AggregatedBar]
+            Higher-timeframe bars completed by this update (usually 0 or 1)
+        """
+        completed = []
+        bucket = (ts - 1) // self.interval_ns
+
+        if self._bucket is not None and bucket != self._bucket:
+            completed.append(self._flush())
+
+        if self._bucket is None:
+            self._bucket = bucket
+            self._open = open
+            self._high = high
+            self._low = low
+            self._volume = 0.0
+        else:
+            self._high = max(self._high, high)
+            self._low = min(self._low, low)
+        self._close = close
+        self._volume += volume
+
+        bucket_end = (bucket + 1) * self.interval_ns
+        if bucket_end - ts < self.base_interval_ns:
+            completed.append(self._flush())
+
+        return completed
+
+    def _flush(self) -> AggregatedBar:
+        bar = AggregatedBar(
+            ts_init=(self._bucket + 1) * self.interval_ns,
+            open=self._open,
+            high=self._high,
+            low=self._low,
+            close=self._close,
+            volume=self._volume,
+        )
+        self._bucket = None
+        return bar
+
+    def aggregate_arrays(self, ohlcv_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Aggregate a whole base history at once (vectorized).
+
+        Completed buckets are returned as OHLCV arrays; a trailing incomplete
+        bucket is kept as pending state so live ``update`` calls continue it.
+        Must be called before any ``update``.
+        """
+        ts = np.asarray(ohlcv_arrays['ts'], dtype=np.int64)
+        empty = {key: np.empty(0) for key in ('ts', 'open', 'high', 'low', 'close', 'volume')}
+        if len(ts) == 0:
+            return empty
+
+        opens = np.asarray(ohlcv_arrays['open'], dtype=np.float64)
+        highs = np.asarray(ohlcv_arrays['high'], dtype=np.float64)
+        lows = np.asarray(ohlcv_arrays['low'], dtype=np.float64)
+        closes = np.asarray(ohlcv_arrays['close'], dtype=np.float64)
+        volumes = np.asarray(ohlcv_arrays['volume'], dtype=np.float64)
+
+        buckets = (ts - 1) // self.interval_ns
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.concatenate((starts[1:], [len(ts)])) - 1
+
+        result = {
+            'ts': (buckets[starts] + 1) * self.interval_ns,
+            'open': opens[starts],
+            'high': np.maximum.reduceat(highs, starts),
+            'low': np.minimum.reduceat(lows, starts),
+            'close': closes[ends],
+            'volume': np.add.reduceat(volumes, starts),
+        }
+
+        # Trailing bucket still forming -> keep as pending state
+        if result['ts'][-1] - ts[-1] >= self.base_interval_ns:
+            self._bucket = int(buckets[-1])
+            self._open = float(result['open'][-1])
+            self._high = float(result['high'][-1])
+            self._low = float(result['low'][-1])
+            self._close = float(result['close'][-1])
+            self._volume = float(result['volume'][-1])
+            result = {key: values[:-1] for key, values in result.items()}
+
+        return result
+
+
+class MultiTimeframeIndicatorBank:
+    """
+    Higher-timeframe indicator sets fed from a single base bar stream.
+    """
+
+    def __init__(
+        self,
+        base_interval_sec: int,
+        timeframes: List[str],
+        manager_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize indicator bank.
+
+        Parameters
+        ----------
+        base_interval_sec : int
+            Timeframe of the subscribed bars in seconds
+        timeframes : List[str]
+            Higher timeframes to build (e.g. ["1h", "4h", "1d"]); entries
+            not larger than the base timeframe are ignored
+        manager_kwargs : Dict, optional
+            Keyword arguments for each TechnicalIndicatorManager
+        """
+        self.base_interval_sec = base_interval_sec
+        self.aggregators: Dict[str, BarAggregator] = {}
+        self.managers: Dict[str, TechnicalIndicatorManager] = {}
+
+        for timeframe in timeframes:
+            interval_sec = parse_timeframe(timeframe)
+            if interval_sec <= base_interval_sec or interval_sec % base_interval_sec:
+                continue
+            self.aggregators[timeframe] = BarAggregator(interval_sec, base_interval_sec)
+            self.managers[timeframe] = TechnicalIndicatorManager(**(manager_kwargs or {}))
+
+    @property
+    def timeframes(self) -> List[str]:
+        return list(self.managers)
+
+    def required_base_bars(self) -> Dict[str, int]:
+        """
+        Base bars needed to initialize each timeframe's indicators.
+
+        Includes one extra higher-timeframe bucket, since the oldest bucket
+        of a history is usually partial.
+        """
+        return {
+            timeframe: (self.managers[timeframe].min_required_bars + 1)
+            * (aggregator.interval_ns // aggregator.base_interval_ns)
+            for timeframe, aggregator in self.aggregators.items()
+        }
+
+    def update(self, bar: Any):
+        """
+        Feed one base bar (NautilusTrader ``Bar`` or any OHLCV object).
+        """
+        ts = int(getattr(bar, 'ts_event', bar.ts_init))
+        values = (float(bar.open), float(bar.high), float(bar.low), float(bar.close), float(bar.volume))
+        for timeframe, aggregator in self.aggregators.items():
+            for completed in aggregator.update(ts, *values):
+                self.managers[timeframe].update(completed)
+
+    def warm_up(self, ohlcv_arrays: Dict[str, np.ndarray]):
+        """Aggregate a base history and warm up every timeframe's indicators."""
+        for timeframe, aggregator in self.aggregators.items():
+            aggregated = aggregator.aggregate_arrays(ohlcv_arrays)
+            self.managers[timeframe].warm_up(aggregated)
+
+    def get_timeframe_data(self, current_price: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Get technical snapshots for every initialized higher timeframe.
+
+        Returns
+        -------
+        Dict[str, Dict]
+            Timeframe -> technical data (same keys as ``get_technical_data``)
+        """
+        return {
+            timeframe: manager.get_technical_data(current_price)
+            for timeframe, manager in self.managers.items()
+            if manager.is_initialized()
+        }
@@ -0,0 +1,209 @@
+"""
+Rolling Window Statistics for Technical Indicator Manager
+
+Incremental accumulators updated once per bar and read in constant time.
+"""
+
+from collections import deque
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .vectorized import monotonic_candidates
+
+
+class RollingMeanVariance:
+    """
+    Sliding-window mean and population variance (Welford update).
+
+    Each ``update`` adds the newest value and, once the window is full,
+    removes the oldest in the same step, so reading ``mean``/``std`` is O(1).
+    The accumulator is rebuilt from the window every ``resync_interval``
+    updates (default: once per full window rotation, i.e. amortized O(1))
+    to keep floating-point drift bounded on long-running feeds.
+    """
+
+    def __init__(self, period: int, resync_interval: Optional[int] = None):
+        """
+        Initialize accumulator.
+
+        Parameters
+        ----------
+        period : int
+            Window length
+        resync_interval : int, optional
+            Number of updates between exact recomputations from the window
+            (default: ``period``)
+        """
+        if period <= 0:
+            raise ValueError(f"period must be positive, got {period}")
+
+        self.period = period
+        self.resync_interval = resync_interval or period
+        self._window: deque = deque(maxlen=period)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+
+    @property
+    def count(self) -> int:
+        return len(self._window)
+
+    @property
+    def initialized(self) -> bool:
+        return len(self._window) == self.period
+
+    @property
+    def mean(self) -> float:
+        return self._mean
+
+    @property
+    def variance(self) -> float:
+        n = len(self._window)
+        if n == 0:
+            return 0.0
+        return max(self._m2 / n, 0.0)
+
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+
+    def update(self, value: float):
+        """Add a new value, evicting the oldest once the window is full."""
+        window = self._window
+        if len(window) == self.period:
+            old = window[0]
+            window.append(value)
+            old_mean = self._mean
+            self._mean += (value - old) / self.period
+            self._m2 += (value - old) * (value - self._mean + old - old_mean)
+        else:
+            window.append(value)
+            delta = value - self._mean
+            self._mean += delta / len(window)
+            self._m2 += delta * (value - self._mean)
+
+        self._updates += 1
+        if self._updates % self.resync_interval == 0:
+            self._resync()
+
+    def seed(self, window: Sequence[float]):
+        """Set state from the trailing inputs (oldest first)."""
+        self._window = deque((float(x) for x in window[-self.period:]), maxlen=self.period)
+        self._updates = 0
+        self._resync()
+
+    def _resync(self):
+        """Recompute mean and M2 exactly from the stored window."""
+        n = len(self._window)
+        if n == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        mean = sum(self._window) / n
+        self._mean = mean
+        self._m2 = sum((x - mean) ** 2 for x in self._window)
+
+    def reset(self):
+        """Clear all state."""
+        self._window.clear()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+
+
+class RollingMinMax:
+    """
+    Sliding-window minimum and maximum using monotonic deques.
+
+    The min deque holds candidate lows in increasing order and the max deque
+    candidate highs in decreasing order, each tagged with its bar index.
+    Every value is pushed and popped at most once, so updates are O(1)
+    amortized and reads are O(1).
+    """
+
+    def __init__(self, period: int):
+        """
+        Initialize rolling extrema.
+
+        Parameters
+        ----------
+        period : int
+            Window length in bars
+        """
+        if period <= 0:
+            raise ValueError(f"period must be positive, got {period}")
+
+        self.period = period
+        self._mins: deque = deque()  # (index, low), lows increasing
+        self._maxs: deque = deque()  # (index, high), highs decreasing
+        self._index = -1
+
+    @property
+    def count(self) -> int:
+        return min(self._index + 1, self.period)
+
+    @property
+    def initialized(self) -> bool:
+        return self._index + 1 >= self.period
+
+    @property
+    def min(self) -> float:
+        return self._mins[0][1] if self._mins else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._maxs[0][1] if self._maxs else 0.0
+
+    def update(self, low: float, high: Optional[float] = None):
+        """
+        Add one bar's low/high (``high`` defaults to ``low`` for single series).
+        """
+        if high is None:
+            high = low
+        self._index += 1
+        idx = self._index
+        expired = idx - self.period
+
+        mins = self._mins
+        while mins and mins[-1][1] >= low:
+            mins.pop()
+        mins.append((idx, low))
+        if mins[0][0] <= expired:
+            mins.popleft()
+
+        maxs = self._maxs
+        while maxs and maxs[-1][1] <= high:
+            maxs.pop()
+        maxs.append((idx, high))
+        if maxs[0][0] <= expired:
+            maxs.popleft()
+
+    def seed(self, lows: Sequence[float], highs: Sequence[float]):
+        """
+        Set state from a full low/high history (oldest first).
+
+        Rebuilds both deques from the trailing window in one vectorized pass.
+        """
+        lows = np.asarray(lows, dtype=np.float64)
+        highs = np.asarray(highs, dtype=np.float64)
+        n = len(lows)
+        start = max(0, n - self.period)
+        self._index = n - 1
+
+        window_lows = lows[start:]
+        window_highs = highs[start:]
+        self._mins = deque(
+            (start + int(i), float(window_lows[i]))
+            for i in monotonic_candidates(window_lows, keep_lower=True)
+        )
+        self._maxs = deque(
+            (start + int(i), float(window_highs[i]))
+            for i in monotonic_candidates(window_highs, keep_lower=False)
+        )
+
+    def reset(self):
+        """Clear all state."""
+        self._mins.clear()
+        self._maxs.clear()
+        self._index = -1
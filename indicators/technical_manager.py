@@ -1,27 +1,34 @@
 """
 Technical Indicator Manager for NautilusTrader Strategy
 
-Manages all technical indicators using NautilusTrader's built-in indicators.
+Manages all technical indicators for the strategy, updated incrementally per
+bar and optionally bootstrapped from history with a vectorized warm-up.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from decimal import Decimal
 
-from nautilus_trader.indicators import (
+import numpy as np
+
+from nautilus_trader.model.data import Bar
+
+from .bar_buffer import OHLCVRingBuffer
+from .incremental import (
     SimpleMovingAverage,
     ExponentialMovingAverage,
     RelativeStrengthIndex,
     MovingAverageConvergenceDivergence,
-    AverageTrueRange,
 )
-from nautilus_trader.model.data import Bar
+from .rolling import RollingMeanVariance, RollingMinMax
+from .vectorized import ema_series, rsi_state
 
 
 class TechnicalIndicatorManager:
     """
     Manages technical indicators for strategy analysis.
 
-    Uses NautilusTrader's built-in indicators for efficiency and consistency.
+    Indicators follow NautilusTrader's built-in update semantics but are
+    seedable, so ``warm_up`` can bootstrap them from a NumPy history.
     """
 
     def __init__(
@@ -36,6 +43,8 @@ class TechnicalIndicatorManager:
         bb_std: float = 2.0,
         volume_ma_period: int = 20,
         support_resistance_lookback: int = 20,
+        extra_bb_periods: Optional[List[int]] = None,
+        extra_sr_lookbacks: Optional[List[int]] = None,
     ):
         """
         Initialize technical indicator manager.
@@ -62,6 +71,12 @@ class TechnicalIndicatorManager:
             Period for volume moving average
         support_resistance_lookback : int
             Lookback period for support/resistance calculation
+        extra_bb_periods : List[int], optional
+            Additional Bollinger Band periods (e.g. [50, 100]) reported
+            as ``bb_upper_<period>`` etc. alongside the primary bands
+        extra_sr_lookbacks : List[int], optional
+            Additional support/resistance lookbacks (e.g. [50, 200]) reported
+            as ``support_<lookback>`` / ``resistance_<lookback>``
         """
         # SMA indicators
         self.smas = {period: SimpleMovingAverage(period) for period in sma_periods}
@@ -79,17 +94,38 @@ class TechnicalIndicatorManager:
         )
         self.macd_signal = ExponentialMovingAverage(macd_signal)
 
-        # For Bollinger Bands calculation
-        self.bb_sma = SimpleMovingAverage(bb_period)
+        # Bollinger Bands: rolling mean/variance per period, O(1) per read
         self.bb_period = bb_period
         self.bb_std = bb_std
+        self.extra_bb_periods = [p for p in (extra_bb_periods or []) if p != bb_period]
+        self.bb_stats = {
+            period: RollingMeanVariance(period)
+            for period in [bb_period] + self.extra_bb_periods
+        }
 
         # Volume MA
         self.volume_sma = SimpleMovingAverage(volume_ma_period)
 
-        # Store recent bars for calculations
-        self.recent_bars: List[Bar] = []
+        # Store recent bars for calculations (fixed-capacity OHLCV columns)
         self.max_bars = max(list(sma_periods) + [bb_period, volume_ma_period, support_resistance_lookback]) + 10
+        self.bar_buffer = OHLCVRingBuffer(self.max_bars)
+
+        # Support/Resistance: rolling low/high extrema per lookback, O(1) per read
+        self.extra_sr_lookbacks = [
+            n for n in (extra_sr_lookbacks or []) if n != support_resistance_lookback
+        ]
+        self.sr_extrema = {
+            lookback: RollingMinMax(lookback)
+            for lookback in [support_resistance_lookback] + self.extra_sr_lookbacks
+        }
+
+        # Memoized technical snapshot, invalidated by every new bar
+        self._bar_version = 0
+        self._snapshot_bar_key: Optional[tuple] = None
+        self._snapshot_base: Optional[Dict[str, Any]] = None
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_price: Optional[float] = None
+        self.snapshot_stats = {'hits': 0, 'price_only': 0, 'misses': 0}
 
         # Configuration
         self.support_resistance_lookback = support_resistance_lookback
@@ -110,9 +146,8 @@ class TechnicalIndicatorManager:
             New bar data
         """
         # Store bar for manual calculations
-        self.recent_bars.append(bar)
-        if len(self.recent_bars) > self.max_bars:
-            self.recent_bars.pop(0)
+        self.bar_buffer.append_bar(bar)
+        self._bar_version += 1
 
         # Update SMA indicators
         for sma in self.smas.values():
@@ -129,16 +164,83 @@ class TechnicalIndicatorManager:
         self.macd.update_raw(float(bar.close))
         self.macd_signal.update_raw(self.macd.value)
 
-        # Update Bollinger Band SMA
-        self.bb_sma.update_raw(float(bar.close))
+        # Update Bollinger Band accumulators
+        for stats in self.bb_stats.values():
+            stats.update(float(bar.close))
 
         # Update Volume SMA
         self.volume_sma.update_raw(float(bar.volume))
 
+        # Update Support/Resistance extrema
+        low = float(bar.low)
+        high = float(bar.high)
+        for extrema in self.sr_extrema.values():
+            extrema.update(low, high)
+
+    def warm_up(self, ohlcv_arrays: Dict[str, np.ndarray]):
+        """
+        Bootstrap all indicators from a bar history in one vectorized pass.
+
+        Produces the same state as calling ``update`` for every bar, but the
+        per-bar work runs in NumPy, so thousands of bars load in milliseconds.
+        Must be called before any ``update``.
+
+        Parameters
+        ----------
+        ohlcv_arrays : Dict[str, np.ndarray]
+            Equal-length arrays (oldest first) keyed by ``ts``, ``open``,
+            ``high``, ``low``, ``close`` and ``volume``
+        """
+        if len(self.bar_buffer):
+            raise RuntimeError("warm_up() must be called before any update()")
+
+        closes = np.asarray(ohlcv_arrays['close'], dtype=np.float64)
+        n = len(closes)
+        if n == 0:
+            return
+
+        highs = np.asarray(ohlcv_arrays['high'], dtype=np.float64)
+        lows = np.asarray(ohlcv_arrays['low'], dtype=np.float64)
+        volumes = np.asarray(ohlcv_arrays['volume'], dtype=np.float64)
+
+        # Bar storage
+        self.bar_buffer.extend(
+            ohlcv_arrays['ts'], ohlcv_arrays['open'], highs, lows, closes, volumes
+        )
+        self._bar_version += 1
+
+        # Moving averages
+        for period, sma in self.smas.items():
+            sma.seed(closes[-period:], n)
+        for period, ema in self.emas.items():
+            ema.seed(ema_series(closes, period)[-1], n)
+        self.volume_sma.seed(volumes[-self.volume_sma.period:], n)
+
+        # RSI
+        average_gain, average_loss, last_close = rsi_state(closes, self.rsi_period)
+        self.rsi.seed(average_gain, average_loss, last_close, n)
+
+        # MACD and its signal line (EMA of the MACD series)
+        fast = ema_series(closes, self.macd_fast_period)
+        slow = ema_series(closes, self.macd_slow_period)
+        self.macd.seed(fast[-1], slow[-1], n)
+        self.macd_signal.seed(ema_series(fast - slow, self.macd_signal_period)[-1], n)
+
+        # Bollinger Bands and Support/Resistance
+        for period, stats in self.bb_stats.items():
+            stats.seed(closes[-period:])
+        for extrema in self.sr_extrema.values():
+            extrema.seed(lows, highs)
+
     def get_technical_data(self, current_price: float) -> Dict[str, Any]:
         """
         Get all technical indicator values.
 
+        Snapshots are memoized per (last bar ts, current_price). While no new
+        bar has arrived, only the price-dependent fields (``bb_position*`` and
+        the price-vs-SMA trends) are recomputed for a new price; an identical
+        call returns the cached snapshot.
+
         Parameters
         ----------
         current_price : float
@@ -149,6 +251,28 @@ class TechnicalIndicatorManager:
         Dict
             Dictionary containing all technical indicator values
         """
+        bar_key = (self._bar_version, self.bar_buffer.latest('ts') if len(self.bar_buffer) else 0)
+
+        if bar_key == self._snapshot_bar_key and self._snapshot is not None:
+            if current_price == self._snapshot_price:
+                self.snapshot_stats['hits'] += 1
+                return dict(self._snapshot)
+            self.snapshot_stats['price_only'] += 1
+        else:
+            self.snapshot_stats['misses'] += 1
+            self._snapshot_base = self._build_bar_snapshot()
+            self._snapshot_bar_key = bar_key
+
+        self._snapshot = self._apply_price(self._snapshot_base, current_price)
+        self._snapshot_price = current_price
+        return dict(self._snapshot)
+
+    def get_snapshot_stats(self) -> Dict[str, int]:
+        """Get technical snapshot cache counters (hits, price_only, misses)."""
+        return dict(self.snapshot_stats)
+
+    def _build_bar_snapshot(self) -> Dict[str, Any]:
+        """Compute all price-independent values for the current bar."""
         # Basic SMA values
         sma_values = {f'sma_{period}': self.smas[period].value for period in self.sma_periods}
 
@@ -162,34 +286,38 @@ class TechnicalIndicatorManager:
         macd_value = self.macd.value
         macd_signal_value = self.macd_signal.value  # Signal line from MACD indicator
 
-        # Bollinger Bands
-        bb_middle = self.bb_sma.value
-        bb_std_dev = self._calculate_std_dev(self.bb_period)
-        bb_upper = bb_middle + (self.bb_std * bb_std_dev)
-        bb_lower = bb_middle - (self.bb_std * bb_std_dev)
-        bb_position = (current_price - bb_lower) / (bb_upper - bb_lower) if bb_upper != bb_lower else 0.5
+        # Bollinger Bands (bb_position* filled in by _apply_price)
+        bb_upper, bb_middle, bb_lower = self._bollinger_bands(self.bb_period)
+        extra_bb_values = {}
+        for period in self.extra_bb_periods:
+            upper, middle, lower = self._bollinger_bands(period)
+            extra_bb_values[f'bb_upper_{period}'] = upper
+            extra_bb_values[f'bb_middle_{period}'] = middle
+            extra_bb_values[f'bb_lower_{period}'] = lower
+            extra_bb_values[f'bb_position_{period}'] = None
 
         # Volume analysis
         volume_ma = self.volume_sma.value
-        current_volume = float(self.recent_bars[-1].volume) if self.recent_bars else 0
+        current_volume = self.bar_buffer.latest('volume') if len(self.bar_buffer) else 0
         volume_ratio = current_volume / volume_ma if volume_ma > 0 else 1.0
 
         # Support and Resistance
         support, resistance = self._calculate_support_resistance()
-
-        # Trend analysis
-        trend_data = self._analyze_trend(
-            current_price, sma_values, macd_value, macd_signal_value
-        )
+        extra_sr_values = {}
+        for lookback in self.extra_sr_lookbacks:
+            extra_support, extra_resistance = self.get_support_resistance(lookback)
+            extra_sr_values[f'support_{lookback}'] = extra_support
+            extra_sr_values[f'resistance_{lookback}'] = extra_resistance
 
         # Combine all data
-        technical_data = {
+        return {
             # SMAs
             **sma_values,
             # EMAs
             **ema_values,
-            # RSI
+            # RSI (NautilusTrader 0-1 scale, plus the conventional 0-100 scale)
             "rsi": rsi_value,
+            "rsi_pct": rsi_value * 100,
             # MACD
             "macd": macd_value,
             "macd_signal": macd_signal_value,
@@ -198,37 +326,93 @@ class TechnicalIndicatorManager:
             "bb_upper": bb_upper,
             "bb_middle": bb_middle,
             "bb_lower": bb_lower,
-            "bb_position": bb_position,
+            "bb_position": None,
+            **extra_bb_values,
             # Volume
             "volume_ratio": volume_ratio,
             # Support/Resistance
             "support": support,
             "resistance": resistance,
-            # Trend analysis
-            **trend_data,
+            **extra_sr_values,
+            # Trend analysis (filled in by _apply_price)
+            "short_term_trend": None,
+            "medium_term_trend": None,
+            "macd_trend": None,
+            "overall_trend": None,
         }
 
+    def _apply_price(self, base: Dict[str, Any], current_price: float) -> Dict[str, Any]:
+        """Fill the price-dependent fields of a bar snapshot."""
+        technical_data = dict(base)
+
+        technical_data['bb_position'] = self._bb_position(
+            current_price, base['bb_upper'], base['bb_lower']
+        )
+        for period in self.extra_bb_periods:
+            technical_data[f'bb_position_{period}'] = self._bb_position(
+                current_price, base[f'bb_upper_{period}'], base[f'bb_lower_{period}']
+            )
+
+        sma_values = {f'sma_{period}': base[f'sma_{period}'] for period in self.sma_periods}
+        technical_data.update(self._analyze_trend(
+            current_price, sma_values, base['macd'], base['macd_signal']
+        ))
         return technical_data
 
+    def _bollinger_bands(self, period: int) -> tuple:
+        """Return (upper, middle, lower) for one Bollinger period."""
+        middle = self.bb_stats[period].mean
+        std_dev = self._calculate_std_dev(period)
+        upper = middle + (self.bb_std * std_dev)
+        lower = middle - (self.bb_std * std_dev)
+        return upper, middle, lower
+
+    @staticmethod
+    def _bb_position(current_price: float, upper: float, lower: float) -> float:
+        """Price position within the bands (0 = lower, 1 = upper)."""
+        return (current_price - lower) / (upper - lower) if upper != lower else 0.5
+
     def _calculate_std_dev(self, period: int) -> float:
         """Calculate standard deviation for Bollinger Bands."""
-        if len(self.recent_bars) < period:
-            return 0.0
+        stats = self.bb_stats.get(period)
+        if stats is not None:
+            return stats.std if stats.initialized else 0.0
 
-        recent_closes = [float(bar.close) for bar in self.recent_bars[-period:]]
-        mean = sum(recent_closes) / len(recent_closes)
-        variance = sum((x - mean) ** 2 for x in recent_closes) / len(recent_closes)
-        return variance ** 0.5
+        # Untracked period: fall back to a window over the bar buffer
+        if len(self.bar_buffer) < period:
+            return 0.0
+        return float(self.bar_buffer.window('close', period).std())
 
     def _calculate_support_resistance(self) -> tuple:
         """Calculate support and resistance levels."""
-        if len(self.recent_bars) < self.support_resistance_lookback:
-            return 0.0, 0.0
+        return self.get_support_resistance(self.support_resistance_lookback)
 
-        recent = self.recent_bars[-self.support_resistance_lookback:]
-        support = min(float(bar.low) for bar in recent)
-        resistance = max(float(bar.high) for bar in recent)
+    def get_support_resistance(self, lookback: Optional[int] = None) -> tuple:
+        """
+        Get (support, resistance) for a lookback without rescanning bars.
 
+        Parameters
+        ----------
+        lookback : int, optional
+            Lookback in bars (default: ``support_resistance_lookback``).
+            Untracked lookbacks fall back to a scan of the bar buffer.
+
+        Returns
+        -------
+        tuple
+            (support, resistance), or (0.0, 0.0) if not enough bars
+        """
+        lookback = lookback or self.support_resistance_lookback
+        extrema = self.sr_extrema.get(lookback)
+        if extrema is not None:
+            if not extrema.initialized:
+                return 0.0, 0.0
+            return extrema.min, extrema.max
+
+        if len(self.bar_buffer) < lookback:
+            return 0.0, 0.0
+        support = float(self.bar_buffer.window('low', lookback).min())
+        resistance = float(self.bar_buffer.window('high', lookback).max())
         return support, resistance
 
     def _analyze_trend(
@@ -273,18 +457,21 @@ class TechnicalIndicatorManager:
             'overall_trend': overall_trend,
         }
 
-    def is_initialized(self) -> bool:
-        """Check if indicators have enough data to be valid."""
-        # Check if we have minimum bars for key indicators
+    @property
+    def min_required_bars(self) -> int:
+        """Minimum bars before ``is_initialized()`` can be True."""
         # Use dynamic calculation based on actual indicator periods
-        min_required_bars = max(
+        return max(
             self.rsi_period,  # RSI period (e.g., 7 or 14)
             self.macd_slow_period,  # MACD slow period (e.g., 10 or 26)
             self.bb_period,  # Bollinger Bands period (e.g., 10 or 20)
             min(self.sma_periods) if self.sma_periods else 0  # At least shortest SMA
         )
-        
-        if len(self.recent_bars) < min_required_bars:
+
+    def is_initialized(self) -> bool:
+        """Check if indicators have enough data to be valid."""
+        # Check if we have minimum bars for key indicators
+        if len(self.bar_buffer) < self.min_required_bars:
             return False
 
         # Check if key indicators are initialized
@@ -314,18 +501,25 @@ class TechnicalIndicatorManager:
         List[Dict]
             List of K-line data dictionaries
         """
-        if not self.recent_bars:
+        if not len(self.bar_buffer):
             return []
 
-        kline_data = []
-        for bar in self.recent_bars[-count:]:
-            kline_data.append({
-                'timestamp': bar.ts_init,
-                'open': float(bar.open),
-                'high': float(bar.high),
-                'low': float(bar.low),
-                'close': float(bar.close),
-                'volume': float(bar.volume),
-            })
-
-        return kline_data
+        buffer = self.bar_buffer
+        timestamps = buffer.window('ts', count).tolist()
+        opens = buffer.window('open', count).tolist()
+        highs = buffer.window('high', count).tolist()
+        lows = buffer.window('low', count).tolist()
+        closes = buffer.window('close', count).tolist()
+        volumes = buffer.window('volume', count).tolist()
+
+        return [
+            {
+                'timestamp': ts,
+                'open': o,
+                'high': h,
+                'low': l,
+                'close': c,
+                'volume': v,
+            }
+            for ts, o, h, l, c, v in zip(timestamps, opens, highs, lows, closes, volumes)
+        ]
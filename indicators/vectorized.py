@@ -0,0 +1,107 @@
+"""
+Vectorized Indicator Kernels for Technical Indicator Manager
+
+NumPy implementations used to bootstrap indicator state from a full
+history in one pass (see ``TechnicalIndicatorManager.warm_up``).
+"""
+
+import numpy as np
+
+
+def ema_series(values: np.ndarray, period: int, block: int = 64) -> np.ndarray:
+    """
+    Exponential moving average of a whole series.
+
+    Matches ``ExponentialMovingAverage.update_raw`` applied element by element
+    (first output equals first input, ``alpha = 2 / (period + 1)``).
+
+    The recursion is evaluated in fixed-size blocks: inside a block each
+    output is a scaled cumulative sum, so the Python loop runs ``n / block``
+    times instead of ``n``. Values are shifted by the first input before
+    filtering (an EMA is shift-equivariant) to keep the partial sums small.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Input series
+    period : int
+        EMA period
+    block : int
+        Block length of the scan
+
+    Returns
+    -------
+    np.ndarray
+        EMA value after each input
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+
+    alpha = 2.0 / (period + 1.0)
+    beta = 1.0 - alpha
+    if beta == 0.0:
+        return x.copy()
+
+    ref = x[0]
+    shifted = x - ref
+    out = np.empty(n, dtype=np.float64)
+    out[0] = 0.0
+
+    steps = np.arange(1, block + 1, dtype=np.float64)
+    decay = beta ** steps          # beta^(k+1)
+    growth = beta ** -steps        # beta^-(i+1)
+
+    prev = 0.0
+    for start in range(1, n, block):
+        segment = shifted[start:start + block]
+        m = len(segment)
+        partial = np.cumsum(segment * growth[:m]) * alpha
+        out[start:start + m] = decay[:m] * (prev + partial)
+        prev = out[start + m - 1]
+
+    return out + ref
+
+
+def rsi_state(values: np.ndarray, period: int) -> tuple:
+    """
+    Final RSI state for a whole series.
+
+    Returns
+    -------
+    tuple
+        (average_gain, average_loss, last_value)
+    """
+    x = np.asarray(values, dtype=np.float64)
+    changes = np.diff(x, prepend=x[0])
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+    return (
+        float(ema_series(gains, period)[-1]),
+        float(ema_series(losses, period)[-1]),
+        float(x[-1]),
+    )
+
+
+def monotonic_candidates(values: np.ndarray, keep_lower: bool) -> np.ndarray:
+    """
+    Indices that survive in a monotonic min (or max) deque after ``values``.
+
+    An element stays in a min deque only if it is strictly lower than every
+    later element (strictly higher for a max deque).
+    """
+    v = np.asarray(values, dtype=np.float64)
+    n = len(v)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    keep = np.empty(n, dtype=bool)
+    keep[-1] = True
+    if keep_lower:
+        suffix = np.minimum.accumulate(v[::-1])[::-1]
+        keep[:-1] = v[:-1] < suffix[1:]
+    else:
+        suffix = np.maximum.accumulate(v[::-1])[::-1]
+        keep[:-1] = v[:-1] > suffix[1:]
+    return np.nonzero(keep)[0]
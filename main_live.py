@@ -140,6 +140,7 @@ def get_strategy_config() -> DeepSeekAIStrategyConfig:
     return DeepSeekAIStrategyConfig(
         instrument_id="BTCUSDT-PERP.BINANCE",
         bar_type=final_bar_type,
+        additional_instrument_ids=tuple(strategy_yaml.get('additional_instrument_ids', []) or []),
 
         # Capital
         equity=equity,
@@ -162,12 +163,28 @@ def get_strategy_config() -> DeepSeekAIStrategyConfig:
         macd_slow=10 if timeframe == '1m' else 26,
         bb_period=10 if timeframe == '1m' else 20,
         bb_std=2.0,
+        higher_timeframes=tuple(strategy_yaml.get('indicators', {}).get('higher_timeframes', ("1h", "4h", "1d"))),
+        prefetch_bars=get_env_int('PREFETCH_BARS', str(strategy_yaml.get('indicators', {}).get('prefetch_bars', 200))),
 
         # AI
         deepseek_api_key=deepseek_api_key,
         deepseek_model="deepseek-chat",
+        deepseek_base_url=get_env_str('DEEPSEEK_BASE_URL', strategy_yaml.get('deepseek', {}).get('base_url', 'https://api.deepseek.com')),
         deepseek_temperature=0.1,
         deepseek_max_retries=2,
+        deepseek_stream=strategy_yaml.get('deepseek', {}).get('stream', True),
+        execute_provisional_signals=strategy_yaml.get('deepseek', {}).get('execute_provisional_signals', False),
+        deepseek_prompt_mode=strategy_yaml.get('deepseek', {}).get('prompt_mode', 'full'),
+        deepseek_hedge_quantile=strategy_yaml.get('deepseek', {}).get('hedge_quantile', 0.95),
+        deepseek_hedge_min_samples=strategy_yaml.get('deepseek', {}).get('hedge_min_samples', 20),
+        deepseek_decision_deadline_sec=strategy_yaml.get('deepseek', {}).get('decision_deadline_sec', 45.0),
+        ai_breaker_failure_threshold=strategy_yaml.get('deepseek', {}).get('breaker_failure_threshold', 3),
+        ai_breaker_p95_latency_sec=strategy_yaml.get('deepseek', {}).get('breaker_p95_latency_sec', 25.0),
+        ai_breaker_open_sec=strategy_yaml.get('deepseek', {}).get('breaker_open_sec', 60.0),
+        prompt_kline_count=strategy_yaml.get('deepseek', {}).get('prompt_kline_count', 10),
+        ai_cache_ttl_sec=get_env_float('AI_CACHE_TTL_SEC', str(strategy_yaml.get('deepseek', {}).get('cache_ttl_sec', 0))),
+        ai_cache_max_entries=strategy_yaml.get('deepseek', {}).get('cache_max_entries', 256),
+        ai_cache_db_path=get_env_str('AI_CACHE_DB_PATH', strategy_yaml.get('deepseek', {}).get('cache_db_path', '')),
 
         # Sentiment
         sentiment_enabled=True,
@@ -182,12 +199,21 @@ def get_strategy_config() -> DeepSeekAIStrategyConfig:
         rsi_extreme_threshold_upper=75.0,
         rsi_extreme_threshold_lower=25.0,
         rsi_extreme_multiplier=0.7,
+        trailing_price_source=get_env_str('TRAILING_PRICE_SOURCE', strategy_yaml.get('risk', {}).get('trailing_price_source', 'quote') or ''),
 
         # Execution
         position_adjustment_threshold=0.001,
 
         # Timing - Load from YAML config (default: 900 seconds = 15 minutes)
         timer_interval_sec=get_env_int('TIMER_INTERVAL_SEC', str(strategy_yaml.get('timer_interval_sec', 900))),
+        max_ai_calls_per_minute=get_env_int('MAX_AI_CALLS_PER_MINUTE', str(strategy_yaml.get('max_ai_calls_per_minute', 0))),
+        analysis_trigger_bars=get_env_int('ANALYSIS_TRIGGER_BARS', str(strategy_yaml.get('analysis_trigger_bars', 0))),
+        analysis_watchdog_sec=get_env_float('ANALYSIS_WATCHDOG_SEC', str(strategy_yaml.get('analysis_watchdog_sec', 0))),
+        speculative_lead_sec=get_env_float('SPECULATIVE_LEAD_SEC', str(strategy_yaml.get('speculative_lead_sec', 0))),
+        change_gate_enabled=strategy_yaml.get('change_gate', {}).get('enabled', False),
+        gate_price_move_pct=strategy_yaml.get('change_gate', {}).get('price_move_pct', 0.003),
+        gate_rsi_levels=tuple(strategy_yaml.get('change_gate', {}).get('rsi_levels', (30.0, 70.0))),
+        gate_max_signal_age_sec=strategy_yaml.get('change_gate', {}).get('max_signal_age_sec', 3600.0),
         
         # Telegram Notifications
         enable_telegram=strategy_yaml.get('telegram', {}).get('enabled', False),
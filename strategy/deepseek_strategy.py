@@ -6,14 +6,17 @@ technical indicators for market analysis, and sentiment data for validation.
 """
 
 import os
+import math
+import time
 import asyncio
 import threading
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
 from decimal import Decimal
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Callable, Optional, List, Tuple
 
 from nautilus_trader.config import StrategyConfig
 from nautilus_trader.trading.strategy import Strategy
-from nautilus_trader.model.data import Bar, BarType
+from nautilus_trader.model.data import Bar, BarType, QuoteTick, TradeTick
 from nautilus_trader.model.enums import OrderSide, TimeInForce, PositionSide, PriceType, TriggerType, OrderType
 from nautilus_trader.model.identifiers import InstrumentId
 from nautilus_trader.model.instruments import Instrument
@@ -25,8 +28,19 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from indicators.technical_manager import TechnicalIndicatorManager
-from utils.deepseek_client import DeepSeekAnalyzer
+from indicators.multi_timeframe import MultiTimeframeIndicatorBank
+from strategy.instrument_context import InstrumentContext
+from utils.analysis_pipeline import AnalysisPipeline, AnalysisResult
+from utils.analysis_scheduler import AnalysisScheduler
+from utils.change_gate import ChangeDetectionGate
+from utils.circuit_breaker import CircuitBreaker
+from utils.decision_log import DecisionLog
+from utils.deepseek_client import AsyncDeepSeekAnalyzer
+from utils.prompt_renderer import KlinePromptRenderer
+from utils.response_cache import SignalCache, quantize_market_state
 from utils.sentiment_client import SentimentDataFetcher
+from utils.speculation import Speculation, SpeculationTracker
+from utils.trailing_stop import TrailingStopEngine
 # OCOManager no longer needed - using NautilusTrader's built-in bracket orders
 
 
@@ -36,6 +50,7 @@ class DeepSeekAIStrategyConfig(StrategyConfig, frozen=True):
     # Instrument
     instrument_id: str
     bar_type: str
+    additional_instrument_ids: Tuple[str, ...] = ()  # Traded by the same instance, same bar spec as bar_type
 
     # Capital
     equity: float = 10000.0
@@ -57,17 +72,51 @@ class DeepSeekAIStrategyConfig(StrategyConfig, frozen=True):
     macd_slow: int = 26
     bb_period: int = 20
     bb_std: float = 2.0
+    bb_extra_periods: Tuple[int, ...] = ()  # Additional Bollinger periods, e.g. (50, 100)
+    support_resistance_lookback: int = 20
+    sr_extra_lookbacks: Tuple[int, ...] = ()  # Additional S/R lookbacks, e.g. (50, 200)
+    higher_timeframes: Tuple[str, ...] = ("1h", "4h", "1d")  # Aggregated in-process from bar_type
 
     # AI configuration
     deepseek_api_key: str = ""
     deepseek_model: str = "deepseek-chat"
+    deepseek_base_url: str = "https://api.deepseek.com"  # e.g. a local utils.deepseek_stub_server for load tests
     deepseek_temperature: float = 0.1
     deepseek_max_retries: int = 2
+    deepseek_timeout_sec: float = 30.0  # Per-attempt timeout
+    deepseek_stream: bool = True  # Stream responses; decision is known before 'reason' completes
+    deepseek_prompt_mode: str = "full"  # "full" or opt-in "compact" (static system prefix + CSV/JSON data)
+    deepseek_hedge_quantile: float = 0.95  # Hedge a request slower than this latency quantile (0 = off)
+    deepseek_hedge_min_samples: int = 20  # Latency samples before hedging starts
+    deepseek_decision_deadline_sec: float = 45.0  # Budget per decision incl. retries/hedges (0 = unbounded)
+    ai_breaker_failure_threshold: int = 3  # Consecutive failed attempts that open the AI circuit (0 = no breaker)
+    ai_breaker_p95_latency_sec: float = 25.0  # Also open when p95 latency exceeds this (0 = off)
+    ai_breaker_open_sec: float = 60.0  # Cooldown before a half-open probe (doubles per failed probe)
+    ai_breaker_max_open_sec: float = 900.0
+    prompt_kline_count: int = 10  # K-lines sent per prompt (pre-rendered incrementally, so 100+ is cheap)
+    execute_provisional_signals: bool = False  # Trade on the streamed decision before it is parsed/validated
+    ai_cache_ttl_sec: float = 0.0  # Opt-in: reuse a signal for unchanged quantized market state (0 = disabled)
+    ai_cache_max_entries: int = 256
+    ai_cache_db_path: str = ""  # SQLite file to persist the cache across restarts ("" = memory only)
+    ai_cache_price_band_pct: float = 0.002  # Price band width of the cache key
+    ai_cache_rsi_bucket: float = 5.0  # RSI bucket width (RSI points) of the cache key
+    ai_record_path: str = ""  # Append every DeepSeek exchange to this decision log ("" = off)
+    ai_replay_path: str = ""  # Answer from a recorded decision log instead of calling DeepSeek (backtests)
+
+    # Change-detection gate (skip the AI call while the last signal is HOLD and nothing changed)
+    change_gate_enabled: bool = False  # Opt-in: reuses the previous HOLD without asking the model
+    gate_price_move_pct: float = 0.003  # Price move since the last AI call (0 = disabled)
+    gate_rsi_levels: Tuple[float, ...] = (30.0, 70.0)  # RSI levels whose crossing triggers a call
+    gate_on_sr_break: bool = True  # Trigger on a break of support/resistance
+    gate_on_macd_flip: bool = True  # Trigger on a MACD histogram sign flip
+    gate_on_position_change: bool = True  # Trigger when the position side changes
+    gate_max_signal_age_sec: float = 3600.0  # Always call the model after this long (0 = no limit)
 
     # Sentiment
     sentiment_enabled: bool = True
     sentiment_lookback_hours: int = 4
     sentiment_timeframe: str = "15m"  # Sentiment data timeframe (should match or be compatible with bar_type)
+    sentiment_deadline_sec: float = 3.0  # Analyse without sentiment if not ready this long after the cycle starts
 
     # Risk management
     min_confidence_to_trade: str = "MEDIUM"
@@ -81,6 +130,7 @@ class DeepSeekAIStrategyConfig(StrategyConfig, frozen=True):
     enable_auto_sl_tp: bool = True
     sl_use_support_resistance: bool = True
     sl_buffer_pct: float = 0.001
+    sl_sr_lookback: int = 0  # S/R lookback (bars) for SL placement; 0 = use support_resistance_lookback
     tp_high_confidence_pct: float = 0.03
     tp_medium_confidence_pct: float = 0.02
     tp_low_confidence_pct: float = 0.01
@@ -98,6 +148,7 @@ class DeepSeekAIStrategyConfig(StrategyConfig, frozen=True):
     trailing_activation_pct: float = 0.01
     trailing_distance_pct: float = 0.005
     trailing_update_threshold_pct: float = 0.002
+    trailing_price_source: str = "quote"  # "quote" ticks, "bar_1m" bars, or "" (only after each analysis)
     
     # Partial Take Profit
     enable_partial_tp: bool = True
@@ -119,7 +170,19 @@ class DeepSeekAIStrategyConfig(StrategyConfig, frozen=True):
     position_adjustment_threshold: float = 0.001
 
     # Timing
-    timer_interval_sec: int = 900
+    timer_interval_sec: int = 900  # Analysis interval per instrument (staggered across instruments)
+    analysis_trigger_bars: int = 0  # Analyse after every N closed bars; the timer becomes a watchdog (0 = timer only)
+    analysis_watchdog_sec: float = 0.0  # Watchdog: analyse if no bar-driven analysis ran this long (0 = 2 trigger periods)
+    max_ai_calls_per_minute: int = 0  # 0 = unlimited
+
+    # Background analysis (keeps sentiment/DeepSeek calls off the event thread)
+    analysis_max_workers: int = 2  # 0 = run analysis inline on the event thread
+    analysis_result_poll_sec: float = 1.0  # How often finished analyses are applied
+    max_signal_price_drift_pct: float = 0.005  # Drop signals if price moved more during analysis (0 = off)
+    speculative_lead_sec: float = 0.0  # Start analysis this long before bar close on the forming bar (0 = off)
+
+    # Startup
+    prefetch_bars: int = 200  # Historical bars loaded on start (paged beyond Binance's 1500 limit)
 
 
 class DeepSeekAIStrategy(Strategy):
@@ -171,6 +234,7 @@ class DeepSeekAIStrategy(Strategy):
         self.enable_auto_sl_tp = config.enable_auto_sl_tp
         self.sl_use_support_resistance = config.sl_use_support_resistance
         self.sl_buffer_pct = config.sl_buffer_pct
+        self.sl_sr_lookback = config.sl_sr_lookback
         self.tp_pct_config = {
             'HIGH': config.tp_high_confidence_pct,
             'MEDIUM': config.tp_medium_confidence_pct,
@@ -192,6 +256,15 @@ class DeepSeekAIStrategy(Strategy):
         self.trailing_activation_pct = config.trailing_activation_pct
         self.trailing_distance_pct = config.trailing_distance_pct
         self.trailing_update_threshold_pct = config.trailing_update_threshold_pct
+        self.trailing_price_source = config.trailing_price_source
+        if self.trailing_price_source not in ("quote", "bar_1m", ""):
+            raise ValueError(f"Unknown trailing_price_source: {self.trailing_price_source}")
+        self.trailing_engine = TrailingStopEngine(
+            activation_pct=config.trailing_activation_pct,
+            distance_pct=config.trailing_distance_pct,
+            update_threshold_pct=config.trailing_update_threshold_pct,
+            logger=self.log,
+        )
         
         # Track trailing stop state for each position
         self.trailing_stop_state: Dict[str, Dict[str, Any]] = {}
@@ -206,29 +279,98 @@ class DeepSeekAIStrategy(Strategy):
         #   }
         # }
 
-        # Technical indicators manager
-        sma_periods = config.sma_periods if config.sma_periods else [5, 20, 50]
-        self.indicator_manager = TechnicalIndicatorManager(
-            sma_periods=sma_periods,
-            ema_periods=[config.macd_fast, config.macd_slow],
-            rsi_period=config.rsi_period,
-            macd_fast=config.macd_fast,
-            macd_slow=config.macd_slow,
-            bb_period=config.bb_period,
-            bb_std=config.bb_std,
+        # Per-instrument state: the primary instrument plus any additional ones
+        self.instrument_contexts: Dict[InstrumentId, InstrumentContext] = {}
+        self.instrument_contexts[self.instrument_id] = self._create_instrument_context(
+            self.instrument_id, self.bar_type
         )
+        for instrument_id_str in config.additional_instrument_ids:
+            instrument_id = InstrumentId.from_str(instrument_id_str)
+            if instrument_id in self.instrument_contexts:
+                continue
+            bar_type = BarType(instrument_id, self.bar_type.spec, self.bar_type.aggregation_source)
+            self.instrument_contexts[instrument_id] = self._create_instrument_context(instrument_id, bar_type)
+
+        self._primary_context = self.instrument_contexts[self.instrument_id]
+        self._active_context: Optional[InstrumentContext] = None
+        self.analysis_scheduler: Optional[AnalysisScheduler] = None
+        self.analysis_pipeline: Optional[AnalysisPipeline] = None
+        self.max_signal_price_drift_pct = config.max_signal_price_drift_pct
+        self.sentiment_deadline_sec = config.sentiment_deadline_sec
+        self.execute_provisional_signals = config.execute_provisional_signals
+
+        # Bar-close driven analysis (the analysis timer then only acts as a watchdog)
+        self.analysis_trigger_bars = config.analysis_trigger_bars
+        self.analysis_trigger_stats = {'bar': 0, 'coalesced': 0, 'watchdog': 0}
+
+        # Speculative analyses started before bar close, keyed by instrument
+        self.speculative_lead_sec = config.speculative_lead_sec
+        self.speculation = SpeculationTracker()
+
+        # Provisional (streamed) signals already acted on, keyed by instrument
+        self._provisional_signals: Dict[str, Dict[str, Any]] = {}
+
+        # Per-stage timings (ms) of the latest analysis, keyed by instrument
+        self.analysis_timings: Dict[str, Dict[str, float]] = {}
+
+        # Change-detection gate in front of the DeepSeek call
+        self.change_gate: Optional[ChangeDetectionGate] = None
+        if config.change_gate_enabled:
+            self.change_gate = ChangeDetectionGate(
+                price_move_pct=config.gate_price_move_pct,
+                rsi_levels=config.gate_rsi_levels,
+                sr_break=config.gate_on_sr_break,
+                macd_flip=config.gate_on_macd_flip,
+                position_change=config.gate_on_position_change,
+                max_signal_age_sec=config.gate_max_signal_age_sec,
+            )
+
+        if self._primary_context.timeframe_bank.timeframes:
+            self.log.info(
+                f"Higher timeframes enabled: {', '.join(self._primary_context.timeframe_bank.timeframes)}"
+            )
+        if len(self.instrument_contexts) > 1:
+            self.log.info(
+                f"Multi-instrument mode: {', '.join(str(i) for i in self.instrument_contexts)}"
+            )
 
         # DeepSeek AI analyzer
         api_key = config.deepseek_api_key or os.getenv('DEEPSEEK_API_KEY')
         if not api_key:
             raise ValueError("DeepSeek API key not provided")
 
-        self.deepseek = DeepSeekAnalyzer(
+        self.deepseek = AsyncDeepSeekAnalyzer(
             api_key=api_key,
             model=config.deepseek_model,
+            base_url=config.deepseek_base_url,
             temperature=config.deepseek_temperature,
             max_retries=config.deepseek_max_retries,
+            timeout_sec=config.deepseek_timeout_sec,
+            stream=config.deepseek_stream,
+            prompt_mode=config.deepseek_prompt_mode,
+            hedge_quantile=config.deepseek_hedge_quantile,
+            hedge_min_samples=config.deepseek_hedge_min_samples,
+            decision_deadline_sec=config.deepseek_decision_deadline_sec,
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=config.ai_breaker_failure_threshold,
+                p95_latency_sec=config.ai_breaker_p95_latency_sec,
+                open_sec=config.ai_breaker_open_sec,
+                max_open_sec=config.ai_breaker_max_open_sec,
+            ) if config.ai_breaker_failure_threshold > 0 else None,
+            cache=SignalCache(
+                ttl_sec=config.ai_cache_ttl_sec,
+                max_entries=config.ai_cache_max_entries,
+                db_path=config.ai_cache_db_path or None,
+                price_band_pct=config.ai_cache_price_band_pct,
+                rsi_bucket=config.ai_cache_rsi_bucket,
+            ) if config.ai_cache_ttl_sec > 0 and not config.ai_replay_path else None,
+            record_log=DecisionLog(config.ai_record_path) if config.ai_record_path else None,
+            replay_log=DecisionLog(config.ai_replay_path, mode="replay") if config.ai_replay_path else None,
         )
+        if config.ai_replay_path:
+            self.log.info(
+                f"Replaying {len(self.deepseek.replay_log)} recorded AI decisions from {config.ai_replay_path}"
+            )
         
         # Telegram Bot
         self.telegram_bot = None
@@ -342,40 +484,165 @@ class DeepSeekAIStrategy(Strategy):
         else:
             self.sentiment_fetcher = None
 
-        # State tracking
+        # State tracking (mirrors the active instrument context)
         self.instrument: Optional[Instrument] = None
         self.last_signal: Optional[Dict[str, Any]] = None
-        self.bars_received = 0
+        self._activate_instrument(self._primary_context)
 
         self.log.info(f"DeepSeek AI Strategy initialized for {self.instrument_id}")
 
-    def on_start(self):
-        """Actions to be performed on strategy start."""
-        self.log.info("Starting DeepSeek AI Strategy...")
+    def _create_instrument_context(self, instrument_id: InstrumentId, bar_type: BarType) -> InstrumentContext:
+        """Create indicator state for one instrument."""
+        config = self.config
+        sma_periods = config.sma_periods if config.sma_periods else [5, 20, 50]
 
-        # Load instrument
-        self.instrument = self.cache.instrument(self.instrument_id)
-        if self.instrument is None:
-            self.log.error(f"Could not find instrument {self.instrument_id}")
-            self.stop()
-            return
+        # Technical indicators manager
+        indicator_manager = TechnicalIndicatorManager(
+            sma_periods=sma_periods,
+            ema_periods=[config.macd_fast, config.macd_slow],
+            rsi_period=config.rsi_period,
+            macd_fast=config.macd_fast,
+            macd_slow=config.macd_slow,
+            bb_period=config.bb_period,
+            bb_std=config.bb_std,
+            extra_bb_periods=list(config.bb_extra_periods),
+            support_resistance_lookback=config.support_resistance_lookback,
+            extra_sr_lookbacks=list(config.sr_extra_lookbacks) + (
+                [config.sl_sr_lookback] if config.sl_sr_lookback else []
+            ),
+        )
 
-        self.log.info(f"Loaded instrument: {self.instrument.id}")
+        # Higher-timeframe indicator bank (aggregated from the base bar stream)
+        timeframe_bank = MultiTimeframeIndicatorBank(
+            base_interval_sec=int(bar_type.spec.timedelta.total_seconds()),
+            timeframes=list(config.higher_timeframes),
+            manager_kwargs={
+                'sma_periods': sma_periods,
+                'ema_periods': [config.macd_fast, config.macd_slow],
+                'rsi_period': config.rsi_period,
+                'macd_fast': config.macd_fast,
+                'macd_slow': config.macd_slow,
+                'bb_period': config.bb_period,
+                'bb_std': config.bb_std,
+                'support_resistance_lookback': config.support_resistance_lookback,
+            },
+        )
 
-        # Pre-fetch historical bars before subscribing to live data
-        self._prefetch_historical_bars(limit=200)
+        # Pre-rendered K-line prompt lines (one line rendered per closed bar)
+        kline_renderer = KlinePromptRenderer(
+            mode=config.deepseek_prompt_mode, max_bars=config.prompt_kline_count,
+        )
 
-        # Subscribe to bars (live data)
-        self.subscribe_bars(self.bar_type)
-        self.log.info(f"Subscribed to {self.bar_type}")
+        return InstrumentContext(instrument_id, bar_type, indicator_manager, timeframe_bank, kline_renderer)
 
-        # Set up timer for periodic analysis
+    def _activate_instrument(self, ctx: InstrumentContext):
+        """
+        Point the single-instrument attributes (instrument_id, bar_type, instrument,
+        indicator_manager, latest_* data, ...) at one instrument's context.
+
+        Analysis, order and trailing stop helpers operate on the active
+        instrument, so multi-instrument mode switches context before calling them.
+        """
+        active = self._active_context
+        if active is ctx:
+            return
+
+        # Save state written by the helpers back to the outgoing context
+        if active is not None:
+            active.instrument = self.instrument
+            active.last_signal = self.last_signal
+            active.latest_signal_data = self.latest_signal_data
+            active.latest_technical_data = self.latest_technical_data
+            active.latest_price_data = self.latest_price_data
+
+        self.instrument_id = ctx.instrument_id
+        self.bar_type = ctx.bar_type
+        self.instrument = ctx.instrument
+        self.indicator_manager = ctx.indicator_manager
+        self.timeframe_bank = ctx.timeframe_bank
+        self.last_signal = ctx.last_signal
+        self.latest_signal_data = ctx.latest_signal_data
+        self.latest_technical_data = ctx.latest_technical_data
+        self.latest_price_data = ctx.latest_price_data
+        self._active_context = ctx
+
+    def on_start(self):
+        """Actions to be performed on strategy start."""
+        self.log.info("Starting DeepSeek AI Strategy...")
+
+        for ctx in list(self.instrument_contexts.values()):
+            self._activate_instrument(ctx)
+
+            # Load instrument
+            self.instrument = self.cache.instrument(self.instrument_id)
+            if self.instrument is None:
+                self.log.error(f"Could not find instrument {self.instrument_id}")
+                if ctx is self._primary_context:
+                    self.stop()
+                    return
+                del self.instrument_contexts[ctx.instrument_id]
+                continue
+
+            self.log.info(f"Loaded instrument: {self.instrument.id}")
+
+            # Pre-fetch historical bars before subscribing to live data
+            self._prefetch_historical_bars(limit=self._prefetch_limit(ctx))
+
+            # Subscribe to bars (live data)
+            self.subscribe_bars(self.bar_type)
+            self.log.info(f"Subscribed to {self.bar_type}")
+
+            # Trade ticks build the forming bar for speculative analysis
+            if self.speculative_lead_sec > 0 and self.config.analysis_max_workers > 0:
+                self.subscribe_trade_ticks(self.instrument_id)
+
+            # Quotes: live price for the staleness guard and the trailing stop feed
+            if self._quote_feed_enabled:
+                self.subscribe_quote_ticks(self.instrument_id)
+
+            # Trailing stops follow their own price feed, independent of the analysis loop
+            if self.enable_trailing_stop and self.trailing_price_source == "bar_1m":
+                trailing_bar_type = BarType.from_str(f"{self.instrument_id}-1-MINUTE-LAST-EXTERNAL")
+                if trailing_bar_type != ctx.bar_type:  # 1-minute strategy bars feed it directly
+                    ctx.trailing_bar_type = trailing_bar_type
+                    self.subscribe_bars(trailing_bar_type)
+
+        self._activate_instrument(self._primary_context)
+
+        # Set up timer for periodic analysis, staggered across instruments
+        self.analysis_scheduler = AnalysisScheduler(
+            keys=[ctx.key for ctx in self.instrument_contexts.values()],
+            interval_sec=self.config.timer_interval_sec,
+            max_calls_per_minute=self.config.max_ai_calls_per_minute,
+        )
+        self.analysis_scheduler.start(self.clock.timestamp_ns())
         self.clock.set_timer(
             name="analysis_timer",
-            interval=timedelta(seconds=self.config.timer_interval_sec),
+            interval=timedelta(seconds=self.analysis_scheduler.tick_interval_sec),
             callback=self.on_timer,
         )
 
+        # Background analysis pipeline; finished signals are applied by a short poll timer
+        if self.config.analysis_max_workers > 0:
+            self.analysis_pipeline = AnalysisPipeline(max_workers=self.config.analysis_max_workers)
+            self.clock.set_timer(
+                name="analysis_results_timer",
+                interval=timedelta(seconds=self.config.analysis_result_poll_sec),
+                callback=self._drain_analysis_results,
+            )
+            if self.speculative_lead_sec > 0:
+                self.log.info(
+                    f"🔮 Speculative analysis enabled: {self.speculative_lead_sec:.0f}s before bar close"
+                )
+        elif self.speculative_lead_sec > 0:
+            self.log.warning("Speculative analysis needs analysis_max_workers > 0, disabled")
+
+        if self.analysis_trigger_bars:
+            self.log.info(
+                f"📊 Bar-driven analysis every {self.analysis_trigger_bars} closed bar(s), "
+                f"watchdog after {self._watchdog_sec():.0f}s"
+            )
+
         self.log.info("Strategy started successfully")
 
         # Record start time for uptime tracking
@@ -407,14 +674,57 @@ class DeepSeekAIStrategy(Strategy):
         """Actions to be performed on strategy stop."""
         self.log.info("Stopping DeepSeek AI Strategy...")
 
-        # Cancel any pending orders
-        self.cancel_all_orders(self.instrument_id)
-
-        # Unsubscribe from data
-        self.unsubscribe_bars(self.bar_type)
+        # Stop background analysis (in-flight results are discarded)
+        self.speculation.clear()
+        if self.analysis_pipeline:
+            self.analysis_pipeline.shutdown(wait=False)
+            self.analysis_pipeline = None
+
+        for ctx in self.instrument_contexts.values():
+            # Cancel any pending orders
+            self.cancel_all_orders(ctx.instrument_id)
+
+            # Unsubscribe from data
+            self.unsubscribe_bars(ctx.bar_type)
+            if self.speculative_lead_sec > 0 and self.config.analysis_max_workers > 0:
+                self.unsubscribe_trade_ticks(ctx.instrument_id)
+            if self._quote_feed_enabled:
+                self.unsubscribe_quote_ticks(ctx.instrument_id)
+            if ctx.trailing_bar_type is not None:
+                self.unsubscribe_bars(ctx.trailing_bar_type)
+
+        metrics = self.deepseek.get_metrics()
+        if metrics['decisions']:
+            latency = metrics['latency_sec']
+            self.log.info(
+                f"📊 AI metrics: {metrics['decisions']} decisions {metrics['by_source']}, "
+                f"latency p50/p95/p99 {latency['p50'] or 0:.1f}/{latency['p95'] or 0:.1f}/{latency['p99'] or 0:.1f}s, "
+                f"tokens {metrics['prompt_tokens']['total']} in / {metrics['completion_tokens']['total']} out, "
+                f"{metrics['retries']} retries, {metrics['repaired']} repaired, "
+                f"fallback rate {metrics['fallback_rate']:.1%}"
+            )
 
         self.log.info("Strategy stopped")
 
+    def on_dispose(self):
+        """Release the DeepSeek connection pool."""
+        self.deepseek.close()
+
+    def _prefetch_limit(self, ctx: InstrumentContext) -> int:
+        """
+        Bars to pre-fetch: prefetch_bars, raised so the slowest higher
+        timeframe initializes right after start.
+        """
+        required = ctx.timeframe_bank.required_base_bars()
+        limit = max([self.config.prefetch_bars, *required.values()])
+        if limit > self.config.prefetch_bars:
+            slowest = max(required, key=required.get)
+            self.log.info(
+                f"📡 Pre-fetch raised to {limit} bars (prefetch_bars={self.config.prefetch_bars}) "
+                f"so the {slowest} indicators initialize"
+            )
+        return limit
+
     def _prefetch_historical_bars(self, limit: int = 200):
         """
         Pre-fetch historical bars from Binance API on startup.
@@ -429,6 +739,7 @@ class DeepSeekAIStrategy(Strategy):
         """
         try:
             import requests
+            import numpy as np
             from nautilus_trader.core.datetime import millis_to_nanos
 
             # Extract symbol from instrument_id
@@ -458,17 +769,33 @@ class DeepSeekAIStrategy(Strategy):
                 f"(symbol={symbol}, interval={interval})..."
             )
 
-            # Binance Futures API endpoint
+            # Binance Futures API endpoint (max 1500 klines per request, page backwards)
             url = "https://fapi.binance.com/fapi/v1/klines"
-            params = {
-                'symbol': symbol,
-                'interval': interval,
-                'limit': min(limit, 1500),  # Binance max
-            }
+            klines: List[list] = []
+            end_time: Optional[int] = None
+            while len(klines) < limit:
+                params = {
+                    'symbol': symbol,
+                    'interval': interval,
+                    'limit': min(limit - len(klines), 1500),  # Binance max
+                }
+                if end_time is not None:
+                    params['endTime'] = end_time
 
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            klines = response.json()
+                response = requests.get(url, params=params, timeout=10)
+                response.raise_for_status()
+                page = response.json()
+                if not page:
+                    break
+
+                klines = page + klines
+                end_time = int(page[0][0]) - 1
+                if len(page) < params['limit']:
+                    break
+
+            # Drop the still-forming kline; its closed bar arrives via the live subscription
+            now_ms = self.clock.timestamp_ms()
+            klines = [kline for kline in klines if int(kline[6]) < now_ms]
 
             if not klines:
                 self.log.warning("⚠️ No bars received from Binance API")
@@ -476,35 +803,36 @@ class DeepSeekAIStrategy(Strategy):
 
             self.log.info(f"📊 Received {len(klines)} bars from Binance")
 
-            # Convert to NautilusTrader bars and feed to indicators
-            bars_fed = 0
-            for kline in klines:
-                try:
-                    # Create Bar object
-                    bar = Bar(
-                        bar_type=self.bar_type,
-                        open=self.instrument.make_price(float(kline[1])),
-                        high=self.instrument.make_price(float(kline[2])),
-                        low=self.instrument.make_price(float(kline[3])),
-                        close=self.instrument.make_price(float(kline[4])),
-                        volume=self.instrument.make_qty(float(kline[5])),
-                        ts_event=millis_to_nanos(kline[0]),
-                        ts_init=millis_to_nanos(kline[0]),
-                    )
-
-                    # Feed to indicator manager
-                    self.indicator_manager.update(bar)
-                    bars_fed += 1
-
-                except Exception as e:
-                    self.log.warning(f"Failed to convert kline to bar: {e}")
-                    continue
+            # Columnar OHLCV arrays -> vectorized indicator warm-up
+            rows = np.array([kline[:6] for kline in klines], dtype=np.float64)
+            ohlcv_arrays = {
+                # Bar close time (kline close_time is inclusive, e.g. ...:14:59.999)
+                'ts': np.array([millis_to_nanos(kline[6] + 1) for kline in klines], dtype=np.int64),
+                'open': rows[:, 1],
+                'high': rows[:, 2],
+                'low': rows[:, 3],
+                'close': rows[:, 4],
+                'volume': rows[:, 5],
+            }
+            self.indicator_manager.warm_up(ohlcv_arrays)
+            self.timeframe_bank.warm_up(ohlcv_arrays)
+            self._active_context.kline_renderer.warm_up(ohlcv_arrays)
 
             self.log.info(
-                f"✅ Pre-fetched {bars_fed} bars successfully! "
+                f"✅ Pre-fetched {len(klines)} bars successfully! "
                 f"Indicators ready: {self.indicator_manager.is_initialized()}"
             )
 
+            waiting = [
+                timeframe for timeframe, manager in self.timeframe_bank.managers.items()
+                if not manager.is_initialized()
+            ]
+            if waiting:
+                self.log.warning(
+                    f"⚠️ Higher timeframes {', '.join(waiting)} not initialized from history, "
+                    f"they join the prompt once enough live bars arrived"
+                )
+
         except Exception as e:
             self.log.error(f"❌ Failed to pre-fetch bars from Binance: {e}")
             self.log.warning("Continuing with live bars only...")
@@ -518,75 +846,436 @@ class DeepSeekAIStrategy(Strategy):
         bar : Bar
             The bar received
         """
-        self.bars_received += 1
+        ctx = self.instrument_contexts.get(bar.bar_type.instrument_id)
+        if ctx is None:
+            return
+
+        # 1-minute bars of the trailing stop feed do not touch the indicators
+        if ctx.trailing_bar_type is not None and bar.bar_type == ctx.trailing_bar_type:
+            ctx.trailing_feed_ts_ns = bar.ts_event
+            self._on_trailing_bar(ctx, bar)
+            return
+
+        ctx.bars_received += 1
+        if self.enable_trailing_stop and self.trailing_price_source:
+            if self.trailing_price_source == "bar_1m" and ctx.trailing_bar_type is None:
+                self._on_trailing_bar(ctx, bar)
+            elif not self._trailing_feed_live(ctx, bar.ts_event):
+                # No feed price during this bar (e.g. bar-only backtest): trail on the bar instead
+                if ctx.key in self.trailing_stop_state and not ctx.trailing_fallback_warned:
+                    ctx.trailing_fallback_warned = True
+                    self.log.warning(
+                        f"⚠️ No {self.trailing_price_source} prices for {ctx.key}, "
+                        f"trailing stop falls back to bar closes"
+                    )
+                self._on_trailing_bar(ctx, bar)
 
         # Update technical indicators
-        self.indicator_manager.update(bar)
+        ctx.indicator_manager.update(bar)
+        ctx.timeframe_bank.update(bar)
+        ctx.kline_renderer.update_bar(bar)
 
         # Log bar data
-        if self.bars_received % 10 == 0:
+        if ctx.bars_received % 10 == 0:
             self.log.info(
-                f"Bar #{self.bars_received}: "
+                f"Bar #{ctx.bars_received} ({ctx.symbol}): "
                 f"O:{bar.open} H:{bar.high} L:{bar.low} C:{bar.close} V:{bar.volume}"
             )
 
+        ctx.forming_bar.reset()
+        ctx.bars_since_analysis += 1
+        if self.analysis_scheduler is None:  # not started (historical bars)
+            return
+
+        self._activate_instrument(ctx)
+        try:
+            resolved = self._speculation_enabled and self._resolve_speculation(ctx, bar)
+            if not resolved and self.analysis_trigger_bars and ctx.bars_since_analysis >= self.analysis_trigger_bars:
+                self.analysis_trigger_stats['bar'] += 1
+                self._trigger_analysis(ctx)
+            if self._speculation_enabled:
+                self._schedule_speculation(ctx, bar.ts_event)
+        except Exception as e:
+            self.log.error(f"❌ Analysis failed for {ctx.instrument_id}: {e}", exc_info=True)
+        self._activate_instrument(self._primary_context)
+
+    def _trigger_analysis(self, ctx: InstrumentContext):
+        """
+        Run an analysis for the active instrument, or coalesce the trigger.
+
+        A trigger arriving while the previous analysis is still in flight is
+        remembered once and run when that analysis has been applied.
+        """
+        if self.analysis_pipeline and self.analysis_pipeline.in_flight(ctx.key):
+            if not ctx.analysis_pending:
+                ctx.analysis_pending = True
+                self.analysis_trigger_stats['coalesced'] += 1
+                self.log.info(f"⏳ Analysis for {ctx.key} still in progress, running again when it finishes")
+            return
+        ctx.analysis_pending = False
+        self._run_analysis()
+
+    def on_quote_tick(self, tick: QuoteTick):
+        """Feed the quote mid to the trailing stop engine."""
+        ctx = self.instrument_contexts.get(tick.instrument_id)
+        if ctx is None:
+            return
+
+        ctx.trailing_feed_ts_ns = tick.ts_event
+        ctx.trailing_fallback_warned = False
+        if ctx.key in self.trailing_stop_state:
+            self._on_trailing_price(ctx, (float(tick.bid_price) + float(tick.ask_price)) / 2)
+
+    def _trailing_feed_live(self, ctx: InstrumentContext, bar_close_ns: int) -> bool:
+        """Whether the trailing price feed delivered a price during the bar closing at ``bar_close_ns``."""
+        interval_ns = int(ctx.bar_type.spec.timedelta.total_seconds() * 1e9)
+        return ctx.trailing_feed_ts_ns > bar_close_ns - interval_ns
+
+    def _on_trailing_bar(self, ctx: InstrumentContext, bar: Bar):
+        """Feed a 1-minute bar (close plus the favorable extreme) to the trailing stop engine."""
+        state = self.trailing_stop_state.get(ctx.key)
+        if state is not None:
+            extreme = float(bar.high) if state["side"] == "LONG" else float(bar.low)
+            self._on_trailing_price(ctx, float(bar.close), extreme)
+
+    def on_trade_tick(self, tick: TradeTick):
+        """Update the forming bar (speculative analysis only)."""
+        ctx = self.instrument_contexts.get(tick.instrument_id)
+        if ctx is not None:
+            ctx.forming_bar.update(float(tick.price), float(tick.size))
+
+    @property
+    def _speculation_enabled(self) -> bool:
+        return self.speculative_lead_sec > 0 and self.analysis_pipeline is not None
+
+    def _speculation_state_key(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        current_position: Optional[Dict[str, Any]],
+    ) -> str:
+        """Quantized market state a speculative analysis is confirmed against (signal cache features)."""
+        return quantize_market_state(
+            price_data, technical_data, current_position=current_position,
+            price_band_pct=self.config.ai_cache_price_band_pct,
+            rsi_bucket=self.config.ai_cache_rsi_bucket,
+        )
+
+    def _schedule_speculation(self, ctx: InstrumentContext, last_close_ns: int):
+        """
+        Set an alert ``speculative_lead_sec`` before the next bar close.
+
+        Only bars that are due (the ``analysis_trigger_bars``-th bar, or
+        ``timer_interval_sec`` after the last analysis in timer mode) are
+        speculated on.
+        """
+        interval_ns = int(ctx.bar_type.spec.timedelta.total_seconds() * 1e9)
+        close_ns = last_close_ns + interval_ns
+        if self.analysis_trigger_bars:
+            if ctx.bars_since_analysis + 1 < self.analysis_trigger_bars:
+                return
+        elif close_ns - ctx.last_analysis_ns < self.config.timer_interval_sec * 1_000_000_000:
+            return
+
+        alert_ns = close_ns - int(self.speculative_lead_sec * 1e9)
+        if alert_ns <= self.clock.timestamp_ns():
+            return
+        self.clock.set_time_alert_ns(
+            name=f"speculate:{ctx.key}:{close_ns}",
+            alert_time_ns=alert_ns,
+            callback=self._on_speculation_alert,
+        )
+
+    def _on_speculation_alert(self, event):
+        """Start the speculative analysis for the bar named in the alert."""
+        key, close_ns = event.name.split(':', 1)[1].rsplit(':', 1)
+        ctx = self.instrument_contexts.get(InstrumentId.from_str(key))
+        if ctx is None:
+            return
+
+        self._activate_instrument(ctx)
+        try:
+            self._start_speculation(ctx, int(close_ns))
+        except Exception as e:
+            self.log.error(f"❌ Speculative analysis failed for {ctx.instrument_id}: {e}", exc_info=True)
+        self._activate_instrument(self._primary_context)
+
+    def _start_speculation(self, ctx: InstrumentContext, bar_close_ns: int):
+        """
+        Analyse the forming bar ahead of its close for the active instrument.
+
+        The result is held by ``self.speculation`` until the real bar
+        arrives (see ``_resolve_speculation``).
+        """
+        forming = ctx.forming_bar
+        key = ctx.key
+        if forming.is_empty or not self.indicator_manager.is_initialized():
+            self.log.debug(f"No forming bar data for {key}, leaving analysis to bar close")
+            return
+        if self.analysis_pipeline.in_flight(key):
+            return
+
+        cycle_start = time.perf_counter()
+        current_price = forming.close
+        technical_data = self.indicator_manager.get_technical_data(current_price)
+        current_position = self._get_current_position_data()
+
+        # Change-detection gate: decided on the forming bar for this bar close
+        if self.change_gate is not None:
+            position_side = current_position['side'] if current_position else None
+            now_sec = self.clock.timestamp_ns() / 1e9
+            skip, _ = self.change_gate.should_skip(
+                key, self.last_signal, current_price, technical_data, position_side, now_sec,
+            )
+            if skip:
+                ctx.mark_analysed(bar_close_ns)
+                self._reuse_last_signal(key, current_price, technical_data, now_sec)
+                return
+
+        timings: Dict[str, float] = {}
+        sentiment_token = ctx.base_asset
+        sentiment_future = self._prefetch_sentiment(sentiment_token, timings)
+        timeframe_data = self.timeframe_bank.get_timeframe_data(current_price)
+
+        previous_close = self.indicator_manager.bar_buffer.latest('close')
+        price_data = {
+            'symbol': ctx.symbol,
+            'base_asset': ctx.base_asset,
+            'quote_asset': ctx.quote_asset,
+            'price': current_price,
+            'timestamp': self.clock.utc_now().isoformat(),
+            'high': forming.high,
+            'low': forming.low,
+            'volume': forming.volume,
+            'price_change': (current_price - previous_close) / previous_close * 100 if previous_close else 0.0,
+            'kline_text': ctx.kline_renderer.render(),
+            'kline_format': ctx.kline_renderer.mode,
+        }
+        timings['snapshot_ms'] = (time.perf_counter() - cycle_start) * 1000
+
+        def job() -> Dict[str, Any]:
+            return self._analysis_job(
+                price_data, technical_data, current_position, timeframe_data,
+                sentiment_token=sentiment_token,
+                sentiment_future=sentiment_future,
+                cycle_start=cycle_start,
+                timings=timings,
+            )
+
+        context = {'price_data': price_data, 'technical_data': technical_data, 'live_price': self._live_price()}
+        future = self.analysis_pipeline.speculate(key, job, context)
+        self.speculation.start(key, Speculation(
+            bar_close_ns=bar_close_ns,
+            state_key=self._speculation_state_key(price_data, technical_data, current_position),
+            future=future,
+            started_ns=self.clock.timestamp_ns(),
+            lead_sec=self.speculative_lead_sec,
+        ))
+        self.log.info(
+            f"🔮 Speculative analysis for {key} started on the forming bar "
+            f"(${current_price:,.2f}, {forming.trades} trades)"
+        )
+
+    def _resolve_speculation(self, ctx: InstrumentContext, bar: Bar) -> bool:
+        """
+        Confirm the pending speculative analysis against the closed bar.
+
+        The speculative signal is used when the closed bar has the same
+        quantized market state; otherwise a regular analysis is run.
+
+        Returns
+        -------
+        bool
+            False if no speculation was pending for the instrument
+        """
+        key = ctx.key
+        if key not in self.speculation:
+            return False
+
+        current_price = float(bar.close)
+        technical_data = self.indicator_manager.get_technical_data(current_price)
+        current_position = self._get_current_position_data()
+        price_data = {
+            'symbol': ctx.symbol,
+            'price': current_price,
+            'timestamp': self.clock.utc_now().isoformat(),
+            'high': float(bar.high),
+            'low': float(bar.low),
+            'volume': float(bar.volume),
+        }
+
+        speculation = self.speculation.resolve(
+            key, bar.ts_event, self._speculation_state_key(price_data, technical_data, current_position),
+        )
+        if speculation is None:
+            self.log.info(f"🔁 Market state changed since the speculative analysis, re-running for {key}")
+            self._trigger_analysis(ctx)
+            return True
+
+        ctx.mark_analysed(bar.ts_event)
+        if self.change_gate is not None:
+            position_side = current_position['side'] if current_position else None
+            self.change_gate.record(key, current_price, technical_data, position_side, bar.ts_event / 1e9)
+
+        stats = self.speculation.stats
+        self.log.info(
+            f"🔮 Speculative analysis confirmed for {key} "
+            f"({stats['confirmed']} confirmed, {stats['rerun']} re-run)"
+        )
+
+        # Apply with the closed bar's snapshot (staleness guard and SL/TP use the real close)
+        context = {'price_data': price_data, 'technical_data': technical_data, 'live_price': self._live_price()}
+
+        def confirmed(future: Future) -> AnalysisResult:
+            result = future.result()
+            value = result.value
+            if result.ok:
+                value = dict(value, signal_data=dict(value['signal_data'], speculative=True))
+            return AnalysisResult(key, value=value, error=result.error, context=context,
+                                  elapsed_sec=result.elapsed_sec)
+
+        if speculation.future.done():
+            self._apply_analysis_result(confirmed(speculation.future))
+        else:
+            pipeline = self.analysis_pipeline
+            speculation.future.add_done_callback(
+                lambda future: None if future.cancelled() else pipeline.publish(confirmed(future))
+            )
+        return True
+
     def on_timer(self, event):
         """
         Periodic analysis and trading logic.
 
-        Called every timer_interval_sec seconds (default: 15 minutes).
+        The timer fires every timer_interval_sec / N seconds for N instruments;
+        the analysis scheduler picks the instrument(s) due, so each instrument
+        is analysed once per timer_interval_sec (default: 15 minutes).
+
+        With bar-driven or speculative analysis the timer is only a watchdog
+        for instruments whose bars stopped triggering analyses.
+        """
+        now_ns = self.clock.timestamp_ns()
+        for key in self.analysis_scheduler.due(now_ns):
+            ctx = self.instrument_contexts.get(InstrumentId.from_str(key))
+            if ctx is None:
+                continue
+
+            watchdog_sec = self._watchdog_sec()
+            if watchdog_sec:
+                if key in self.speculation or now_ns - ctx.last_analysis_ns < watchdog_sec * 1_000_000_000:
+                    continue
+                self.analysis_trigger_stats['watchdog'] += 1
+                self.log.warning(f"🐕 No analysis for {key} in {watchdog_sec:.0f}s, running from watchdog")
+
+            self._activate_instrument(ctx)
+            try:
+                self._run_analysis()
+            except Exception as e:
+                self.log.error(f"❌ Analysis failed for {ctx.instrument_id}: {e}", exc_info=True)
+
+        self._activate_instrument(self._primary_context)
+
+    def _watchdog_sec(self) -> float:
+        """Watchdog age for the analysis timer (0 = plain timer mode)."""
+        if self.analysis_trigger_bars:
+            bar_sec = self.bar_type.spec.timedelta.total_seconds()
+            return self.config.analysis_watchdog_sec or 2 * self.analysis_trigger_bars * bar_sec
+        if self._speculation_enabled:
+            return self.config.timer_interval_sec
+        return 0.0
+
+    def _run_analysis(self):
+        """
+        Run one analysis and trading cycle for the active instrument.
+
+        Market data is snapshotted here on the event thread; the blocking
+        sentiment and DeepSeek calls run on the analysis pipeline (or inline
+        when analysis_max_workers is 0) and the signal is applied in
+        ``_apply_analysis_result``.
         """
         self.log.info("=" * 60)
-        self.log.info("Running periodic analysis...")
+        self.log.info(f"Running periodic analysis for {self.instrument_id}...")
+        cycle_start = time.perf_counter()
+
+        # Skip if the previous analysis for this instrument is still running
+        if self.analysis_pipeline and self.analysis_pipeline.in_flight(str(self.instrument_id)):
+            self.log.warning("⏳ Previous analysis still in progress, skipping this cycle")
+            return
 
         # Check if indicators are ready
         if not self.indicator_manager.is_initialized():
             self.log.warning("Indicators not yet initialized, skipping analysis")
             return
+        self._active_context.mark_analysed(self.clock.timestamp_ns())
 
         # Get current market data
-        current_bar = self.indicator_manager.recent_bars[-1] if self.indicator_manager.recent_bars else None
-        if not current_bar:
+        bars = self.indicator_manager.bar_buffer
+        if not len(bars):
             self.log.warning("No bars available for analysis")
             return
 
-        current_price = float(current_bar.close)
+        current_price = bars.latest('close')
 
         # Get technical data
         try:
             technical_data = self.indicator_manager.get_technical_data(current_price)
-            self.log.debug(f"Technical data retrieved: {len(technical_data)} indicators")
+            self.log.debug(
+                f"Technical data retrieved: {len(technical_data)} indicators "
+                f"(snapshot cache: {self.indicator_manager.get_snapshot_stats()})"
+            )
         except Exception as e:
             self.log.error(f"Failed to get technical data: {e}")
             return
 
-        # Get K-line data
-        kline_data = self.indicator_manager.get_kline_data(count=10)
-        self.log.debug(f"Retrieved {len(kline_data)} K-lines for analysis")
-
-        # Get sentiment data
-        sentiment_data = None
-        if self.sentiment_enabled and self.sentiment_fetcher:
-            try:
-                sentiment_data = self.sentiment_fetcher.fetch()
-                if sentiment_data:
-                    self.log.info(self.sentiment_fetcher.format_for_display(sentiment_data))
-            except Exception as e:
-                self.log.warning(f"Failed to fetch sentiment data: {e}")
+        # Get current position
+        current_position = self._get_current_position_data()
+        key = str(self.instrument_id)
+
+        # Change-detection gate: reuse a HOLD while nothing material changed
+        if self.change_gate is not None:
+            position_side = current_position['side'] if current_position else None
+            now_sec = self.clock.timestamp_ns() / 1e9
+            skip, fired = self.change_gate.should_skip(
+                key, self.last_signal, current_price, technical_data, position_side, now_sec,
+            )
+            if skip:
+                self._reuse_last_signal(key, current_price, technical_data, now_sec)
+                return
+            self.change_gate.record(key, current_price, technical_data, position_side, now_sec)
+            self.log.debug(f"Change gate triggers: {', '.join(fired)}")
+
+        # Start the sentiment fetch; it runs while the remaining snapshots are taken
+        timings: Dict[str, float] = {}
+        sentiment_token = self._active_context.base_asset
+        sentiment_future = self._prefetch_sentiment(sentiment_token, timings)
+
+        # Higher-timeframe context (only initialized timeframes)
+        timeframe_data = self.timeframe_bank.get_timeframe_data(current_price)
+
+        # Pre-rendered K-line section (only the newest bar was rendered since last time)
+        kline_renderer = self._active_context.kline_renderer
+        kline_text = kline_renderer.render()
+        self.log.debug(
+            f"Rendered {len(kline_renderer)} K-lines for analysis "
+            f"({kline_renderer.stats['last_render_ms']:.3f}ms)"
+        )
 
         # Build price data for AI
         price_data = {
+            'symbol': self._active_context.symbol,
+            'base_asset': self._active_context.base_asset,
+            'quote_asset': self._active_context.quote_asset,
             'price': current_price,
             'timestamp': self.clock.utc_now().isoformat(),
-            'high': float(current_bar.high),
-            'low': float(current_bar.low),
-            'volume': float(current_bar.volume),
+            'high': bars.latest('high'),
+            'low': bars.latest('low'),
+            'volume': bars.latest('volume'),
             'price_change': self._calculate_price_change(),
-            'kline_data': kline_data,
+            'kline_text': kline_text,
+            'kline_format': kline_renderer.mode,
         }
 
-        # Get current position
-        current_position = self._get_current_position_data()
+        timings['snapshot_ms'] = (time.perf_counter() - cycle_start) * 1000
 
         # Log current state
         self.log.info(f"Current Price: ${current_price:,.2f}")
@@ -598,43 +1287,256 @@ class DeepSeekAIStrategy(Strategy):
                 f"{current_position['quantity']} @ ${current_position['avg_px']:.2f}"
             )
 
+        # Live price at snapshot time: the staleness guard compares against it
+        context = {'price_data': price_data, 'technical_data': technical_data, 'live_price': self._live_price()}
+
+        # Streamed decisions are handed to the strategy thread before the full response
+        on_decision = None
+        if self.execute_provisional_signals and self.analysis_pipeline is not None:
+            pipeline = self.analysis_pipeline
+
+            def on_decision(decision: Dict[str, Any]):
+                pipeline.publish(AnalysisResult(
+                    key, value={'signal_data': decision, 'provisional': True}, context=context,
+                ))
+
+        def job() -> Dict[str, Any]:
+            return self._analysis_job(
+                price_data, technical_data, current_position, timeframe_data,
+                sentiment_token=sentiment_token,
+                sentiment_future=sentiment_future,
+                cycle_start=cycle_start,
+                timings=timings,
+                on_decision=on_decision,
+            )
+
+        if self.analysis_pipeline is None:
+            try:
+                result = AnalysisResult(key, value=job(), context=context)
+            except Exception as e:
+                result = AnalysisResult(key, error=e, context=context)
+            self._apply_analysis_result(result)
+        else:
+            self.analysis_pipeline.submit(key, job, context)
+            self.log.info("Calling DeepSeek AI for analysis (background)...")
+
+    def _reuse_last_signal(
+        self,
+        key: str,
+        current_price: float,
+        technical_data: Dict[str, Any],
+        now_sec: float,
+    ):
+        """Apply the previous HOLD again instead of calling DeepSeek (gate skip)."""
+        age = self.change_gate.signal_age(key, now_sec) or 0.0
+        signal_data = dict(self.last_signal, reused=True, signal_age_sec=age)
+        self.log.info(
+            f"⏭️ No material change since last analysis, reusing {signal_data['signal']} "
+            f"({age:.0f}s old, {self.change_gate.stats['skipped']} calls skipped)"
+        )
+        context = {
+            'price_data': {'price': current_price, 'timestamp': self.clock.utc_now().isoformat()},
+            'technical_data': technical_data,
+        }
+        self._apply_analysis_result(AnalysisResult(key, value={'signal_data': signal_data}, context=context))
+
+    def _analysis_job(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        current_position: Optional[Dict[str, Any]],
+        timeframe_data: Dict[str, Dict[str, Any]],
+        sentiment_token: str = "BTC",
+        sentiment_future: Optional[Future] = None,
+        cycle_start: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Blocking part of an analysis: collect sentiment and call DeepSeek.
+
+        Runs on an analysis worker thread; it must only read the snapshots
+        passed in, never strategy or cache state.
+
+        Parameters
+        ----------
+        sentiment_future : Future, optional
+            Sentiment fetch started by ``_prefetch_sentiment``; waited on until
+            ``sentiment_deadline_sec`` after ``cycle_start``, then left out
+        cycle_start : float, optional
+            ``time.perf_counter()`` at the start of the analysis cycle
+        timings : Dict, optional
+            Per-stage timings (ms), filled in place
+        on_decision : Callable, optional
+            Receives the provisional streamed decision (see DeepSeekAnalyzer.analyze)
+        """
+        timings = timings if timings is not None else {}
+        cycle_start = cycle_start if cycle_start is not None else time.perf_counter()
+
+        # Get sentiment data
+        sentiment_data = None
+        if sentiment_future is not None:
+            remaining = self.sentiment_deadline_sec - (time.perf_counter() - cycle_start)
+            try:
+                sentiment_data = sentiment_future.result(timeout=max(remaining, 0.0))
+            except FuturesTimeoutError:
+                timings['sentiment_skipped'] = 1.0
+                self.log.warning(
+                    f"⏱️ Sentiment not ready within {self.sentiment_deadline_sec:.1f}s, analysing without it"
+                )
+            except Exception as e:
+                self.log.warning(f"Failed to fetch sentiment data: {e}")
+        elif self.sentiment_enabled and self.sentiment_fetcher:
+            fetch_start = time.perf_counter()
+            try:
+                sentiment_data = self.sentiment_fetcher.fetch(token=sentiment_token)
+            except Exception as e:
+                self.log.warning(f"Failed to fetch sentiment data: {e}")
+            timings['sentiment_ms'] = (time.perf_counter() - fetch_start) * 1000
+
+        if sentiment_data:
+            self.log.info(self.sentiment_fetcher.format_for_display(sentiment_data))
+        timings['inputs_ready_ms'] = (time.perf_counter() - cycle_start) * 1000
+
         # Analyze with DeepSeek AI
-        try:
-            self.log.info("Calling DeepSeek AI for analysis...")
-            signal_data = self.deepseek.analyze(
-                price_data=price_data,
-                technical_data=technical_data,
-                sentiment_data=sentiment_data,
-                current_position=current_position,
+        self.log.info("Calling DeepSeek AI for analysis...")
+        ai_start = time.perf_counter()
+        signal_data = self.deepseek.analyze(
+            price_data=price_data,
+            technical_data=technical_data,
+            sentiment_data=sentiment_data,
+            current_position=current_position,
+            timeframe_data=timeframe_data,
+            on_decision=on_decision,
+        )
+        timings['ai_ms'] = (time.perf_counter() - ai_start) * 1000
+        if 'time_to_decision_sec' in signal_data:
+            timings['first_decision_ms'] = signal_data['time_to_decision_sec'] * 1000
+        timings['total_ms'] = (time.perf_counter() - cycle_start) * 1000
+
+        # Copy: a sentiment fetch that missed the deadline may still write its timing later
+        return {'signal_data': signal_data, 'sentiment_data': sentiment_data, 'timings': dict(timings)}
+
+    def _prefetch_sentiment(self, token: str, timings: Dict[str, float]) -> Optional[Future]:
+        """
+        Start the sentiment fetch on the analysis pipeline.
+
+        Returns None when sentiment is disabled or analysis runs inline
+        (the job then fetches sentiment itself).
+        """
+        if not (self.sentiment_enabled and self.sentiment_fetcher and self.analysis_pipeline):
+            return None
+
+        def fetch():
+            fetch_start = time.perf_counter()
+            try:
+                return self.sentiment_fetcher.fetch(token=token)
+            finally:
+                timings['sentiment_ms'] = (time.perf_counter() - fetch_start) * 1000
+
+        return self.analysis_pipeline.prefetch(fetch)
+
+    def get_analysis_timings(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-stage timings (ms) of the latest analysis for each instrument.
+
+        Keys: snapshot_ms, sentiment_ms, inputs_ready_ms, ai_ms,
+        first_decision_ms (time to signal/confidence within the AI call),
+        total_ms and sentiment_skipped (1.0 if the sentiment deadline was missed).
+        """
+        return {key: dict(stages) for key, stages in self.analysis_timings.items()}
+
+    def _drain_analysis_results(self, event=None):
+        """Apply finished background analyses on the strategy thread."""
+        if self.analysis_pipeline is None:
+            return
+
+        for result in self.analysis_pipeline.drain():
+            ctx = self.instrument_contexts.get(InstrumentId.from_str(result.key))
+            if ctx is None:
+                continue
+
+            self._activate_instrument(ctx)
+            try:
+                self._apply_analysis_result(result)
+                if ctx.analysis_pending and not (result.ok and result.value.get('provisional')):
+                    self._trigger_analysis(ctx)
+            except Exception as e:
+                self.log.error(f"❌ Failed to apply analysis for {ctx.instrument_id}: {e}", exc_info=True)
+
+        self._activate_instrument(self._primary_context)
+
+    @property
+    def _quote_feed_enabled(self) -> bool:
+        return bool(self.max_signal_price_drift_pct) or (
+            self.enable_trailing_stop and self.trailing_price_source == "quote"
+        )
+
+    def _live_price(self) -> float:
+        """Latest price of the active instrument: quote mid, else last trade, else last bar close."""
+        if self.cache is not None:
+            quote = self.cache.quote_tick(self.instrument_id)
+            if quote is not None:
+                return (float(quote.bid_price) + float(quote.ask_price)) / 2
+            trade = self.cache.trade_tick(self.instrument_id)
+            if trade is not None:
+                return float(trade.price)
+
+        bars = self.indicator_manager.bar_buffer
+        return bars.latest('close') if len(bars) else 0.0
+
+    def _is_signal_stale(self, analysed_price: float) -> bool:
+        """
+        Check if price moved more than max_signal_price_drift_pct since the analysis snapshot.
+
+        ``analysed_price`` is the live price when the inputs were snapshotted
+        (context ``live_price``); it is compared with the live price now.
+        """
+        if not self.max_signal_price_drift_pct:
+            return False
+
+        live_price = self._live_price()
+        if not live_price or not analysed_price:
+            return False
+
+        drift = abs(live_price - analysed_price) / analysed_price
+        if drift > self.max_signal_price_drift_pct:
+            self.log.warning(
+                f"⌛ Dropping stale signal: price moved {drift * 100:.2f}% "
+                f"(${analysed_price:,.2f} → ${live_price:,.2f}) during analysis "
+                f"(max {self.max_signal_price_drift_pct * 100:.2f}%)"
             )
-            self.log.info(
-                f"🤖 Signal: {signal_data['signal']} | "
-                f"Confidence: {signal_data['confidence']} | "
-                f"Reason: {signal_data['reason']}"
+            return True
+        return False
+
+    def _apply_analysis_result(self, result: AnalysisResult):
+        """
+        Act on a finished analysis for the active instrument.
+
+        Parameters
+        ----------
+        result : AnalysisResult
+            Analysis outcome; context holds the price/technical snapshots
+        """
+        price_data = result.context['price_data']
+        technical_data = result.context['technical_data']
+        analysed_price = result.context.get('live_price') or price_data['price']
+        key = str(self.instrument_id)
+
+        if result.ok and result.value.get('provisional'):
+            self._apply_provisional_signal(
+                result.value['signal_data'], price_data, technical_data, analysed_price=analysed_price,
             )
-            
-            # Send Telegram signal notification (only for actionable signals)
-            if self.telegram_bot and self.enable_telegram and self.telegram_notify_signals:
-                if signal_data['signal'] in ['BUY', 'SELL']:
-                    try:
-                        signal_notification = self.telegram_bot.format_trade_signal({
-                            'signal': signal_data['signal'],
-                            'confidence': signal_data['confidence'],
-                            'price': price_data['price'],
-                            'timestamp': price_data['timestamp'],
-                            'rsi': technical_data.get('rsi', 0),
-                            'macd': technical_data.get('macd', 0),
-                            'support': technical_data.get('support', 0),
-                            'resistance': technical_data.get('resistance', 0),
-                            'reasoning': signal_data['reason'],
-                        })
-                        self.telegram_bot.send_message_sync(signal_notification)
-                    except Exception as e:
-                        self.log.warning(f"Failed to send Telegram signal notification: {e}")
-                        
-        except Exception as e:
-            self.log.error(f"DeepSeek AI analysis failed: {e}", exc_info=True)
-            
+            return
+
+        provisional = self._provisional_signals.pop(key, None)
+
+        if not result.ok:
+            e = result.error
+            self.log.error(f"DeepSeek AI analysis failed: {e}")
+            if provisional:
+                self._alert_unconfirmed_provisional(provisional, f"analysis failed: {e}")
+
             # Send error notification
             if self.telegram_bot and self.enable_telegram and self.telegram_notify_errors:
                 try:
@@ -648,28 +1550,146 @@ class DeepSeekAIStrategy(Strategy):
                     pass
             return
 
+        signal_data = result.value['signal_data']
+        timings = result.value.get('timings')
+        if timings:
+            self.analysis_timings[str(self.instrument_id)] = timings
+            self.log.info(
+                "⏱️ Analysis stages: "
+                + " | ".join(f"{stage} {value:.0f}" for stage, value in timings.items())
+            )
+        self.log.info(
+            f"🤖 Signal: {signal_data['signal']} | "
+            f"Confidence: {signal_data['confidence']} | "
+            f"Reason: {signal_data['reason']} "
+            f"({result.elapsed_sec:.1f}s)"
+        )
+        if signal_data.get('hedged'):
+            stats = self.deepseek.stats
+            self.log.info(
+                f"🪃 Hedged request (hedges fired {stats['hedges_fired']}, won {stats['hedges_won']})"
+            )
+        if signal_data.get('cached'):
+            cache_stats = self.deepseek.get_cache_stats()
+            self.log.info(
+                f"♻️ Signal from cache (age {signal_data.get('cache_age_sec', 0):.0f}s, "
+                f"hit rate {cache_stats['hit_rate']:.0%})"
+            )
+
+        if provisional and signal_data.get('is_fallback'):
+            self._alert_unconfirmed_provisional(provisional, "final response unusable, fallback signal")
+
         # Store signal
         self.last_signal = signal_data
 
-        # Execute trade
-        self._execute_trade(signal_data, price_data, technical_data, current_position)
-        
+        # Staleness guard: the market may have moved during a slow model call
+        if self._is_signal_stale(analysed_price):
+            return
+
+        # Send Telegram signal notification (only for actionable signals)
+        if self.telegram_bot and self.enable_telegram and self.telegram_notify_signals:
+            if signal_data['signal'] in ['BUY', 'SELL']:
+                try:
+                    signal_notification = self.telegram_bot.format_trade_signal({
+                        'signal': signal_data['signal'],
+                        'confidence': signal_data['confidence'],
+                        'price': price_data['price'],
+                        'timestamp': price_data['timestamp'],
+                        'rsi': technical_data.get('rsi', 0),
+                        'macd': technical_data.get('macd', 0),
+                        'support': technical_data.get('support', 0),
+                        'resistance': technical_data.get('resistance', 0),
+                        'reasoning': signal_data['reason'],
+                    })
+                    self.telegram_bot.send_message_sync(signal_notification)
+                except Exception as e:
+                    self.log.warning(f"Failed to send Telegram signal notification: {e}")
+
+        if provisional and (provisional['signal'], provisional['confidence']) == (
+            signal_data['signal'], signal_data['confidence']
+        ):
+            # Already traded on the streamed decision; keep the full signal for SL/TP and /status
+            self.log.info("✅ Final signal confirms the provisional decision (already executed)")
+            self.latest_signal_data = signal_data
+        else:
+            if provisional:
+                self.log.warning(
+                    f"⚠️ Final signal {signal_data['signal']} ({signal_data['confidence']}) differs from "
+                    f"provisional {provisional['signal']} ({provisional['confidence']}), re-evaluating"
+                )
+
+            # Position may have changed while the analysis was running
+            current_position = self._get_current_position_data()
+
+            # Execute trade
+            self._execute_trade(signal_data, price_data, technical_data, current_position)
+
         # OCO maintenance: cleanup orphan orders and expired groups
         if self.enable_oco and self.oco_manager:
             self._cleanup_oco_orphans()
-        
-        # Trailing stop maintenance: check and update trailing stops
-        if self.enable_trailing_stop:
-            self._update_trailing_stops(price_data['price'])
+
+        # Trailing stop maintenance (only when no dedicated price feed drives it)
+        if self.enable_trailing_stop and not self.trailing_price_source:
+            self._update_trailing_stops(self.indicator_manager.bar_buffer.latest('close'))
+
+    def _apply_provisional_signal(
+        self,
+        decision: Dict[str, Any],
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        analysed_price: Optional[float] = None,
+    ):
+        """
+        Trade on a streamed decision before the full response (reason) arrives.
+
+        The final result is then only executed if it disagrees.
+        """
+        self.log.info(
+            f"⚡ Provisional signal: {decision['signal']} | Confidence: {decision['confidence']} "
+            f"(after {decision.get('time_to_decision_sec', 0):.2f}s)"
+        )
+
+        if self._is_signal_stale(analysed_price or price_data['price']):
+            return
+
+        signal_data = dict(decision, reason="Provisional streamed decision")
+        self._provisional_signals[str(self.instrument_id)] = signal_data
+
+        current_position = self._get_current_position_data()
+        self._execute_trade(signal_data, price_data, technical_data, current_position)
+
+    def _alert_unconfirmed_provisional(self, provisional: Dict[str, Any], reason: str):
+        """
+        Report a provisional trade that the full response never confirmed.
+
+        The position opened on the streamed decision stays open (protected by
+        its SL/TP orders) and needs an operator's attention.
+        """
+        message = (
+            f"Provisional {provisional['signal']} ({provisional['confidence']}) on "
+            f"{self.instrument_id} was executed but never confirmed ({reason}); "
+            f"review the open position"
+        )
+        self.log.error(f"🚨 {message}")
+
+        if self.telegram_bot and self.enable_telegram and self.telegram_notify_errors:
+            try:
+                self.telegram_bot.send_message_sync(self.telegram_bot.format_error_alert({
+                    'level': 'CRITICAL',
+                    'message': message,
+                    'context': 'provisional_signal',
+                }))
+            except Exception as e:
+                self.log.warning(f"Failed to send Telegram alert: {e}")
 
     def _calculate_price_change(self) -> float:
         """Calculate price change percentage."""
-        bars = self.indicator_manager.recent_bars
+        bars = self.indicator_manager.bar_buffer
         if len(bars) < 2:
             return 0.0
 
-        current = float(bars[-1].close)
-        previous = float(bars[-2].close)
+        current = bars.latest('close')
+        previous = bars.latest('close', offset=1)
 
         return ((current - previous) / previous) * 100
 
@@ -688,9 +1708,9 @@ class DeepSeekAIStrategy(Strategy):
             # Get current price for PnL calculation
             # Use last bar close price as it's more reliable than cache.price()
             # cache.price() requires tick data which may not be available
-            bars = self.indicator_manager.recent_bars
-            if bars:
-                current_price = bars[-1].close
+            bars = self.indicator_manager.bar_buffer
+            if len(bars):
+                current_price = self.instrument.make_price(bars.latest('close'))
             else:
                 # Fallback: try cache.price() if bars not available
                 try:
@@ -787,7 +1807,8 @@ class DeepSeekAIStrategy(Strategy):
         """
         Calculate intelligent position size.
 
-        Returns BTC quantity based on confidence, trend, and RSI.
+        Returns the active instrument's quantity (base asset) based on
+        confidence, trend, and RSI, rounded to its size increment.
         """
         # Base USDT amount
         base_usdt = self.base_usdt
@@ -821,44 +1842,75 @@ class DeepSeekAIStrategy(Strategy):
         max_usdt = self.equity * self.position_config['max_position_ratio']
         final_usdt = min(suggested_usdt, max_usdt)
 
-        # Enforce Binance minimum notional requirement ($100)
-        MIN_NOTIONAL_USDT = 100.0
-        if final_usdt < MIN_NOTIONAL_USDT:
-            final_usdt = MIN_NOTIONAL_USDT
+        # Enforce the instrument's minimum notional requirement
+        size_step, min_quantity, min_notional, precision = self._order_size_rules()
+        quote_asset = self._active_context.quote_asset
+        if final_usdt < min_notional:
+            final_usdt = min_notional
 
-        # Convert to BTC quantity
+        # Convert to instrument quantity
         current_price = price_data['price']
-        btc_quantity = final_usdt / current_price
+        quantity = final_usdt / current_price
 
         # Apply minimum trade amount
-        if btc_quantity < self.position_config['min_trade_amount']:
-            btc_quantity = self.position_config['min_trade_amount']
+        if quantity < min_quantity:
+            quantity = min_quantity
 
-        # Round to instrument precision
-        btc_quantity = round(btc_quantity, 3)  # Binance BTC precision
+        # Round to the instrument's size increment
+        quantity = round(round(quantity / size_step) * size_step, precision)
 
-        # CRITICAL: Re-check notional after rounding to ensure still >= $100
+        # CRITICAL: Re-check notional after rounding to ensure still >= minimum
         # Rounding can reduce the quantity below minimum notional threshold
-        actual_notional = btc_quantity * current_price
-        if actual_notional < MIN_NOTIONAL_USDT:
-            # Increase quantity to meet minimum notional (round UP)
-            btc_quantity = MIN_NOTIONAL_USDT / current_price
-            # Round up to next 0.001 to ensure we stay above minimum
-            import math
-            btc_quantity = math.ceil(btc_quantity * 1000) / 1000
+        actual_notional = quantity * current_price
+        if actual_notional < min_notional:
+            # Increase quantity to meet minimum notional (round UP to the next increment)
+            quantity = round(math.ceil(min_notional / current_price / size_step) * size_step, precision)
             self.log.warning(
-                f"⚠️ Adjusted quantity after rounding: {btc_quantity:.3f} BTC "
-                f"to meet ${MIN_NOTIONAL_USDT} minimum notional"
+                f"⚠️ Adjusted quantity after rounding: {self._format_quantity(quantity)} "
+                f"to meet {min_notional} {quote_asset} minimum notional"
             )
 
         self.log.info(
             f"📊 Position Sizing: "
             f"Base:{base_usdt} × Conf:{conf_mult} × Trend:{trend_mult} × RSI:{rsi_mult} "
-            f"= ${final_usdt:.2f} = {btc_quantity:.3f} BTC "
-            f"(notional: ${btc_quantity * current_price:.2f})"
+            f"= {final_usdt:.2f} {quote_asset} = {self._format_quantity(quantity)} "
+            f"(notional: {quantity * current_price:.2f} {quote_asset})"
         )
 
-        return btc_quantity
+        return quantity
+
+    def _format_quantity(self, quantity: float) -> str:
+        """Quantity in the active instrument's base asset (e.g. "0.002 BTC")."""
+        precision = self._order_size_rules()[3]
+        return f"{quantity:.{precision}f} {self._active_context.base_asset}"
+
+    def _order_size_rules(self) -> Tuple[float, float, float, int]:
+        """
+        Order size rules of the active instrument.
+
+        Falls back to min_trade_amount as the size step and a 100 minimum
+        notional (Binance USDT-M BTC) while the instrument is not loaded.
+        min_trade_amount also applies to the primary instrument, for which
+        it is configured.
+
+        Returns
+        -------
+        Tuple[float, float, float, int]
+            (size increment, minimum quantity, minimum notional, size precision)
+        """
+        min_trade_amount = self.position_config['min_trade_amount']
+        instrument = self.instrument
+        if instrument is None:
+            return min_trade_amount, min_trade_amount, 100.0, 3
+
+        size_step = float(instrument.size_increment)
+        min_quantity = size_step
+        if instrument.min_quantity is not None:
+            min_quantity = max(min_quantity, float(instrument.min_quantity))
+        if self._active_context is self._primary_context:
+            min_quantity = max(min_quantity, min_trade_amount)
+        min_notional = float(instrument.min_notional) if instrument.min_notional is not None else 100.0
+        return size_step, min_quantity, min_notional, instrument.size_precision
 
     def _manage_existing_position(
         self,
@@ -878,7 +1930,7 @@ class DeepSeekAIStrategy(Strategy):
 
             if abs(size_diff) < threshold:
                 self.log.info(
-                    f"✅ Position size appropriate ({current_qty:.3f} BTC), no adjustment needed"
+                    f"✅ Position size appropriate ({self._format_quantity(current_qty)}), no adjustment needed"
                 )
                 return
 
@@ -890,7 +1942,7 @@ class DeepSeekAIStrategy(Strategy):
                     reduce_only=False,
                 )
                 self.log.info(
-                    f"📈 Adding to {target_side} position: {abs(size_diff):.3f} BTC "
+                    f"📈 Adding to {target_side} position: {self._format_quantity(abs(size_diff))} "
                     f"({current_qty:.3f} → {target_quantity:.3f})"
                 )
             else:
@@ -901,7 +1953,7 @@ class DeepSeekAIStrategy(Strategy):
                     reduce_only=True,
                 )
                 self.log.info(
-                    f"📉 Reducing {target_side} position: {abs(size_diff):.3f} BTC "
+                    f"📉 Reducing {target_side} position: {self._format_quantity(abs(size_diff))} "
                     f"({current_qty:.3f} → {target_quantity:.3f})"
                 )
 
@@ -956,7 +2008,7 @@ class DeepSeekAIStrategy(Strategy):
             quantity=quantity,
         )
 
-        self.log.info(f"🚀 Opening {side} position: {quantity:.3f} BTC (with bracket SL/TP)")
+        self.log.info(f"🚀 Opening {side} position: {self._format_quantity(quantity)} (with bracket SL/TP)")
 
     def _submit_order(
         self,
@@ -965,10 +2017,10 @@ class DeepSeekAIStrategy(Strategy):
         reduce_only: bool = False,
     ):
         """Submit market order to exchange."""
-        if quantity < self.position_config['min_trade_amount']:
+        min_quantity = self._order_size_rules()[1]
+        if quantity < min_quantity:
             self.log.warning(
-                f"⚠️ Order quantity {quantity:.3f} below minimum "
-                f"{self.position_config['min_trade_amount']:.3f}, skipping"
+                f"⚠️ Order quantity {quantity} below minimum {min_quantity}, skipping"
             )
             return
 
@@ -985,7 +2037,7 @@ class DeepSeekAIStrategy(Strategy):
         self.submit_order(order)
 
         self.log.info(
-            f"📤 Submitted {side.name} market order: {quantity:.3f} BTC "
+            f"📤 Submitted {side.name} market order: {self._format_quantity(quantity)} "
             f"(reduce_only={reduce_only})"
         )
     
@@ -1011,10 +2063,10 @@ class DeepSeekAIStrategy(Strategy):
         quantity : float
             Quantity to trade
         """
-        if quantity < self.position_config['min_trade_amount']:
+        min_quantity = self._order_size_rules()[1]
+        if quantity < min_quantity:
             self.log.warning(
-                f"⚠️ Order quantity {quantity:.3f} below minimum "
-                f"{self.position_config['min_trade_amount']:.3f}, skipping"
+                f"⚠️ Order quantity {quantity} below minimum {min_quantity}, skipping"
             )
             return
 
@@ -1034,10 +2086,10 @@ class DeepSeekAIStrategy(Strategy):
         if self.latest_price_data and self.latest_price_data.get('price'):
             entry_price = float(self.latest_price_data['price'])
 
-        if entry_price is None and hasattr(self.indicator_manager, "recent_bars"):
-            recent_bars = self.indicator_manager.recent_bars
-            if recent_bars:
-                entry_price = float(recent_bars[-1].close)
+        if entry_price is None and hasattr(self.indicator_manager, "bar_buffer"):
+            bar_buffer = self.indicator_manager.bar_buffer
+            if len(bar_buffer):
+                entry_price = bar_buffer.latest('close')
 
         if entry_price is None:
             cache_bars = self.cache.bars(self.bar_type)
@@ -1054,6 +2106,12 @@ class DeepSeekAIStrategy(Strategy):
         support = self.latest_technical_data.get('support', 0.0)
         resistance = self.latest_technical_data.get('resistance', 0.0)
 
+        # Optional dedicated lookback for SL placement (O(1) read, no bar rescan)
+        if self.sl_sr_lookback:
+            sl_support, sl_resistance = self.indicator_manager.get_support_resistance(self.sl_sr_lookback)
+            if sl_support > 0 and sl_resistance > 0:
+                support, resistance = sl_support, sl_resistance
+
         # Calculate Stop Loss price
         if side == OrderSide.BUY:
             # BUY: Stop loss below support
@@ -1109,7 +2167,7 @@ class DeepSeekAIStrategy(Strategy):
             self.submit_order_list(bracket_order_list)
 
             self.log.info(
-                f"✅ Submitted bracket order: {side.name} {quantity:.3f} BTC with SL/TP\n"
+                f"✅ Submitted bracket order: {side.name} {self._format_quantity(quantity)} with SL/TP\n"
                 f"   OrderList ID: {bracket_order_list.id}"
             )
 
@@ -1193,7 +2251,7 @@ class DeepSeekAIStrategy(Strategy):
         # Update trailing stop state with actual entry price if it exists
         # (bracket order already initialized it with estimated price)
         if self.enable_trailing_stop:
-            instrument_key = str(self.instrument_id)
+            instrument_key = str(event.instrument_id)
             entry_price = float(event.avg_px_open)
 
             if instrument_key in self.trailing_stop_state:
@@ -1242,13 +2300,14 @@ class DeepSeekAIStrategy(Strategy):
     def on_position_closed(self, event):
         """Handle position closed events."""
         # PositionOpened event contains position data directly
+        ctx = self.instrument_contexts.get(event.instrument_id, self._primary_context)
         self.log.info(
-            f"🔴 Position closed: {event.side.name} "
-            f"P&L: {event.realized_pnl:.2f} USDT"
+            f"🔴 Position closed: {ctx.instrument_id} {event.side.name} "
+            f"P&L: {float(event.realized_pnl):.2f} {ctx.quote_asset}"
         )
         
         # Clear trailing stop state
-        instrument_key = str(self.instrument_id)
+        instrument_key = str(event.instrument_id)
         if instrument_key in self.trailing_stop_state:
             del self.trailing_stop_state[instrument_key]
             self.log.debug(f"🗑️ Cleared trailing stop state for {instrument_key}")
@@ -1320,113 +2379,58 @@ class DeepSeekAIStrategy(Strategy):
     
     def _update_trailing_stops(self, current_price: float):
         """
-        Update trailing stop loss orders based on current price.
-        
-        Logic:
-        1. Check if position is profitable enough to activate trailing stop
-        2. Track highest price (LONG) or lowest price (SHORT)
-        3. Update stop loss when price moves favorably beyond threshold
-        4. Stop loss only moves in favorable direction, never backwards
-        
+        Update the trailing stop of the active instrument at ``current_price``.
+
         Parameters
         ----------
         current_price : float
             Current market price
         """
+        self._on_trailing_price(self._active_context, current_price)
+
+    def _on_trailing_price(self, ctx: InstrumentContext, price: float, extreme: Optional[float] = None):
+        """
+        Feed one price to the trailing stop engine for ``ctx``'s position.
+
+        Logic (see TrailingStopEngine):
+        1. Track highest price (LONG) or lowest price (SHORT)
+        2. Activate once the position is profitable enough
+        3. Move the stop loss when it would move by at least trailing_update_threshold_pct
+        4. Stop loss only moves in favorable direction, never backwards
+
+        Parameters
+        ----------
+        ctx : InstrumentContext
+            Instrument the price belongs to
+        price : float
+            Current price (quote mid or bar close)
+        extreme : float, optional
+            Best price since the last update (1-minute bar high/low)
+        """
+        state = self.trailing_stop_state.get(ctx.key)
+        if state is None:
+            return
+
         try:
-            instrument_key = str(self.instrument_id)
-            
-            # Check if we have trailing stop state for this instrument
-            if instrument_key not in self.trailing_stop_state:
+            new_sl_price = self.trailing_engine.update(state, price, extreme)
+            if new_sl_price is None:
                 return
-            
-            state = self.trailing_stop_state[instrument_key]
-            entry_price = state["entry_price"]
-            side = state["side"]
-            activated = state["activated"]
-            
-            # Calculate profit percentage
-            if side == "LONG":
-                profit_pct = (current_price - entry_price) / entry_price
-                
-                # Update highest price
-                if state["highest_price"] is None or current_price > state["highest_price"]:
-                    state["highest_price"] = current_price
-                
-                highest_price = state["highest_price"]
-                
-                # Check if we should activate trailing stop
-                if not activated and profit_pct >= self.trailing_activation_pct:
-                    state["activated"] = True
-                    self.log.info(
-                        f"🎯 Trailing stop ACTIVATED for LONG @ ${current_price:,.2f} "
-                        f"(Profit: {profit_pct*100:.2f}%)"
-                    )
-                    activated = True
-                
-                # If activated, check if we should update stop loss
-                if activated:
-                    # Calculate new stop loss based on highest price
-                    new_sl_price = highest_price * (1 - self.trailing_distance_pct)
-                    current_sl_price = state["current_sl_price"]
-                    
-                    # Only update if new SL is significantly higher than current
-                    if current_sl_price is None:
-                        should_update = True
-                    else:
-                        price_move_pct = (new_sl_price - current_sl_price) / current_sl_price
-                        should_update = price_move_pct >= self.trailing_update_threshold_pct
-                    
-                    if should_update and new_sl_price > current_sl_price:
-                        self._execute_trailing_stop_update(
-                            instrument_key=instrument_key,
-                            new_sl_price=new_sl_price,
-                            current_price=current_price,
-                            side="LONG"
-                        )
-            
-            elif side == "SHORT":
-                profit_pct = (entry_price - current_price) / entry_price
-                
-                # Update lowest price
-                if state["lowest_price"] is None or current_price < state["lowest_price"]:
-                    state["lowest_price"] = current_price
-                
-                lowest_price = state["lowest_price"]
-                
-                # Check if we should activate trailing stop
-                if not activated and profit_pct >= self.trailing_activation_pct:
-                    state["activated"] = True
-                    self.log.info(
-                        f"🎯 Trailing stop ACTIVATED for SHORT @ ${current_price:,.2f} "
-                        f"(Profit: {profit_pct*100:.2f}%)"
-                    )
-                    activated = True
-                
-                # If activated, check if we should update stop loss
-                if activated:
-                    # Calculate new stop loss based on lowest price
-                    new_sl_price = lowest_price * (1 + self.trailing_distance_pct)
-                    current_sl_price = state["current_sl_price"]
-                    
-                    # Only update if new SL is significantly lower than current
-                    if current_sl_price is None:
-                        should_update = True
-                    else:
-                        price_move_pct = (current_sl_price - new_sl_price) / current_sl_price
-                        should_update = price_move_pct >= self.trailing_update_threshold_pct
-                    
-                    if should_update and new_sl_price < current_sl_price:
-                        self._execute_trailing_stop_update(
-                            instrument_key=instrument_key,
-                            new_sl_price=new_sl_price,
-                            current_price=current_price,
-                            side="SHORT"
-                        )
-                        
+
+            previous = self._active_context
+            self._activate_instrument(ctx)
+            try:
+                self._execute_trailing_stop_update(
+                    instrument_key=ctx.key,
+                    new_sl_price=new_sl_price,
+                    current_price=price,
+                    side=state["side"],
+                )
+            finally:
+                self._activate_instrument(previous)
+
         except Exception as e:
             self.log.error(f"❌ Trailing stop update failed: {e}")
-    
+
     def _execute_trailing_stop_update(
         self,
         instrument_key: str,
@@ -1556,9 +2560,9 @@ class DeepSeekAIStrategy(Strategy):
             
             # Get current price
             current_price = 0
-            bars = self.indicator_manager.recent_bars if hasattr(self, 'indicator_manager') else []
-            if bars:
-                current_price = float(bars[-1].close)
+            bars = self.indicator_manager.bar_buffer if hasattr(self, 'indicator_manager') else []
+            if len(bars):
+                current_price = bars.latest('close')
             
             # Get unrealized PnL
             unrealized_pnl = 0
@@ -1593,6 +2597,8 @@ class DeepSeekAIStrategy(Strategy):
                 'last_signal': last_signal,
                 'last_signal_time': last_signal_time,
                 'uptime': uptime_str,
+                'ai_breaker': self.deepseek.get_breaker_status(),
+                'ai_metrics': self.deepseek.get_metrics(),
             }
             
             message = self.telegram_bot.format_status_response(status_info) if self.telegram_bot else "Status unavailable"
@@ -1618,8 +2624,8 @@ class DeepSeekAIStrategy(Strategy):
             }
             
             if current_position:
-                bars = self.indicator_manager.recent_bars if hasattr(self, 'indicator_manager') else []
-                current_price = float(bars[-1].close) if bars else current_position['avg_px']
+                bars = self.indicator_manager.bar_buffer if hasattr(self, 'indicator_manager') else []
+                current_price = bars.latest('close') if len(bars) else current_position['avg_px']
                 
                 entry_price = current_position['avg_px']
                 pnl = current_position['unrealized_pnl']
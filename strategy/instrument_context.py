@@ -0,0 +1,90 @@
+"""
+Per-Instrument State for DeepSeek AI Strategy
+
+One strategy instance can trade several instruments; everything that used to
+be a single strategy attribute (indicators, latest signal, bar counters) lives
+in an InstrumentContext per instrument.
+"""
+
+from typing import Any, Dict, Optional
+
+from nautilus_trader.model.data import BarType
+from nautilus_trader.model.identifiers import InstrumentId
+from nautilus_trader.model.instruments import Instrument
+
+from indicators.technical_manager import TechnicalIndicatorManager
+from indicators.multi_timeframe import MultiTimeframeIndicatorBank
+from utils.prompt_encoder import split_symbol
+from utils.prompt_renderer import KlinePromptRenderer
+from utils.speculation import FormingBar
+
+
+class InstrumentContext:
+    """
+    State the strategy keeps for one traded instrument.
+
+    Trailing stop state stays in ``DeepSeekAIStrategy.trailing_stop_state``,
+    which is already keyed by instrument.
+    """
+
+    def __init__(
+        self,
+        instrument_id: InstrumentId,
+        bar_type: BarType,
+        indicator_manager: TechnicalIndicatorManager,
+        timeframe_bank: MultiTimeframeIndicatorBank,
+        kline_renderer: Optional[KlinePromptRenderer] = None,
+    ):
+        self.instrument_id = instrument_id
+        self.bar_type = bar_type
+        self.indicator_manager = indicator_manager
+        self.timeframe_bank = timeframe_bank
+        self.kline_renderer = kline_renderer or KlinePromptRenderer()
+        self.instrument: Optional[Instrument] = None
+
+        # Latest analysis results (used for SL/TP calculation and /status)
+        self.last_signal: Optional[Dict[str, Any]] = None
+        self.latest_signal_data: Optional[Dict[str, Any]] = None
+        self.latest_technical_data: Optional[Dict[str, Any]] = None
+        self.latest_price_data: Optional[Dict[str, Any]] = None
+
+        self.bars_received = 0
+
+        # Analysis triggers: time of and bars since the last analysis, coalesced trigger
+        self.last_analysis_ns = 0
+        self.bars_since_analysis = 0
+        self.analysis_pending = False
+
+        # Speculative analysis: bar forming from trade ticks
+        self.forming_bar = FormingBar()
+
+        # 1-minute bar feed of the trailing stop engine (trailing_price_source="bar_1m")
+        self.trailing_bar_type: Optional[BarType] = None
+        # Time of the last trailing feed price (quote tick or 1-minute bar)
+        self.trailing_feed_ts_ns = 0
+        self.trailing_fallback_warned = False
+
+    def mark_analysed(self, ts_ns: int):
+        """Record that an analysis ran (or was confirmed) at ``ts_ns``."""
+        self.last_analysis_ns = ts_ns
+        self.bars_since_analysis = 0
+
+    @property
+    def key(self) -> str:
+        """Instrument key used by the scheduler and trailing stop state."""
+        return str(self.instrument_id)
+
+    @property
+    def symbol(self) -> str:
+        """Exchange symbol, e.g. BTCUSDT-PERP.BINANCE -> BTCUSDT."""
+        return self.instrument_id.symbol.value.split('-')[0]
+
+    @property
+    def base_asset(self) -> str:
+        """Base asset used for sentiment lookups and prompts, e.g. BTCUSDT -> BTC."""
+        return split_symbol(self.symbol)[0]
+
+    @property
+    def quote_asset(self) -> str:
+        """Quote (settlement) asset, e.g. ETHUSDC -> USDC."""
+        return split_symbol(self.symbol)[1]
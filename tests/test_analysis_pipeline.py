@@ -0,0 +1,324 @@
+"""
+Unit tests for the background analysis pipeline and signal staleness guard.
+
+Run: python tests/test_analysis_pipeline.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def wait_for_results(pipeline, count, timeout=5.0):
+    """Drain the pipeline until ``count`` results arrived."""
+    results = []
+    deadline = time.monotonic() + timeout
+    while len(results) < count and time.monotonic() < deadline:
+        results.extend(pipeline.drain())
+        time.sleep(0.01)
+    return results
+
+
+def make_strategy(**overrides):
+    """Create a strategy (not registered with a trader)."""
+    from strategy.deepseek_strategy import DeepSeekAIStrategy, DeepSeekAIStrategyConfig
+
+    settings = dict(
+        instrument_id="BTCUSDT-PERP.BINANCE",
+        bar_type="BTCUSDT-PERP.BINANCE-15-MINUTE-LAST-EXTERNAL",
+        deepseek_api_key="test_key",
+        sentiment_enabled=False,
+    )
+    settings.update(overrides)
+    config = DeepSeekAIStrategyConfig(**settings)
+    return DeepSeekAIStrategy(config)
+
+
+def test_pipeline_runs_jobs_off_thread():
+    """Jobs run on worker threads and results come back through drain()."""
+    from utils.analysis_pipeline import AnalysisPipeline
+
+    pipeline = AnalysisPipeline(max_workers=2)
+    caller = threading.get_ident()
+
+    assert pipeline.submit("A", lambda: threading.get_ident(), context={'n': 1})
+    assert pipeline.submit("B", lambda: 1 / 0)
+    results = {r.key: r for r in wait_for_results(pipeline, 2)}
+
+    assert results["A"].ok and results["A"].value != caller
+    assert results["A"].context == {'n': 1}
+    assert not results["B"].ok and isinstance(results["B"].error, ZeroDivisionError)
+    assert pipeline.stats['completed'] == 1 and pipeline.stats['failed'] == 1
+    pipeline.shutdown()
+    print("✅ Jobs run on worker threads; errors are captured")
+
+
+def test_pipeline_one_job_per_key():
+    """A key with a running job rejects new submissions until it finishes."""
+    from utils.analysis_pipeline import AnalysisPipeline
+
+    pipeline = AnalysisPipeline(max_workers=2)
+    release = threading.Event()
+
+    assert pipeline.submit("A", release.wait)
+    assert not pipeline.submit("A", lambda: None)
+    assert pipeline.in_flight("A") == 1
+
+    release.set()
+    assert len(wait_for_results(pipeline, 1)) == 1
+    assert pipeline.in_flight("A") == 0
+    assert pipeline.submit("A", lambda: None)
+    assert pipeline.stats['rejected'] == 1
+    pipeline.shutdown(wait=True)
+    print("✅ One in-flight analysis per instrument")
+
+
+def test_stale_signal_is_dropped():
+    """Signals are not executed if price moved beyond the drift limit during analysis."""
+    from utils.analysis_pipeline import AnalysisResult
+
+    strategy = make_strategy(max_signal_price_drift_pct=0.005)
+    strategy._execute_trade = Mock()
+    strategy._get_current_position_data = Mock(return_value=None)
+    strategy.indicator_manager.update(SimpleNamespace(
+        open=100.0, high=101.0, low=99.0, close=101.0, volume=1.0, ts_init=1,
+    ))
+
+    signal = {'signal': 'BUY', 'confidence': 'HIGH', 'reason': 'test'}
+    context = {'price_data': {'price': 100.0, 'timestamp': ''}, 'technical_data': {}}
+
+    # 1% move > 0.5% limit -> dropped
+    strategy._apply_analysis_result(AnalysisResult("BTCUSDT-PERP.BINANCE", {'signal_data': signal}, context=context))
+    assert not strategy._execute_trade.called
+    assert strategy.last_signal == signal
+
+    # 1% move within a 2% limit -> executed
+    strategy.max_signal_price_drift_pct = 0.02
+    strategy._apply_analysis_result(AnalysisResult("BTCUSDT-PERP.BINANCE", {'signal_data': signal}, context=context))
+    assert strategy._execute_trade.called
+
+    # Live price (quote mid) moved during the call while no new bar closed -> dropped
+    strategy._execute_trade.reset_mock()
+    strategy.max_signal_price_drift_pct = 0.005
+    strategy._live_price = Mock(return_value=102.0)
+    live_context = dict(context, live_price=101.0, price_data={'price': 101.0, 'timestamp': ''})
+    strategy._apply_analysis_result(AnalysisResult("BTCUSDT-PERP.BINANCE", {'signal_data': signal}, context=live_context))
+    provisional = {'signal': 'BUY', 'confidence': 'HIGH', 'provisional': True}
+    strategy._apply_analysis_result(AnalysisResult(
+        "BTCUSDT-PERP.BINANCE", {'signal_data': provisional, 'provisional': True}, context=live_context,
+    ))
+    assert not strategy._execute_trade.called
+
+    strategy._live_price = Mock(return_value=101.2)
+    strategy._apply_analysis_result(AnalysisResult("BTCUSDT-PERP.BINANCE", {'signal_data': signal}, context=live_context))
+    assert strategy._execute_trade.called
+    print("✅ Stale signals are dropped by the price drift guard")
+
+
+def test_sentiment_deadline_and_stage_timings():
+    """Sentiment is prefetched concurrently and left out once its deadline passes."""
+    from utils.analysis_pipeline import AnalysisPipeline
+
+    strategy = make_strategy(sentiment_enabled=True, sentiment_deadline_sec=0.2)
+    strategy.analysis_pipeline = AnalysisPipeline(max_workers=1)
+    strategy.deepseek = Mock()
+    strategy.deepseek.analyze.return_value = {'signal': 'HOLD', 'confidence': 'LOW', 'reason': 'test'}
+    strategy.sentiment_fetcher = Mock()
+    strategy.sentiment_fetcher.format_for_display.return_value = "sentiment"
+    price_data = {'price': 100.0}
+
+    # Fast sentiment: included in the prompt inputs
+    strategy.sentiment_fetcher.fetch.side_effect = lambda token: {'token': token}
+    timings = {}
+    start = time.perf_counter()
+    future = strategy._prefetch_sentiment("ETH", timings)
+    value = strategy._analysis_job(price_data, {}, None, {}, sentiment_future=future,
+                                   cycle_start=start, timings=timings)
+    assert value['sentiment_data'] == {'token': 'ETH'}
+    assert strategy.deepseek.analyze.call_args.kwargs['sentiment_data'] == {'token': 'ETH'}
+    assert {'sentiment_ms', 'inputs_ready_ms', 'ai_ms', 'total_ms'} <= set(value['timings'])
+
+    # Slow sentiment: analysis starts at the deadline without it
+    strategy.sentiment_fetcher.fetch.side_effect = lambda token: time.sleep(1.0) or {'token': token}
+    timings = {}
+    start = time.perf_counter()
+    future = strategy._prefetch_sentiment("ETH", timings)
+    value = strategy._analysis_job(price_data, {}, None, {}, sentiment_future=future,
+                                   cycle_start=start, timings=timings)
+    assert value['sentiment_data'] is None
+    assert value['timings']['sentiment_skipped'] == 1.0
+    assert 200 <= value['timings']['inputs_ready_ms'] < 900
+    assert strategy.deepseek.analyze.call_args.kwargs['sentiment_data'] is None
+    strategy.analysis_pipeline.shutdown()
+    print("✅ Sentiment deadline skips slow sentiment; stage timings recorded")
+
+
+def test_provisional_signal_executed_once():
+    """A provisional decision trades immediately; a matching final signal is not re-executed."""
+    from utils.analysis_pipeline import AnalysisResult
+
+    strategy = make_strategy()
+    strategy._execute_trade = Mock()
+    strategy._get_current_position_data = Mock(return_value=None)
+    strategy.indicator_manager.update(SimpleNamespace(
+        open=100.0, high=101.0, low=99.0, close=100.0, volume=1.0, ts_init=1,
+    ))
+    key = "BTCUSDT-PERP.BINANCE"
+    context = {'price_data': {'price': 100.0, 'timestamp': ''}, 'technical_data': {}}
+    provisional = {'signal': 'BUY', 'confidence': 'HIGH', 'provisional': True}
+    final = {'signal': 'BUY', 'confidence': 'HIGH', 'reason': 'full reasoning'}
+
+    strategy._apply_analysis_result(AnalysisResult(key, {'signal_data': provisional, 'provisional': True}, context=context))
+    assert strategy._execute_trade.call_count == 1
+    strategy._apply_analysis_result(AnalysisResult(key, {'signal_data': final}, context=context))
+    assert strategy._execute_trade.call_count == 1
+    assert strategy.latest_signal_data == final
+
+    # Final disagrees with the provisional decision -> executed
+    strategy._apply_analysis_result(AnalysisResult(key, {'signal_data': provisional, 'provisional': True}, context=context))
+    strategy._apply_analysis_result(AnalysisResult(key, {'signal_data': dict(final, signal='HOLD')}, context=context))
+    assert strategy._execute_trade.call_count == 3
+
+    # Executed provisional trade whose full response failed or fell back -> alert
+    strategy._alert_unconfirmed_provisional = Mock()
+    strategy._apply_analysis_result(AnalysisResult(key, {'signal_data': provisional, 'provisional': True}, context=context))
+    strategy._apply_analysis_result(AnalysisResult(key, {'signal_data': dict(final, signal='HOLD', is_fallback=True)}, context=context))
+    strategy._apply_analysis_result(AnalysisResult(key, {'signal_data': provisional, 'provisional': True}, context=context))
+    strategy._apply_analysis_result(AnalysisResult(key, error=RuntimeError("parse error"), context=context))
+    assert strategy._alert_unconfirmed_provisional.call_count == 2
+    print("✅ Provisional signals execute early and are not duplicated")
+
+
+def test_change_gate_skips_unchanged_hold():
+    """The AI call is skipped only after a HOLD and while no trigger fired."""
+    from utils.change_gate import ChangeDetectionGate
+
+    gate = ChangeDetectionGate(price_move_pct=0.01, rsi_levels=(30.0, 70.0), max_signal_age_sec=600)
+    technical = {'rsi': 0.5, 'rsi_pct': 50.0, 'macd_histogram': 1.0, 'support': 95.0, 'resistance': 100.5}
+    hold = {'signal': 'HOLD', 'confidence': 'LOW'}
+
+    assert gate.should_skip("A", hold, 100.0, technical, None, 0.0) == (False, ["no_baseline"])
+    gate.record("A", 100.0, technical, None, 0.0)
+
+    assert gate.should_skip("A", hold, 100.2, dict(technical, rsi=0.55, rsi_pct=55.0), None, 60.0) == (True, [])
+    assert gate.signal_age("A", 60.0) == 60.0
+    assert not gate.should_skip("A", {'signal': 'BUY'}, 100.0, technical, None, 60.0)[0]
+    assert not gate.should_skip("A", dict(hold, is_fallback=True), 100.0, technical, None, 60.0)[0]
+
+    cases = [
+        ((101.5, technical, None, 60.0), "price_move"),
+        ((100.6, technical, None, 60.0), "sr_break"),
+        ((100.0, dict(technical, rsi=0.72, rsi_pct=72.0), None, 60.0), "rsi_cross"),
+        ((100.0, dict(technical, macd_histogram=-0.1), None, 60.0), "macd_flip"),
+        ((100.0, technical, 'long', 60.0), "position_change"),
+        ((100.0, technical, None, 600.0), "max_age"),
+    ]
+    for args, trigger in cases:
+        skip, fired = gate.should_skip("A", hold, *args)
+        assert not skip and trigger in fired, (trigger, fired)
+
+    assert gate.stats['skipped'] == 1 and gate.stats['macd_flip'] == 1
+
+    # Gate, signal cache and compact prompt are opt-in; the gate is built from the strategy config
+    defaults = make_strategy()
+    assert defaults.change_gate is None and defaults.deepseek.cache is None
+    assert defaults.deepseek.prompt_mode == "full"
+    assert make_strategy(change_gate_enabled=True, gate_price_move_pct=0.02).change_gate.price_move_pct == 0.02
+    print("✅ Change gate reuses an unchanged HOLD and fires on material changes")
+
+
+def test_speculation_confirmed_or_rerun():
+    """A speculative result is used only for its bar and an unchanged quantized state."""
+    from utils.analysis_pipeline import AnalysisPipeline
+    from utils.response_cache import quantize_market_state
+    from utils.speculation import FormingBar, Speculation, SpeculationTracker
+
+    bar = FormingBar()
+    assert bar.is_empty
+    for price, size in ((100.0, 1.0), (101.0, 2.0), (99.5, 0.5), (100.2, 1.0)):
+        bar.update(price, size)
+    assert (bar.open, bar.high, bar.low, bar.close) == (100.0, 101.0, 99.5, 100.2)
+    assert bar.volume == 4.5 and bar.trades == 4
+
+    technical = {'rsi': 0.55, 'rsi_pct': 55.0, 'macd': 1.0, 'macd_histogram': 0.2, 'overall_trend': 'UP'}
+    forming_key = quantize_market_state({'symbol': 'BTCUSDT', 'price': 100.2}, technical)
+    assert quantize_market_state({'symbol': 'BTCUSDT', 'price': 100.21}, technical) == forming_key
+    assert quantize_market_state({'symbol': 'BTCUSDT', 'price': 100.2}, dict(technical, rsi=0.61, rsi_pct=61.0)) != forming_key
+
+    pipeline = AnalysisPipeline(max_workers=2)
+    tracker = SpeculationTracker()
+    release = threading.Event()
+    future = pipeline.speculate("A", lambda: release.wait(5.0) and {'signal_data': {'signal': 'BUY'}})
+    assert not pipeline.in_flight("A")
+    tracker.start("A", Speculation(900, forming_key, future, 0, 5.0))
+
+    # Confirmed while still running: the caller waits on the same future
+    assert tracker.resolve("A", 900, forming_key) is not None and "A" not in tracker
+    release.set()
+    assert future.result(timeout=5.0).value['signal_data']['signal'] == 'BUY'
+    assert pipeline.drain() == []  # speculative results are not queued
+
+    # Different state, wrong bar or failed job -> re-run
+    tracker.start("A", Speculation(1800, forming_key, pipeline.speculate("A", lambda: {}), 0, 5.0))
+    assert tracker.resolve("A", 1800, "other") is None
+    tracker.start("A", Speculation(2700, forming_key, pipeline.speculate("A", lambda: {}), 0, 5.0))
+    assert tracker.resolve("A", 3600, forming_key) is None
+    failed = pipeline.speculate("A", lambda: 1 / 0)
+    failed.result(timeout=5.0)
+    tracker.start("A", Speculation(4500, forming_key, failed, 0, 5.0))
+    assert tracker.resolve("A", 4500, forming_key) is None
+    assert tracker.resolve("B", 4500, forming_key) is None
+
+    assert tracker.stats == {'started': 4, 'confirmed': 1, 'rerun': 3, 'missed': 0}
+    assert pipeline.stats['speculated'] == 4 and pipeline.stats['submitted'] == 0
+    assert make_strategy(speculative_lead_sec=5.0).speculative_lead_sec == 5.0
+    pipeline.shutdown()
+    print("✅ Speculative analysis is confirmed on an unchanged state and re-run otherwise")
+
+
+def run_all_tests():
+    """Run all analysis pipeline tests."""
+    tests = [
+        ("Pipeline Off Thread", test_pipeline_runs_jobs_off_thread),
+        ("Pipeline One Job Per Key", test_pipeline_one_job_per_key),
+        ("Stale Signal Dropped", test_stale_signal_is_dropped),
+        ("Sentiment Deadline", test_sentiment_deadline_and_stage_timings),
+        ("Provisional Signal", test_provisional_signal_executed_once),
+        ("Change Gate", test_change_gate_skips_unchanged_hold),
+        ("Speculative Analysis", test_speculation_confirmed_or_rerun),
+    ]
+
+    print("\n" + "="*60)
+    print("Running Analysis Pipeline Tests")
+    print("="*60 + "\n")
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            print(f"\nTest: {name}")
+            print("-" * 60)
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAILED: {name}")
+            print(f"   Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("="*60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
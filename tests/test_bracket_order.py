@@ -219,11 +219,12 @@ def _make_strategy_stub() -> DeepSeekAIStrategy:
     strategy.enable_auto_sl_tp = True
     strategy.sl_use_support_resistance = True
     strategy.sl_buffer_pct = 0.001
+    strategy.sl_sr_lookback = 0
     strategy.tp_pct_config = {"HIGH": 0.03, "MEDIUM": 0.02, "LOW": 0.01}
     strategy.latest_signal_data = {"confidence": "HIGH"}
     strategy.latest_technical_data = {"support": 950.0, "resistance": 1050.0}
     strategy.latest_price_data = {"price": 1000.0}
-    strategy.indicator_manager = SimpleNamespace(recent_bars=[])
+    strategy.indicator_manager = SimpleNamespace(bar_buffer=[])
     strategy.cache = DummyCache([])
     strategy.bar_type = "BTC-BARS"
     strategy.order_factory = DummyOrderFactory()
@@ -255,7 +256,7 @@ def test_submit_bracket_order_uses_latest_price_data() -> None:
 def test_submit_bracket_order_falls_back_when_price_missing() -> None:
     strategy = _make_strategy_stub()
     strategy.latest_price_data = {}
-    strategy.indicator_manager.recent_bars = []
+    strategy.indicator_manager.bar_buffer = []
     strategy.cache = DummyCache([])
 
     strategy._submit_bracket_order(OrderSide.SELL, 0.02)
@@ -0,0 +1,707 @@
+"""
+Unit tests for DeepSeekAnalyzer (no network access; API calls are mocked).
+
+Run: python tests/test_deepseek_client.py
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+import json
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+SAMPLE_TECHNICAL_DATA = {
+    'sma_5': 90100.0, 'sma_20': 89900.0, 'sma_50': 89500.0,
+    'ema_12': 90050.0, 'ema_26': 89800.0,
+    'rsi': 0.55, 'rsi_pct': 55.0, 'macd': 120.5, 'macd_signal': 100.2, 'macd_histogram': 20.3,
+    'bb_upper': 91000.0, 'bb_middle': 90000.0, 'bb_lower': 89000.0, 'bb_position': 0.6,
+    'volume_ratio': 1.2, 'support': 89200.0, 'resistance': 90800.0,
+    'short_term_trend': '上涨', 'medium_term_trend': '上涨',
+    'macd_trend': 'bullish', 'overall_trend': '强势上涨',
+}
+
+SAMPLE_PRICE_DATA = {
+    'price': 90200.0,
+    'timestamp': '2025-01-01T00:00:00+00:00',
+    'high': 90300.0,
+    'low': 90000.0,
+    'volume': 150.0,
+    'price_change': 0.15,
+    'kline_data': [
+        {'timestamp': i, 'open': 90000.0 + i, 'high': 90100.0 + i, 'low': 89900.0 + i,
+         'close': 90050.0 + i, 'volume': 100.0 + i}
+        for i in range(10)
+    ],
+}
+
+SAMPLE_RESPONSE = {
+    "signal": "BUY",
+    "confidence": "HIGH",
+    "reason": "Strong bullish momentum",
+    "stop_loss": 89000.0,
+    "take_profit": 92000.0,
+    "trend_strength": "STRONG",
+    "risk_assessment": "LOW",
+}
+
+
+def make_completion(content):
+    """Build an object shaped like an OpenAI chat completion."""
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def make_analyzer(**kwargs):
+    """Create an analyzer whose API client is a Mock."""
+    from utils.deepseek_client import DeepSeekAnalyzer
+
+    analyzer = DeepSeekAnalyzer(api_key="test_key", **kwargs)
+    analyzer.client = Mock()
+    analyzer.client.chat.completions.create.return_value = make_completion(json.dumps(SAMPLE_RESPONSE))
+    return analyzer
+
+
+def test_prompt_includes_higher_timeframes():
+    """Higher-timeframe snapshots are rendered into the analysis prompt."""
+    analyzer = make_analyzer()
+    timeframe_data = {'1h': dict(SAMPLE_TECHNICAL_DATA), '4h': dict(SAMPLE_TECHNICAL_DATA, rsi=0.3, rsi_pct=30.0)}
+
+    prompt = analyzer._build_analysis_prompt(
+        SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA, None, None, timeframe_data
+    )
+    assert "【Higher Timeframe Context】" in prompt
+    assert "1h: Trend 强势上涨" in prompt and "4h:" in prompt
+    assert "RSI:55.0 |" in prompt and "RSI:30.0 |" in prompt  # 0-100 scale, like the 70/30 guidance
+
+    plain = analyzer._build_analysis_prompt(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA, None, None)
+    assert "Higher Timeframe" not in plain
+    print("✅ Prompt includes higher-timeframe context when provided")
+
+
+def test_previous_signal_is_per_symbol():
+    """Prompts only show the previous signal of the same symbol."""
+    analyzer = make_analyzer()
+    eth_price_data = dict(SAMPLE_PRICE_DATA, symbol="ETHUSDT")
+
+    signal = analyzer.analyze(eth_price_data, SAMPLE_TECHNICAL_DATA)
+    assert signal['signal'] == "BUY"
+
+    eth_prompt = analyzer._build_analysis_prompt(eth_price_data, SAMPLE_TECHNICAL_DATA, None, None)
+    btc_prompt = analyzer._build_analysis_prompt(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA, None, None)
+    assert "ETH/USDT FUTURES" in eth_prompt and "【Previous Signal】" in eth_prompt
+    assert "BTC/USDT FUTURES" in btc_prompt and "【Previous Signal】" not in btc_prompt
+
+    system_prompt = analyzer.client.chat.completions.create.call_args.kwargs['messages'][0]['content']
+    assert "ETHUSDT-PERP" in system_prompt
+
+    # Position size and P&L are described in the instrument's own assets
+    position = {'side': 'long', 'quantity': 12.5, 'avg_px': 150.0, 'unrealized_pnl': 3.2}
+    sol_price_data = dict(SAMPLE_PRICE_DATA, symbol="SOLUSDC", base_asset="SOL", quote_asset="USDC")
+    sol_prompt = analyzer._build_analysis_prompt(sol_price_data, SAMPLE_TECHNICAL_DATA, None, position)
+    assert "SOL/USDC FUTURES" in sol_prompt and "Size: 12.500 SOL" in sol_prompt
+    assert "P&L: 3.20 USDC" in sol_prompt and "BTC" not in sol_prompt
+    print("✅ Previous signal and prompt header follow the analysed symbol")
+
+
+def make_async_analyzer(handler, **kwargs):
+    """Create an AsyncDeepSeekAnalyzer whose HTTP layer is an in-process mock."""
+    import httpx
+    from utils.deepseek_client import AsyncDeepSeekAnalyzer
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AsyncDeepSeekAnalyzer(api_key="test_key", base_url="http://deepseek.test/v1",
+                                 http_client=client, **kwargs)
+
+
+def completion_response(content):
+    """HTTP response carrying an OpenAI-style chat completion."""
+    import httpx
+
+    return httpx.Response(200, json={
+        "id": "test", "object": "chat.completion", "created": 0, "model": "deepseek-chat",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+    })
+
+
+def test_async_analyze_many_runs_concurrently():
+    """analyze_many() overlaps requests instead of running them back to back."""
+    import asyncio
+    import time
+
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return completion_response(json.dumps(SAMPLE_RESPONSE))
+
+    analyzer = make_async_analyzer(handler)
+    requests = [
+        {'price_data': dict(SAMPLE_PRICE_DATA, symbol=symbol), 'technical_data': SAMPLE_TECHNICAL_DATA}
+        for symbol in ("BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT")
+    ]
+
+    start = time.monotonic()
+    signals = analyzer.analyze_many_sync(requests)
+    elapsed = time.monotonic() - start
+
+    assert [s['signal'] for s in signals] == ["BUY"] * 4
+    assert elapsed < 0.6, f"requests were serialized ({elapsed:.2f}s)"
+    assert set(analyzer.signal_history) == {"BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"}
+
+    # Sync wrapper works too
+    assert analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)['signal'] == "BUY"
+    analyzer.close()
+    print(f"✅ analyze_many ran 4 requests concurrently in {elapsed:.2f}s")
+
+
+def test_async_retry_timeout_and_fallback():
+    """Timed-out attempts are retried with backoff; exhausted retries yield a fallback."""
+    import asyncio
+
+    attempts = []
+
+    async def slow_then_ok(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            await asyncio.sleep(1.0)
+        return completion_response(json.dumps(SAMPLE_RESPONSE))
+
+    analyzer = make_async_analyzer(slow_then_ok, max_retries=2, timeout_sec=0.2,
+                                   backoff_base_sec=0.01)
+    signal = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)
+    assert signal['signal'] == "BUY" and len(attempts) == 2
+    assert analyzer.stats['timeouts'] == 1 and analyzer.stats['retries'] == 1
+    analyzer.close()
+
+    async def always_bad(request):
+        return completion_response("not json at all")
+
+    analyzer = make_async_analyzer(always_bad, max_retries=3, backoff_base_sec=0.01)
+    signal = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)
+    assert signal.get('is_fallback') and signal['signal'] == "HOLD"
+    assert analyzer.stats['requests'] == 3 and analyzer.stats['fallbacks'] == 1
+    analyzer.close()
+    print("✅ Per-attempt timeout, retry with backoff and fallback")
+
+
+def streaming_response(content, piece_size=16, delay=0.02):
+    """HTTP response streaming a chat completion as server-sent events."""
+    import asyncio
+    import httpx
+
+    async def body():
+        for i in range(0, len(content), piece_size):
+            chunk = {
+                "id": "test", "object": "chat.completion.chunk", "created": 0, "model": "deepseek-chat",
+                "choices": [{"index": 0, "delta": {"content": content[i:i + piece_size]}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+            await asyncio.sleep(delay)
+        yield b"data: [DONE]\n\n"
+
+    return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body())
+
+
+def test_streaming_field_extractor():
+    """Fields are reported as soon as they complete, whatever the chunking."""
+    from utils.json_stream import StreamingFieldExtractor
+
+    response = "```json\n" + json.dumps(dict(SAMPLE_RESPONSE, reason='say "hi" {not nested} \\ ok',
+                                              extra={"nested": [1, 2]}, flag=True)) + "\n```"
+    for piece_size in (1, 3, 7, len(response)):
+        extractor = StreamingFieldExtractor()
+        order = []
+        for i in range(0, len(response), piece_size):
+            order.extend(extractor.feed(response[i:i + piece_size]))
+        assert extractor.done
+        assert order[:2] == ["signal", "confidence"]
+        assert extractor.fields['reason'] == 'say "hi" {not nested} \\ ok'
+        assert extractor.fields['stop_loss'] == 89000.0 and extractor.fields['flag'] is True
+        assert "extra" not in extractor.fields
+
+    partial = StreamingFieldExtractor()
+    partial.feed('{"signal": "BUY", "confidence": "HI')
+    assert partial.has('signal') and not partial.has('signal', 'confidence')
+    print("✅ Streaming extractor reports fields as they complete")
+
+
+def test_streaming_reports_decision_before_reason():
+    """Streaming mode emits the provisional decision before the response completes."""
+    response = json.dumps(dict(SAMPLE_RESPONSE, reason="detailed reasoning " * 30))
+
+    async def handler(request):
+        return streaming_response(response)
+
+    decisions = []
+    analyzer = make_async_analyzer(handler, stream=True)
+    signal = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA, on_decision=decisions.append)
+
+    assert decisions == [{'signal': 'BUY', 'confidence': 'HIGH', 'provisional': True,
+                          'time_to_decision_sec': signal['time_to_decision_sec']}]
+    assert signal['reason'].startswith("detailed reasoning")
+    assert signal['time_to_decision_sec'] < signal['response_time_sec'] / 3
+    analyzer.close()
+
+    # A retried attempt streams its decision again; only the first one is published
+    responses = [json.dumps({'signal': 'SELL', 'confidence': 'HIGH'}), response]
+
+    async def incomplete_then_ok(request):
+        return streaming_response(responses.pop(0))
+
+    decisions = []
+    analyzer = make_async_analyzer(incomplete_then_ok, stream=True, backoff_base_sec=0.01)
+    signal = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA, on_decision=decisions.append)
+    assert signal['signal'] == "BUY" and signal['attempts'] == 2
+    assert [d['signal'] for d in decisions] == ["SELL"]
+    analyzer.close()
+    print(f"✅ Decision after {signal['time_to_decision_sec']:.2f}s, "
+          f"full response after {signal['response_time_sec']:.2f}s")
+
+
+def test_signal_cache_ttl_lru_and_disk():
+    """Cache keys quantize market state; entries expire, are LRU-bounded and persist."""
+    import os
+    import tempfile
+    from utils.response_cache import SignalCache
+
+    cache = SignalCache(ttl_sec=60, max_entries=2)
+    key = cache.make_key(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)
+
+    # Small price move stays in the band; RSI bucket / position / MACD sign changes do not
+    assert cache.make_key(dict(SAMPLE_PRICE_DATA, price=90250.0), SAMPLE_TECHNICAL_DATA) == key
+    assert cache.make_key(SAMPLE_PRICE_DATA, dict(SAMPLE_TECHNICAL_DATA, rsi=0.71, rsi_pct=71.0)) != key
+    assert cache.make_key(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA, current_position={'side': 'long'}) != key
+    assert cache.make_key(SAMPLE_PRICE_DATA, dict(SAMPLE_TECHNICAL_DATA, macd_histogram=-1.0)) != key
+    assert cache.make_key(SAMPLE_PRICE_DATA, dict(SAMPLE_TECHNICAL_DATA, rsi_pct=57.0)) == key
+
+    cache.put(key, SAMPLE_RESPONSE, now=1000.0)
+    assert cache.get(key, now=1030.0)['cache_age_sec'] == 30.0
+    assert cache.get(key, now=1061.0) is None  # expired
+
+    for name in ("a", "b", "c"):
+        cache.put(name, SAMPLE_RESPONSE, now=1000.0)
+    assert cache.get("a", now=1000.0) is None  # evicted (LRU)
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['evictions'] == 1
+    assert abs(stats['hit_rate'] - 1 / 3) < 1e-9
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "cache.db")
+        first = SignalCache(ttl_sec=3600, db_path=db_path)
+        first.put(key, SAMPLE_RESPONSE)
+        first.close()
+
+        restarted = SignalCache(ttl_sec=3600, db_path=db_path)
+        assert restarted.get(key)['signal'] == "BUY"
+        assert restarted.stats['disk_hits'] == 1
+        restarted.close()
+    print("✅ Signal cache quantizes keys, expires, evicts and persists to SQLite")
+
+
+def test_analyzer_reuses_cached_signal():
+    """An unchanged market state is answered from the cache without an API call."""
+    from utils.response_cache import SignalCache
+
+    analyzer = make_analyzer(cache=SignalCache(ttl_sec=60))
+    create = analyzer.client.chat.completions.create
+
+    fresh = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)
+    cached = analyzer.analyze(dict(SAMPLE_PRICE_DATA, price=90210.0), SAMPLE_TECHNICAL_DATA)
+    assert fresh['cached'] is False
+    assert cached['cached'] is True and cached['signal'] == fresh['signal']
+    assert create.call_count == 1
+
+    # Position change -> new key -> model is asked again
+    analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA, current_position={'side': 'long'})
+    assert create.call_count == 2
+
+    # Fallback signals are never cached
+    create.side_effect = RuntimeError("API down")
+    state = dict(SAMPLE_TECHNICAL_DATA, rsi=0.2, rsi_pct=20.0)
+    assert analyzer.analyze(SAMPLE_PRICE_DATA, state)['is_fallback']
+    create.side_effect = None
+    assert analyzer.analyze(SAMPLE_PRICE_DATA, state)['cached'] is False
+    assert analyzer.get_cache_stats()['hits'] == 1
+    print("✅ Cached signals are reused and marked as cached")
+
+
+def test_compact_prompt_halves_input_tokens():
+    """Compact mode keeps a static system prefix and at most half the input tokens."""
+    from utils.prompt_encoder import COMPACT_SYSTEM_PROMPT, estimate_message_tokens
+
+    sentiment = {'positive_ratio': 0.6, 'negative_ratio': 0.3, 'net_sentiment': 0.3}
+    position = {'side': 'long', 'quantity': 0.01, 'avg_px': 90000.0, 'unrealized_pnl': 2.0}
+    timeframes = {'1h': SAMPLE_TECHNICAL_DATA, '4h': SAMPLE_TECHNICAL_DATA}
+    args = (SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA, sentiment, position, timeframes)
+
+    full = make_analyzer()._build_messages(*args)
+    compact_analyzer = make_analyzer(prompt_mode="compact")
+    compact = compact_analyzer._build_messages(*args)
+    eth = compact_analyzer._build_messages(dict(SAMPLE_PRICE_DATA, symbol="ETHUSDT"), *args[1:])
+
+    full_tokens, compact_tokens = estimate_message_tokens(full), estimate_message_tokens(compact)
+    assert compact_tokens * 2 <= full_tokens, (compact_tokens, full_tokens)
+    assert compact[0]['content'] == eth[0]['content'] == COMPACT_SYSTEM_PROMPT
+    assert eth[1]['content'].startswith("ETHUSDT")
+    assert '"rsi":55' in compact[1]['content']  # 0-1 RSI rendered on a 0-100 scale
+    assert "o,h,l,c,v,chg,body" in compact[1]['content']
+
+    # Same response schema, token estimate reported on the signal
+    signal = compact_analyzer.analyze(*args)
+    assert signal['signal'] == "BUY" and signal['prompt_tokens_est'] == compact_tokens
+    print(f"✅ Compact prompt ~{compact_tokens} tokens vs ~{full_tokens} (full)")
+
+
+def test_kline_renderer_is_incremental():
+    """K-line lines are rendered once per bar and match the analyzer's formatting."""
+    from types import SimpleNamespace
+    from utils.prompt_renderer import KlinePromptRenderer
+
+    klines = SAMPLE_PRICE_DATA['kline_data']
+    renderer = KlinePromptRenderer(mode="full", max_bars=10)
+    for k in klines:
+        renderer.update_bar(SimpleNamespace(open=k['open'], high=k['high'], low=k['low'],
+                                            close=k['close'], volume=k['volume']))
+
+    analyzer = make_analyzer()
+    assert renderer.render() == analyzer._format_kline_data(klines)
+    assert renderer.render() is renderer.render()  # cached until the next bar
+    assert renderer.stats['renders'] == 1 and renderer.stats['render_cache_hits'] == 2
+
+    # A new bar renders exactly one line and rolls the window
+    renderer.update(91000.0, 91100.0, 90900.0, 91050.0, 10.0)
+    assert renderer.stats['lines_rendered'] == 11 and len(renderer) == 10
+    text = renderer.render()
+    assert text.count("\nK") == 10 and "K10: 🟢 Bullish | O:91000.00" in text
+
+    # The analyzer uses pre-rendered text of its own mode, in both prompt modes
+    price_data = dict(SAMPLE_PRICE_DATA, kline_data=[], kline_text=text, kline_format="full")
+    assert text in analyzer._build_messages(price_data, SAMPLE_TECHNICAL_DATA, None, None)[1]['content']
+
+    compact = KlinePromptRenderer(mode="compact", max_bars=200)
+    for i in range(300):
+        compact.update(100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1.0)
+    rows = compact.render().split("\n")
+    assert rows[0] == "o,h,l,c,v,chg,body" and len(rows) == 201 and rows[-1].startswith("399,")
+    price_data = dict(SAMPLE_PRICE_DATA, kline_text=compact.render(), kline_format="compact")
+    messages = make_analyzer(prompt_mode="compact")._build_messages(price_data, SAMPLE_TECHNICAL_DATA, None, None)
+    assert rows[-1] in messages[1]['content']
+    print("✅ K-line prompt lines rendered incrementally")
+
+
+def test_stub_server_scripts_errors_and_malformed_responses():
+    """The local stub drives the analyzer offline: scripted signals, errors, broken JSON."""
+    from utils.deepseek_client import AsyncDeepSeekAnalyzer
+    from utils.deepseek_stub_server import DeepSeekStubServer
+
+    with DeepSeekStubServer(signals=["BUY", "SELL", "HOLD"], latency_ms=5) as stub:
+        analyzer = AsyncDeepSeekAnalyzer(api_key="stub", base_url=stub.base_url, stream=True)
+        signals = [analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA) for _ in range(3)]
+        assert [s['signal'] for s in signals] == ["BUY", "SELL", "HOLD"]
+        assert signals[0]['stop_loss'] == round(SAMPLE_PRICE_DATA['price'] * 0.99, 2)
+        analyzer.close()
+
+    with DeepSeekStubServer(error_rate=1.0) as stub:
+        analyzer = AsyncDeepSeekAnalyzer(api_key="stub", base_url=stub.base_url,
+                                         max_retries=3, backoff_base_sec=0.01)
+        assert analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)['is_fallback']
+        assert stub.stats['errors'] == 3 and analyzer.stats['retries'] == 2
+        analyzer.close()
+
+    outcomes = {}
+    for kind in ("truncated", "unescaped_quotes", "prose", "missing_fields"):
+        with DeepSeekStubServer(signals=["BUY"], malformed_rate=1.0, malformed_kinds=[kind]) as stub:
+            analyzer = AsyncDeepSeekAnalyzer(api_key="stub", base_url=stub.base_url, max_retries=1)
+            outcomes[kind] = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)['signal']
+            analyzer.close()
+    assert outcomes == {'truncated': 'HOLD', 'unescaped_quotes': 'BUY', 'prose': 'BUY', 'missing_fields': 'HOLD'}
+    print(f"✅ Stub server: scripted signals, retries on errors, malformed outcomes {outcomes}")
+
+
+def test_record_and_replay_decisions():
+    """Recorded exchanges replay by prompt hash without calling the model."""
+    import os
+    import tempfile
+    from utils.decision_log import DecisionLog
+
+    responses = [dict(SAMPLE_RESPONSE, signal=signal) for signal in ("BUY", "HOLD", "SELL")]
+    inputs = [dict(SAMPLE_PRICE_DATA, price=90200.0 + 100 * i) for i in range(3)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "decisions.log")
+
+        recorder = make_analyzer(record_log=DecisionLog(path))
+        recorder.client.chat.completions.create.side_effect = [
+            make_completion(json.dumps(response)) for response in responses
+        ]
+        live = [recorder.analyze(price_data, SAMPLE_TECHNICAL_DATA)['signal'] for price_data in inputs]
+        recorder.record_log.close()
+
+        # Replay: different wall-clock timestamps, same decisions, no API calls
+        replayer = make_analyzer(replay_log=DecisionLog(path, mode="replay"))
+        replayed = [
+            replayer.analyze(dict(price_data, timestamp="2025-06-01T00:00:07+00:00"), SAMPLE_TECHNICAL_DATA)
+            for price_data in inputs
+        ]
+        assert [r['signal'] for r in replayed] == live == ["BUY", "HOLD", "SELL"]
+        assert all(r['replayed'] for r in replayed)
+        assert not replayer.client.chat.completions.create.called
+
+        # Unknown prompt -> fallback HOLD
+        miss = replayer.analyze(dict(SAMPLE_PRICE_DATA, price=1.0), SAMPLE_TECHNICAL_DATA)
+        assert miss['is_fallback'] and replayer.replay_log.stats == {'records': 0, 'hits': 3, 'misses': 1}
+        replayer.replay_log.close()
+
+        # A torn last record and a lost index are repaired on open
+        with open(path, "ab") as f:
+            f.write(b"00000999\t{\"hash\"")
+        os.remove(path + ".idx")
+        repaired = DecisionLog(path, mode="replay")
+        assert len(repaired) == 3
+        repaired.close()
+    print("✅ Decisions recorded and replayed by prompt hash")
+
+
+def test_hedged_requests_and_decision_deadline():
+    """A slow request is hedged at the latency quantile; the deadline bounds a decision."""
+    import asyncio
+    from utils.latency_histogram import LatencyHistogram
+
+    histogram = LatencyHistogram(window=4)
+    for value in (0.1, 0.2, 0.3, 0.4, 10.0):
+        histogram.record(value)
+    assert len(histogram) == 4 and 9.5 < histogram.quantile(1.0) <= 10.5
+    assert 0.19 <= histogram.quantile(0.25) <= 0.21  # 0.1 expired
+
+    calls = []
+
+    async def stalls_every_fifth(request):
+        calls.append(request)
+        await asyncio.sleep(2.0 if len(calls) % 5 == 0 else 0.02)
+        return completion_response(json.dumps(SAMPLE_RESPONSE))
+
+    analyzer = make_async_analyzer(stalls_every_fifth, hedge_quantile=0.9, hedge_min_samples=4,
+                                   hedge_min_delay_sec=0.05, timeout_sec=5.0)
+    for _ in range(4):
+        assert analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)['hedged'] is False
+    signal = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)  # 5th request stalls
+    assert signal['signal'] == "BUY" and signal['hedged'] is True
+    assert signal['response_time_sec'] < 1.0
+    assert analyzer.stats['hedges_fired'] == 1 and analyzer.stats['hedges_won'] == 1
+    analyzer.close()
+
+    async def never_answers(request):
+        await asyncio.sleep(5.0)
+        return completion_response(json.dumps(SAMPLE_RESPONSE))
+
+    analyzer = make_async_analyzer(never_answers, timeout_sec=2.0, decision_deadline_sec=0.3)
+    signal = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)
+    assert signal.get('is_fallback') and analyzer.stats['deadline_exceeded'] == 1
+    analyzer.close()
+    print("✅ Hedge fired and won on a stalled request; deadline returned a fallback")
+
+
+def test_circuit_breaker_fast_fails_to_local_signal():
+    """Consecutive failures open the breaker; calls fast-fail locally, then a probe closes it."""
+    import httpx
+    from utils.circuit_breaker import CircuitBreaker
+
+    now = [0.0]
+    healthy = [False]
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if healthy[0]:
+            return completion_response(json.dumps(SAMPLE_RESPONSE))
+        return httpx.Response(503, json={"error": {"message": "overloaded"}})
+
+    breaker = CircuitBreaker(failure_threshold=3, open_sec=30.0, clock=lambda: now[0])
+    analyzer = make_async_analyzer(handler, max_retries=2, backoff_base_sec=0.0,
+                                   circuit_breaker=breaker)
+
+    analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)  # 2 failures
+    signal = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)  # 3rd trips, 4th fast-fails
+    assert breaker.state == "OPEN" and len(calls) == 3
+    assert signal['local_fallback'] and signal['signal'] == "BUY" and signal['confidence'] == "LOW"
+
+    signal = analyzer.analyze(SAMPLE_PRICE_DATA, dict(SAMPLE_TECHNICAL_DATA, macd_histogram=-5.0))
+    assert len(calls) == 3 and signal['signal'] == "HOLD"  # no request while open
+
+    # Failed probe doubles the cooldown; a successful one closes the breaker
+    now[0] = 31.0
+    analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)
+    assert len(calls) == 4 and breaker.state == "OPEN" and breaker.cooldown_sec == 60.0
+    now[0] = 92.0
+    healthy[0] = True
+    signal = analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA)
+    assert not signal.get('is_fallback') and breaker.state == "CLOSED"
+
+    status = analyzer.get_breaker_status()
+    assert status['trips'] == 2 and status['probes'] == 2 and status['fast_fails'] == 3
+    analyzer.close()
+    print("✅ Breaker opened, fast-failed to local signals and closed after a probe")
+
+
+def test_breaker_status_survives_markdown():
+    """Raw provider errors in the breaker status are escaped; unparsable replies fall back to plain text."""
+    import asyncio
+    from utils.telegram_bot import TelegramBot
+    from utils.telegram_command_handler import TelegramCommandHandler
+
+    bot = TelegramBot("123:abc", "1", enabled=False)
+    msg = bot.format_status_response({'is_running': True, 'ai_breaker': {
+        'state': 'HALF_OPEN', 'trips': 1, 'fast_fails': 2, 'retry_in_sec': None,
+        'last_trip_reason': "probe failed: Error code: 429 - rate_limit_exceeded *",
+    }})
+    assert "HALF\\_OPEN" in msg and "rate\\_limit\\_exceeded \\*" in msg
+
+    sent = []
+
+    async def reply_text(text, parse_mode=None):
+        if parse_mode:
+            raise Exception("Can't parse entities: can't find end of the entity")
+        sent.append(text)
+
+    handler = TelegramCommandHandler("123:abc", ["1"], strategy_callback=Mock())
+    update = SimpleNamespace(message=SimpleNamespace(reply_text=reply_text))
+    asyncio.run(handler._send_response(update, "*broken_markdown"))
+    assert sent == ["*broken_markdown"]
+    print("✅ /status escapes breaker errors and falls back to plain text")
+
+
+def test_metrics_track_tokens_latency_retries_and_repairs():
+    """get_metrics() reports tokens, latency percentiles, retries, repairs and fallbacks."""
+    import httpx
+
+    responses = iter([
+        ("ok", json.dumps(SAMPLE_RESPONSE)),
+        ("ok", "```json\n" + json.dumps(SAMPLE_RESPONSE) + "\n```"),
+        ("error", None), ("ok", json.dumps(SAMPLE_RESPONSE)),
+        ("error", None), ("error", None),
+    ])
+
+    async def handler(request):
+        kind, content = next(responses)
+        if kind == "error":
+            return httpx.Response(500, json={"error": {"message": "boom"}})
+        response = completion_response(content)
+        body = json.loads(response.content)
+        body['usage'] = {'prompt_tokens': 900, 'completion_tokens': 120, 'total_tokens': 1020}
+        return httpx.Response(200, json=body)
+
+    analyzer = make_async_analyzer(handler, max_retries=2, backoff_base_sec=0.0)
+    signals = [analyzer.analyze(SAMPLE_PRICE_DATA, SAMPLE_TECHNICAL_DATA) for _ in range(4)]
+    assert [s.get('attempts') for s in signals] == [1, 1, 2, 2]
+    assert signals[0]['prompt_tokens'] == 900 and not signals[0]['tokens_estimated']
+
+    metrics = analyzer.get_metrics()
+    assert metrics['decisions'] == 4
+    assert metrics['by_source']['model'] == 3 and metrics['by_source']['fallback'] == 1
+    assert metrics['fallback_rate'] == 0.25 and metrics['retries'] == 2
+    assert metrics['repaired'] == 1 and metrics['repairs'] == {'code_fence': 1}
+    assert metrics['prompt_tokens']['total'] == 2700 and 850 <= metrics['prompt_tokens']['p50'] <= 950
+    latency = metrics['latency_sec']
+    assert latency['p50'] <= latency['p95'] <= latency['p99']
+    assert metrics['requests']['requests'] == 6
+    analyzer.close()
+    print(f"✅ Metrics: p50 {latency['p50'] * 1000:.1f}ms, {metrics['retries']} retries, "
+          f"fallback rate {metrics['fallback_rate']:.0%}")
+
+
+def test_batch_prompt_demultiplexes_signals_per_symbol():
+    """One request per chunk; the JSON array is split per symbol with per-item fallback."""
+    import re
+    from utils.prompt_encoder import estimate_message_tokens
+
+    requests_seen = []
+
+    async def handler(request):
+        user_message = json.loads(request.content)['messages'][1]['content']
+        symbols = re.findall(r"^### (\S+)", user_message, re.M)
+        requests_seen.append(symbols)
+        items = [dict(SAMPLE_RESPONSE, symbol=symbol) for symbol in reversed(symbols)]
+        for item in items:
+            if item['symbol'] == "DOGEUSDT":
+                item['confidence'] = "VERY HIGH"  # invalid -> fallback for this item only
+        return completion_response("```json\n" + json.dumps(items) + "\n```")
+
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "DOGEUSDT"]
+    batch = [
+        {'price_data': dict(SAMPLE_PRICE_DATA, symbol=symbol), 'technical_data': SAMPLE_TECHNICAL_DATA}
+        for symbol in symbols
+    ]
+    analyzer = make_async_analyzer(handler, prompt_mode="compact", batch_size=2)
+    signals = analyzer.analyze_batch(batch)
+
+    assert sorted(map(len, requests_seen)) == [1, 2, 2]
+    assert [s['signal'] for s in signals] == ["BUY"] * 4 + ["HOLD"]
+    assert signals[-1]['is_fallback'] and not signals[0].get('is_fallback')
+    assert signals[0]['parse_repairs'] == ["code_fence"] and signals[0]['batch_size'] == 2
+    assert set(analyzer.signal_history) == set(symbols[:4])
+
+    # Fixed prompt overhead is paid once per chunk instead of once per symbol
+    single = sum(estimate_message_tokens(analyzer._build_messages(
+        r['price_data'], r['technical_data'], None, None)) for r in batch[:2])
+    batched = estimate_message_tokens(analyzer._build_batch_messages(batch[:2]))
+    assert batched < single * 0.75
+    assert analyzer.get_metrics()['by_source'] == {
+        'model': 4, 'cache': 0, 'replay': 0, 'local': 0, 'fallback': 1,
+    }
+    analyzer.close()
+    print(f"✅ 5 symbols in 3 requests; 2-symbol prompt {batched} vs {single} tokens unbatched")
+
+
+def run_all_tests():
+    """Run all DeepSeek client tests."""
+    tests = [
+        ("Prompt Higher Timeframes", test_prompt_includes_higher_timeframes),
+        ("Previous Signal Per Symbol", test_previous_signal_is_per_symbol),
+        ("Async Analyze Many", test_async_analyze_many_runs_concurrently),
+        ("Async Retry/Timeout", test_async_retry_timeout_and_fallback),
+        ("Streaming Field Extractor", test_streaming_field_extractor),
+        ("Streaming Early Decision", test_streaming_reports_decision_before_reason),
+        ("Signal Cache", test_signal_cache_ttl_lru_and_disk),
+        ("Analyzer Cache Reuse", test_analyzer_reuses_cached_signal),
+        ("Compact Prompt", test_compact_prompt_halves_input_tokens),
+        ("K-line Renderer", test_kline_renderer_is_incremental),
+        ("Stub Server", test_stub_server_scripts_errors_and_malformed_responses),
+        ("Record/Replay", test_record_and_replay_decisions),
+        ("Hedging/Deadline", test_hedged_requests_and_decision_deadline),
+        ("Circuit Breaker", test_circuit_breaker_fast_fails_to_local_signal),
+        ("Breaker Status Markdown", test_breaker_status_survives_markdown),
+        ("Metrics", test_metrics_track_tokens_latency_retries_and_repairs),
+        ("Batch Prompt", test_batch_prompt_demultiplexes_signals_per_symbol),
+    ]
+
+    print("\n" + "="*60)
+    print("Running DeepSeek Client Tests")
+    print("="*60 + "\n")
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            print(f"\nTest: {name}")
+            print("-" * 60)
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAILED: {name}")
+            print(f"   Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("="*60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,236 @@
+"""
+Fuzz and benchmark tests for the tolerant model-response JSON parser.
+
+Run: python tests/test_json_repair.py
+"""
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+MODEL_CALL_SEC = 2.0  # typical DeepSeek round trip, paid again on every retry
+
+BASE_RESPONSE = {
+    "signal": "BUY",
+    "confidence": "HIGH",
+    "reason": "(1) Price above all SMAs. (2) RSI at 58 shows healthy momentum. (3) Support at $89,200 held.",
+    "stop_loss": 89100.0,
+    "take_profit": 92000.0,
+    "trend_strength": "STRONG",
+    "risk_assessment": "LOW",
+}
+
+
+def legacy_safe_parse_json(json_str):
+    """Previous DeepSeekAnalyzer._safe_parse_json (baseline for comparison)."""
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        start_idx = json_str.find('{')
+        end_idx = json_str.rfind('}') + 1
+        if start_idx != -1 and end_idx != 0:
+            json_str_original = json_str[start_idx:end_idx]
+            try:
+                lines = json_str_original.split('\n')
+                fixed_lines = []
+                for line in lines:
+                    if '": "' in line and line.strip().endswith((',', '",')):
+                        key_end = line.find('": "') + 4
+                        if line.strip().endswith(','):
+                            value_end = line.rfind('",')
+                        else:
+                            value_end = line.rfind('"')
+                        if key_end > 4 and value_end > key_end:
+                            prefix = line[:key_end]
+                            value = line[key_end:value_end]
+                            suffix = line[value_end:]
+                            fixed_lines.append(prefix + value.replace('"', "'") + suffix)
+                        else:
+                            fixed_lines.append(line)
+                    else:
+                        fixed_lines.append(line)
+                return json.loads('\n'.join(fixed_lines))
+            except Exception:
+                pass
+        return None
+
+
+def quote_reason(text, rng):
+    """Insert unescaped double quotes around a word of the reason."""
+    words = text.split(' ')
+    i = rng.randrange(len(words))
+    words[i] = f'"{words[i]}"'
+    return ' '.join(words)
+
+
+def make_corpus(count=400, seed=7):
+    """
+    Malformed responses modelled on real failures.
+
+    Returns (text, expected) pairs; expected is None where no parser can
+    recover all required fields.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        response = dict(BASE_RESPONSE, signal=rng.choice(["BUY", "SELL", "HOLD"]))
+        indent = rng.choice([None, 2, 4])
+        kind = rng.choice([
+            "clean", "fence", "prose", "quotes", "quotes_fence", "trailing_comma",
+            "raw_newline", "numeric_string", "missing_brace", "truncated",
+        ])
+        expected = dict(response)
+
+        if kind in ("quotes", "quotes_fence"):
+            response['reason'] = quote_reason(response['reason'], rng)
+            expected['reason'] = response['reason'].replace('"', "'")
+            text = json.dumps(response, indent=indent).replace(
+                json.dumps(response['reason']), '"' + response['reason'] + '"'
+            )
+            if kind == "quotes_fence":
+                text = f"```json\n{text}\n```"
+        else:
+            text = json.dumps(response, indent=indent)
+
+        if kind == "fence":
+            text = f"```json\n{text}\n```"
+        elif kind == "prose":
+            text = f"Based on the data, here is my decision:\n{text}\nLet me know if you need more."
+        elif kind == "trailing_comma":
+            text = text[:text.rfind('}')].rstrip() + ",\n}"
+        elif kind == "raw_newline":
+            text = text.replace("(2)", "\n(2)")
+            expected['reason'] = response['reason'].replace("(2)", "\n(2)")
+        elif kind == "numeric_string":
+            text = text.replace(json.dumps(response['stop_loss']), f'"{response["stop_loss"]}"')
+        elif kind == "missing_brace":
+            text = text[:text.rfind('}')]
+        elif kind == "truncated":
+            text = text[:text.find('"reason"') + 30]
+            expected = None
+        corpus.append((text, expected))
+    return corpus
+
+
+def matches(parsed, expected):
+    """Parsed result carries the expected values of all schema fields."""
+    if parsed is None or expected is None:
+        return False
+    return all(parsed.get(key) == value for key, value in expected.items())
+
+
+def test_fuzz_parses_more_than_legacy():
+    """The tolerant parser recovers every response the old parser did, and more."""
+    from utils.json_repair import parse_signal_json
+
+    corpus = make_corpus()
+    legacy_ok = new_ok = 0
+    for text, expected in corpus:
+        legacy = matches(legacy_safe_parse_json(text), expected)
+        parsed, repairs = parse_signal_json(text)
+        new = matches(parsed, expected)
+        assert new or not legacy, f"regression on: {text!r}"
+        assert new or expected is None, f"not recovered ({repairs}): {text!r}"
+        legacy_ok += legacy
+        new_ok += new
+
+    recoverable = sum(expected is not None for _, expected in corpus)
+    assert new_ok == recoverable and new_ok > legacy_ok
+    print(f"✅ Recovered {new_ok}/{recoverable} responses (legacy parser: {legacy_ok})")
+
+
+def test_repairs_are_reported():
+    """Each applied repair is named; clean JSON reports none."""
+    from utils.json_repair import parse_signal_json
+
+    clean = json.dumps(BASE_RESPONSE)
+    assert parse_signal_json(clean) == (BASE_RESPONSE, [])
+
+    text = ('```json\n{"signal": " buy", "confidence": "HIGH", '
+            '"reason": "Price "broke" out", "stop_loss": "89,100", "take_profit": 92000,}\n```')
+    parsed, repairs = parse_signal_json(text)
+    assert parsed['signal'] == "BUY" and parsed['reason'] == "Price 'broke' out"
+    assert parsed['stop_loss'] == 89100.0
+    assert repairs == ["code_fence", "unescaped_quotes", "trailing_comma", "numeric_string", "enum_case"]
+
+    parsed, repairs = parse_signal_json('{"signal": "SELL", "confidence": "LOW", "reason": "cut')
+    assert parsed == {'signal': 'SELL', 'confidence': 'LOW'} and repairs == ["truncated"]
+    assert parse_signal_json("no json here") == (None, ["no_object"])
+    print("✅ Repairs reported by name")
+
+
+def test_benchmark_against_legacy():
+    """Per-response parse cost, and the API retries each parser forces."""
+    from utils.json_repair import parse_signal_json
+
+    corpus = make_corpus()
+    texts = [text for text, _ in corpus]
+    rounds = 20
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        legacy_results = [legacy_safe_parse_json(text) for text in texts]
+    legacy_us = (time.perf_counter() - start) / (rounds * len(texts)) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        new_results = [parse_signal_json(text)[0] for text in texts]
+    new_us = (time.perf_counter() - start) / (rounds * len(texts)) * 1e6
+
+    # Every unparsed response costs a full model call (seconds) in analyze()'s retry loop
+    legacy_retries = sum(not matches(r, e) for r, (_, e) in zip(legacy_results, corpus))
+    new_retries = sum(not matches(r, e) for r, (_, e) in zip(new_results, corpus))
+    assert new_retries < legacy_retries
+    assert new_us < 1000, f"parser too slow: {new_us:.0f}us per response"
+
+    # Effective cost per response: parse time plus the model calls it forces
+    new_cost_us = new_us + new_retries / len(texts) * MODEL_CALL_SEC * 1e6
+    legacy_cost_us = legacy_us + legacy_retries / len(texts) * MODEL_CALL_SEC * 1e6
+    assert new_cost_us < legacy_cost_us
+    print(f"✅ {new_us:.1f}us/response (legacy {legacy_us:.1f}us); "
+          f"retries forced: {new_retries} vs {legacy_retries} (legacy); "
+          f"effective {new_cost_us / 1000:.0f}ms vs {legacy_cost_us / 1000:.0f}ms per response")
+
+
+def run_all_tests():
+    """Run all JSON repair tests."""
+    tests = [
+        ("Fuzz vs Legacy", test_fuzz_parses_more_than_legacy),
+        ("Repairs Reported", test_repairs_are_reported),
+        ("Benchmark", test_benchmark_against_legacy),
+    ]
+
+    print("\n" + "="*60)
+    print("Running JSON Repair Tests")
+    print("="*60 + "\n")
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            print(f"\nTest: {name}")
+            print("-" * 60)
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAILED: {name}")
+            print(f"   Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("="*60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,239 @@
+"""
+Unit tests for multi-instrument mode (analysis scheduler and per-instrument state).
+
+Run: python tests/test_multi_instrument.py
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+SECOND = 1_000_000_000
+T0 = 1_700_000_000 * SECOND
+
+
+def make_strategy(additional=("ETHUSDT-PERP.BINANCE", "SOLUSDT-PERP.BINANCE"), **overrides):
+    """Create a multi-instrument strategy (not registered with a trader)."""
+    from strategy.deepseek_strategy import DeepSeekAIStrategy, DeepSeekAIStrategyConfig
+
+    config = DeepSeekAIStrategyConfig(
+        instrument_id="BTCUSDT-PERP.BINANCE",
+        bar_type="BTCUSDT-PERP.BINANCE-15-MINUTE-LAST-EXTERNAL",
+        additional_instrument_ids=additional,
+        deepseek_api_key="test_key",
+        sentiment_enabled=False,
+        **overrides,
+    )
+    return DeepSeekAIStrategy(config)
+
+
+def make_bar(instrument_id, close, ts):
+    """Bar-shaped object routed by bar_type.instrument_id."""
+    return SimpleNamespace(
+        bar_type=SimpleNamespace(instrument_id=instrument_id),
+        open=close, high=close + 1.0, low=close - 1.0, close=close, volume=10.0,
+        ts_init=ts, ts_event=ts,
+    )
+
+
+def test_scheduler_staggers_instruments():
+    """Each instrument is due once per interval, offset by interval / N."""
+    from utils.analysis_scheduler import AnalysisScheduler
+
+    scheduler = AnalysisScheduler(keys=["A", "B", "C"], interval_sec=900)
+    assert scheduler.tick_interval_sec == 300
+    scheduler.start(T0)
+
+    fired = []
+    for tick in range(1, 10):
+        fired.append(scheduler.due(T0 + tick * 300 * SECOND))
+
+    assert fired == [["A"], ["B"], ["C"]] * 3
+    print("✅ Scheduler staggers instruments evenly across the interval")
+
+
+def test_scheduler_rate_limit_defers_calls():
+    """Calls over the per-minute limit stay due and run on a later tick."""
+    from utils.analysis_scheduler import AnalysisScheduler
+
+    scheduler = AnalysisScheduler(keys=["A", "B", "C", "D"], interval_sec=60, max_calls_per_minute=2)
+    scheduler.start(T0 - 60 * SECOND)  # everything overdue
+
+    assert scheduler.due(T0) == ["A", "B"]
+    assert scheduler.due(T0 + 15 * SECOND) == []
+    assert scheduler.stats['rate_limited'] == 5  # C, D, then A, C, D
+    assert scheduler.due(T0 + 61 * SECOND) == ["C", "D"]
+    print("✅ Rate limit defers calls without dropping instruments")
+
+
+def test_scheduler_skips_missed_cycles():
+    """A key that fell behind several intervals runs once, not once per missed cycle."""
+    from utils.analysis_scheduler import AnalysisScheduler
+
+    scheduler = AnalysisScheduler(keys=["A"], interval_sec=60)
+    scheduler.start(T0)
+
+    assert scheduler.due(T0 + 300 * SECOND) == ["A"]
+    assert scheduler.due(T0 + 301 * SECOND) == []
+    assert scheduler.next_due("A") == T0 + 360 * SECOND
+    print("✅ Missed cycles are skipped instead of replayed")
+
+
+def test_strategy_builds_context_per_instrument():
+    """Each instrument gets its own bar type and indicator manager."""
+    from nautilus_trader.model.identifiers import InstrumentId
+
+    strategy = make_strategy()
+    contexts = list(strategy.instrument_contexts.values())
+
+    assert [str(ctx.instrument_id) for ctx in contexts] == [
+        "BTCUSDT-PERP.BINANCE", "ETHUSDT-PERP.BINANCE", "SOLUSDT-PERP.BINANCE",
+    ]
+    assert str(contexts[1].bar_type) == "ETHUSDT-PERP.BINANCE-15-MINUTE-LAST-EXTERNAL"
+    assert len({id(ctx.indicator_manager) for ctx in contexts}) == 3
+    assert contexts[1].base_asset == "ETH" and contexts[2].symbol == "SOLUSDT"
+
+    # Primary instrument is active by default
+    assert strategy.instrument_id == InstrumentId.from_str("BTCUSDT-PERP.BINANCE")
+    assert strategy.indicator_manager is contexts[0].indicator_manager
+    print("✅ Strategy builds one context per instrument")
+
+
+def test_bars_are_routed_by_instrument():
+    """on_bar updates only the indicator manager of the bar's instrument."""
+    strategy = make_strategy()
+    btc, eth, sol = strategy.instrument_contexts.values()
+
+    for i in range(5):
+        strategy.on_bar(make_bar(btc.instrument_id, 90000.0 + i, T0 + i * 900 * SECOND))
+    strategy.on_bar(make_bar(eth.instrument_id, 3000.0, T0))
+
+    assert len(btc.indicator_manager.bar_buffer) == 5
+    assert len(eth.indicator_manager.bar_buffer) == 1
+    assert len(sol.indicator_manager.bar_buffer) == 0
+    assert eth.indicator_manager.bar_buffer.latest('close') == 3000.0
+    print("✅ Bars are routed to their instrument's indicators")
+
+
+def test_activate_instrument_preserves_state():
+    """Switching instruments saves and restores per-instrument signal state."""
+    strategy = make_strategy()
+    btc, eth, _ = strategy.instrument_contexts.values()
+
+    strategy.last_signal = {'signal': 'BUY'}
+    strategy._activate_instrument(eth)
+    assert strategy.instrument_id == eth.instrument_id
+    assert strategy.last_signal is None
+
+    strategy.last_signal = {'signal': 'SELL'}
+    strategy._activate_instrument(btc)
+    assert strategy.last_signal == {'signal': 'BUY'}
+    assert eth.last_signal == {'signal': 'SELL'}
+    print("✅ Activating an instrument preserves each instrument's state")
+
+
+def test_position_size_uses_instrument_rules():
+    """Quantities are rounded to the active instrument's increment and minimum notional."""
+    strategy = make_strategy()
+    btc, _, sol = strategy.instrument_contexts.values()
+    btc.instrument = SimpleNamespace(size_increment=0.001, min_quantity=0.001, min_notional=100.0, size_precision=3)
+    sol.instrument = SimpleNamespace(size_increment=1.0, min_quantity=1.0, min_notional=5.0, size_precision=0)
+    signal = {'confidence': 'MEDIUM'}
+    technical = {'overall_trend': 'N/A', 'rsi': 0.5}
+
+    # Whole SOL contracts: $70 at $40 -> 2 SOL, not 1.75
+    strategy._activate_instrument(sol)
+    assert strategy._calculate_position_size(signal, {'price': 40.0}, technical, None) == 2.0
+    assert strategy._order_size_rules() == (1.0, 1.0, 5.0, 0)
+    assert strategy._format_quantity(2.0) == "2 SOL"
+
+    # BTC: raised to the $100 minimum notional, rounded up to the next 0.001
+    strategy._activate_instrument(btc)
+    assert strategy._calculate_position_size(signal, {'price': 90303.6}, technical, None) == 0.002
+    assert strategy._format_quantity(0.002) == "0.002 BTC"
+    print("✅ Position sizes follow each instrument's size increment and minimum notional")
+
+
+def test_bar_close_triggers_and_coalesces_analysis():
+    """Every N-th closed bar triggers an analysis; triggers during one in flight run once afterwards."""
+    import threading
+    from unittest.mock import Mock
+    from utils.analysis_pipeline import AnalysisPipeline, AnalysisResult
+
+    strategy = make_strategy(additional=(), analysis_trigger_bars=2)
+    btc = strategy._primary_context
+    strategy.analysis_scheduler = Mock()  # started
+    strategy._apply_analysis_result = Mock()
+    strategy._run_analysis = Mock(side_effect=lambda: strategy._active_context.mark_analysed(0))
+    assert strategy._watchdog_sec() == 2 * 2 * 900
+    assert make_strategy(analysis_trigger_bars=2, analysis_watchdog_sec=600.0)._watchdog_sec() == 600.0
+    assert make_strategy()._watchdog_sec() == 0.0
+
+    for i in range(4):
+        strategy.on_bar(make_bar(btc.instrument_id, 90000.0 + i, T0 + i * 900 * SECOND))
+    assert strategy._run_analysis.call_count == 2 and btc.bars_since_analysis == 0
+
+    # Previous analysis still running: triggers are coalesced into one follow-up run
+    strategy.analysis_pipeline = AnalysisPipeline(max_workers=1)
+    release = threading.Event()
+    strategy.analysis_pipeline.submit(btc.key, lambda: release.wait(5.0) and {'signal_data': {}})
+    for i in range(4, 10):
+        strategy.on_bar(make_bar(btc.instrument_id, 90000.0 + i, T0 + i * 900 * SECOND))
+    assert strategy._run_analysis.call_count == 2 and btc.analysis_pending
+    assert strategy.analysis_trigger_stats == {'bar': 7, 'coalesced': 1, 'watchdog': 0}
+
+    # A provisional result does not release the trigger; the final one does
+    strategy.analysis_pipeline.publish(AnalysisResult(btc.key, {'signal_data': {}, 'provisional': True}))
+    strategy._drain_analysis_results()
+    assert strategy._run_analysis.call_count == 2
+    release.set()
+    strategy.analysis_pipeline.shutdown(wait=True)
+    strategy._drain_analysis_results()
+    assert strategy._run_analysis.call_count == 3 and not btc.analysis_pending
+    print("✅ Closed bars trigger analysis; in-flight triggers are coalesced")
+
+
+def run_all_tests():
+    """Run all multi-instrument tests."""
+    tests = [
+        ("Scheduler Stagger", test_scheduler_staggers_instruments),
+        ("Scheduler Rate Limit", test_scheduler_rate_limit_defers_calls),
+        ("Scheduler Missed Cycles", test_scheduler_skips_missed_cycles),
+        ("Context Per Instrument", test_strategy_builds_context_per_instrument),
+        ("Bar Routing", test_bars_are_routed_by_instrument),
+        ("Activate Instrument", test_activate_instrument_preserves_state),
+        ("Instrument Position Size", test_position_size_uses_instrument_rules),
+        ("Bar-Driven Analysis", test_bar_close_triggers_and_coalesces_analysis),
+    ]
+
+    print("\n" + "="*60)
+    print("Running Multi-Instrument Tests")
+    print("="*60 + "\n")
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            print(f"\nTest: {name}")
+            print("-" * 60)
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAILED: {name}")
+            print(f"   Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("="*60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,387 @@
+"""
+Unit tests for TechnicalIndicatorManager and its bar storage.
+
+Run: python tests/test_technical_manager.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class MockBar:
+    """Mock bar data matching NautilusTrader format."""
+    def __init__(self, open_price, high, low, close, volume, ts):
+        self.open = open_price
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.ts_init = ts
+
+
+def create_mock_bars(count=300, start_price=90000.0):
+    """Generate a deterministic zig-zag price series."""
+    bars = []
+    price = start_price
+    for i in range(count):
+        price += ((i * 37) % 23 - 11) * 15.0
+        open_price = price - ((i % 5) - 2) * 10.0
+        high = max(open_price, price) + 20.0 + (i % 7)
+        low = min(open_price, price) - 20.0 - (i % 3)
+        volume = 100.0 + (i % 11) * 3.5
+        ts = 1700000000000000000 + i * 900_000_000_000
+        bars.append(MockBar(open_price, high, low, price, volume, ts))
+    return bars
+
+
+def test_ring_buffer_matches_list_window():
+    """Ring buffer windows match a plain list of the same bars after wrap-around."""
+    from indicators.bar_buffer import OHLCVRingBuffer
+
+    bars = create_mock_bars(count=137)
+    buffer = OHLCVRingBuffer(capacity=50)
+    for bar in bars:
+        buffer.append_bar(bar)
+
+    assert len(buffer) == 50
+    expected = [b.close for b in bars[-20:]]
+    assert buffer.window('close', 20).tolist() == expected
+    assert buffer.window('ts', 3).tolist() == [b.ts_init for b in bars[-3:]]
+    assert buffer.latest('close') == bars[-1].close
+    assert buffer.latest('high', offset=1) == bars[-2].high
+    assert buffer.window('low').tolist() == [b.low for b in bars[-50:]]
+    print("✅ Ring buffer windows match list slices after wrap-around")
+
+
+def test_manager_kline_and_levels_from_buffer():
+    """K-line data and support/resistance are read from the ring buffer."""
+    from indicators.technical_manager import TechnicalIndicatorManager
+
+    bars = create_mock_bars(count=120)
+    manager = TechnicalIndicatorManager()
+    for bar in bars:
+        manager.update(bar)
+
+    klines = manager.get_kline_data(count=10)
+    assert [k['close'] for k in klines] == [b.close for b in bars[-10:]]
+    assert klines[-1]['timestamp'] == bars[-1].ts_init
+
+    support, resistance = manager._calculate_support_resistance()
+    assert support == min(b.low for b in bars[-20:])
+    assert resistance == max(b.high for b in bars[-20:])
+    print(f"✅ K-lines and S/R from buffer: support={support:.2f}, resistance={resistance:.2f}")
+
+
+def _two_pass_std(values):
+    """Reference two-pass population standard deviation."""
+    mean = sum(values) / len(values)
+    variance = sum((x - mean) ** 2 for x in values) / len(values)
+    return variance ** 0.5
+
+
+def test_rolling_std_matches_two_pass():
+    """Rolling mean/variance matches the two-pass result to 1e-9 over a long feed."""
+    from indicators.rolling import RollingMeanVariance
+
+    bars = create_mock_bars(count=5000)
+    closes = [b.close for b in bars]
+    for period in (20, 50, 100):
+        stats = RollingMeanVariance(period)
+        for i, close in enumerate(closes):
+            stats.update(close)
+            if i + 1 >= period:
+                window = closes[i + 1 - period:i + 1]
+                assert abs(stats.mean - sum(window) / period) < 1e-9
+                assert abs(stats.std - _two_pass_std(window)) < 1e-9, \
+                    f"period={period} bar={i}: {stats.std} vs {_two_pass_std(window)}"
+    print("✅ Rolling std matches two-pass result (periods 20/50/100, 5000 bars)")
+
+
+def test_bollinger_bands_from_accumulators():
+    """Bollinger bands for primary and extra periods use the rolling accumulators."""
+    from indicators.technical_manager import TechnicalIndicatorManager
+
+    bars = create_mock_bars(count=300)
+    manager = TechnicalIndicatorManager(extra_bb_periods=[50, 100])
+    for bar in bars:
+        manager.update(bar)
+
+    price = bars[-1].close
+    data = manager.get_technical_data(price)
+    closes = [b.close for b in bars]
+    for period, suffix in ((20, ''), (50, '_50'), (100, '_100')):
+        window = closes[-period:]
+        middle = sum(window) / period
+        upper = middle + 2.0 * _two_pass_std(window)
+        assert abs(data[f'bb_middle{suffix}'] - middle) < 1e-9
+        assert abs(data[f'bb_upper{suffix}'] - upper) < 1e-9
+    assert 0.0 <= data['rsi'] <= 1.0 and data['rsi_pct'] == data['rsi'] * 100
+    print(f"✅ Bollinger bands: upper={data['bb_upper']:.2f}, upper_100={data['bb_upper_100']:.2f}")
+
+
+def test_rolling_min_max_matches_brute_force():
+    """Monotonic-deque extrema match min/max over every window for several lookbacks."""
+    from indicators.rolling import RollingMinMax
+
+    bars = create_mock_bars(count=1000)
+    for lookback in (20, 50, 200):
+        extrema = RollingMinMax(lookback)
+        for i, bar in enumerate(bars):
+            extrema.update(bar.low, bar.high)
+            if i + 1 >= lookback:
+                window = bars[i + 1 - lookback:i + 1]
+                assert extrema.min == min(b.low for b in window)
+                assert extrema.max == max(b.high for b in window)
+        assert extrema.initialized
+    print("✅ Rolling min/max matches brute force (lookbacks 20/50/200)")
+
+
+def test_manager_multiple_sr_lookbacks():
+    """Manager reports support/resistance for extra lookbacks and serves them on demand."""
+    from indicators.technical_manager import TechnicalIndicatorManager
+
+    bars = create_mock_bars(count=250)
+    manager = TechnicalIndicatorManager(extra_sr_lookbacks=[50, 200])
+    for bar in bars:
+        manager.update(bar)
+
+    data = manager.get_technical_data(bars[-1].close)
+    assert data['support_200'] == min(b.low for b in bars[-200:])
+    assert data['resistance_50'] == max(b.high for b in bars[-50:])
+    assert manager.get_support_resistance(50) == (data['support_50'], data['resistance_50'])
+    # Untracked lookback falls back to a buffer scan
+    assert manager.get_support_resistance(10)[0] == min(b.low for b in bars[-10:])
+    print(f"✅ Multi-lookback S/R: support_200={data['support_200']:.2f}")
+
+
+def _bars_to_arrays(bars):
+    """Convert mock bars to the columnar dict accepted by warm_up()."""
+    import numpy as np
+    return {
+        'ts': np.array([b.ts_init for b in bars], dtype=np.int64),
+        'open': np.array([b.open for b in bars]),
+        'high': np.array([b.high for b in bars]),
+        'low': np.array([b.low for b in bars]),
+        'close': np.array([b.close for b in bars]),
+        'volume': np.array([b.volume for b in bars]),
+    }
+
+
+def _assert_technical_parity(left, right, rel_tol=1e-9):
+    for key, value in left.items():
+        other = right[key]
+        if isinstance(value, str):
+            assert value == other, f"{key}: {value} != {other}"
+        else:
+            assert abs(value - other) <= rel_tol * max(1.0, abs(value)), \
+                f"{key}: {value} != {other}"
+
+
+def test_incremental_indicators_match_nautilus():
+    """Seedable indicators reproduce NautilusTrader's SMA/EMA/RSI/MACD exactly."""
+    from nautilus_trader.indicators import (
+        SimpleMovingAverage,
+        ExponentialMovingAverage,
+        RelativeStrengthIndex,
+        MovingAverageConvergenceDivergence,
+    )
+    from indicators import incremental
+
+    pairs = [
+        (SimpleMovingAverage(20), incremental.SimpleMovingAverage(20)),
+        (ExponentialMovingAverage(12), incremental.ExponentialMovingAverage(12)),
+        (RelativeStrengthIndex(14), incremental.RelativeStrengthIndex(14)),
+        (MovingAverageConvergenceDivergence(12, 26),
+         incremental.MovingAverageConvergenceDivergence(12, 26)),
+    ]
+    for bar in create_mock_bars(count=500):
+        for nautilus_ind, local_ind in pairs:
+            nautilus_ind.update_raw(bar.close)
+            local_ind.update_raw(bar.close)
+            assert nautilus_ind.value == local_ind.value
+            assert nautilus_ind.initialized == local_ind.initialized
+    print("✅ Incremental indicators match NautilusTrader values")
+
+
+def test_warm_up_matches_incremental_path():
+    """Vectorized warm-up yields the same technical data as per-bar updates."""
+    import time
+    from indicators.technical_manager import TechnicalIndicatorManager
+
+    bars = create_mock_bars(count=5000)
+    kwargs = dict(extra_bb_periods=[50, 100], extra_sr_lookbacks=[50, 200])
+
+    incremental = TechnicalIndicatorManager(**kwargs)
+    for bar in bars[:4000]:
+        incremental.update(bar)
+
+    warmed = TechnicalIndicatorManager(**kwargs)
+    start = time.perf_counter()
+    warmed.warm_up(_bars_to_arrays(bars[:4000]))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    price = bars[3999].close
+    _assert_technical_parity(incremental.get_technical_data(price), warmed.get_technical_data(price))
+    assert warmed.get_kline_data(10) == incremental.get_kline_data(10)
+    assert warmed.is_initialized()
+
+    # Live updates continue from the seeded state
+    for bar in bars[4000:]:
+        incremental.update(bar)
+        warmed.update(bar)
+    price = bars[-1].close
+    _assert_technical_parity(incremental.get_technical_data(price), warmed.get_technical_data(price))
+    print(f"✅ Warm-up parity with incremental path (4000 bars in {elapsed_ms:.1f} ms)")
+
+
+def test_technical_snapshot_memoization():
+    """Repeated calls hit the snapshot cache; price-only changes refresh price fields."""
+    from indicators.technical_manager import TechnicalIndicatorManager
+
+    bars = create_mock_bars(count=120)
+    manager = TechnicalIndicatorManager(extra_bb_periods=[50])
+    for bar in bars:
+        manager.update(bar)
+
+    price = bars[-1].close
+    first = manager.get_technical_data(price)
+    second = manager.get_technical_data(price)
+    assert first == second
+    assert manager.get_snapshot_stats() == {'hits': 1, 'price_only': 0, 'misses': 1}
+
+    # Price-only change: bands unchanged, position and trends follow the new price
+    high_price = first['bb_upper'] + 1000.0
+    moved = manager.get_technical_data(high_price)
+    assert moved['bb_upper'] == first['bb_upper']
+    assert moved['bb_position'] > 1.0 and moved['bb_position_50'] > first['bb_position_50']
+    assert moved['short_term_trend'] == "上涨"
+    assert manager.get_snapshot_stats()['price_only'] == 1
+
+    # Result matches a cold computation at the same price
+    cold = TechnicalIndicatorManager(extra_bb_periods=[50])
+    for bar in bars:
+        cold.update(bar)
+    assert cold.get_technical_data(high_price) == moved
+    assert list(cold.get_technical_data(price).keys()) == list(first.keys())
+
+    # New bar invalidates the snapshot
+    manager.update(bars[-1])
+    manager.get_technical_data(price)
+    assert manager.get_snapshot_stats()['misses'] == 2
+    print(f"✅ Snapshot memoization: {manager.get_snapshot_stats()}")
+
+
+def test_multi_timeframe_aggregation():
+    """Live aggregation and vectorized warm-up build identical higher-timeframe bars."""
+    from indicators.multi_timeframe import BarAggregator, MultiTimeframeIndicatorBank
+
+    bars = create_mock_bars(count=1000)
+    # Close-time stamps aligned to 15-minute boundaries
+    base_ts = 1699999200 * 1_000_000_000
+    for i, bar in enumerate(bars):
+        bar.ts_init = base_ts + (i + 1) * 900 * 1_000_000_000
+
+    # 1h bars close on the 4th base bar of each hour
+    aggregator = BarAggregator(interval_sec=3600, base_interval_sec=900)
+    hourly = []
+    for bar in bars[:8]:
+        hourly.extend(aggregator.update(bar.ts_init, bar.open, bar.high, bar.low, bar.close, bar.volume))
+    assert len(hourly) == 2
+    assert hourly[0].open == bars[0].open and hourly[0].close == bars[3].close
+    assert hourly[0].high == max(b.high for b in bars[:4])
+    assert hourly[0].volume == sum(b.volume for b in bars[:4])
+    assert hourly[0].ts_init == bars[3].ts_init
+
+    timeframes = ["1h", "4h", "1d", "5m"]
+    live = MultiTimeframeIndicatorBank(900, timeframes)
+    assert live.timeframes == ["1h", "4h", "1d"]
+    for bar in bars:
+        live.update(bar)
+
+    # Warm up with the first 990 bars (leaves a forming bucket), then continue live
+    warmed = MultiTimeframeIndicatorBank(900, timeframes)
+    warmed.warm_up(_bars_to_arrays(bars[:990]))
+    for bar in bars[990:]:
+        warmed.update(bar)
+
+    price = bars[-1].close
+    live_data = live.get_timeframe_data(price)
+    warmed_data = warmed.get_timeframe_data(price)
+    assert set(live_data) == {"1h", "4h"}  # 1d needs more history to initialize
+    for timeframe in live_data:
+        _assert_technical_parity(live_data[timeframe], warmed_data[timeframe])
+        assert live.managers[timeframe].get_kline_data(5) == warmed.managers[timeframe].get_kline_data(5)
+    print(f"✅ Multi-timeframe bank: {list(live_data)} initialized, warm-up parity holds")
+
+
+def test_required_bars_initialize_every_timeframe():
+    """required_base_bars() is enough history to initialize each higher timeframe."""
+    from indicators.multi_timeframe import MultiTimeframeIndicatorBank
+
+    timeframes = ["1h", "4h", "1d"]
+    bank = MultiTimeframeIndicatorBank(900, timeframes, {'macd_slow': 26})
+    required = bank.required_base_bars()
+    assert required == {"1h": 27 * 4, "4h": 27 * 16, "1d": 27 * 96}
+
+    # Histories starting mid-bucket still initialize every timeframe
+    for offset in (0, 7):
+        bars = create_mock_bars(count=required["1d"] + offset)[offset:]
+        warmed = MultiTimeframeIndicatorBank(900, timeframes, {'macd_slow': 26})
+        warmed.warm_up(_bars_to_arrays(bars))
+        assert set(warmed.get_timeframe_data(bars[-1].close)) == set(timeframes), offset
+
+    # The shipped default of 200 bars only covers 1h
+    short = MultiTimeframeIndicatorBank(900, timeframes, {'macd_slow': 26})
+    bars = create_mock_bars(count=200)
+    short.warm_up(_bars_to_arrays(bars))
+    assert set(short.get_timeframe_data(bars[-1].close)) == {"1h"}
+    print("✅ Required base bars initialize 1h, 4h and 1d")
+
+
+def run_all_tests():
+    """Run all technical manager tests."""
+    tests = [
+        ("Ring Buffer Windows", test_ring_buffer_matches_list_window),
+        ("Manager K-lines and S/R", test_manager_kline_and_levels_from_buffer),
+        ("Rolling Std vs Two-Pass", test_rolling_std_matches_two_pass),
+        ("Bollinger Bands from Accumulators", test_bollinger_bands_from_accumulators),
+        ("Rolling Min/Max vs Brute Force", test_rolling_min_max_matches_brute_force),
+        ("Multiple S/R Lookbacks", test_manager_multiple_sr_lookbacks),
+        ("Incremental Indicators vs NautilusTrader", test_incremental_indicators_match_nautilus),
+        ("Warm-up vs Incremental Path", test_warm_up_matches_incremental_path),
+        ("Technical Snapshot Memoization", test_technical_snapshot_memoization),
+        ("Multi-Timeframe Aggregation", test_multi_timeframe_aggregation),
+        ("Required Bars per Timeframe", test_required_bars_initialize_every_timeframe),
+    ]
+
+    print("\n" + "="*60)
+    print("Running Technical Indicator Manager Tests")
+    print("="*60 + "\n")
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            print(f"\nTest: {name}")
+            print("-" * 60)
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAILED: {name}")
+            print(f"   Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("="*60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
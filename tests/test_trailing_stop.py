@@ -0,0 +1,180 @@
+"""
+Unit tests for the trailing stop engine and its price feeds.
+
+Run: python tests/test_trailing_stop.py
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def make_state(side="LONG", entry_price=100.0, current_sl_price=98.0):
+    """Trailing stop state as saved by _submit_bracket_order."""
+    return {
+        "entry_price": entry_price,
+        "highest_price": entry_price if side == "LONG" else None,
+        "lowest_price": entry_price if side == "SHORT" else None,
+        "current_sl_price": current_sl_price,
+        "sl_order_id": None,
+        "activated": False,
+        "side": side,
+        "quantity": 0.01,
+    }
+
+
+def test_engine_trails_long_and_short():
+    """Stops activate on profit, follow the best price and never move back."""
+    from utils.trailing_stop import TrailingStopEngine
+
+    engine = TrailingStopEngine(activation_pct=0.01, distance_pct=0.005, update_threshold_pct=0.002)
+
+    state = make_state("LONG")
+    assert engine.update(state, 100.5) is None and not state["activated"]
+    assert engine.update(state, 101.0) == 101.0 * 0.995 and state["activated"]
+    state["current_sl_price"] = 101.0 * 0.995
+    assert engine.update(state, 101.1) is None  # 0.1% move: throttled
+    assert engine.update(state, 100.0) is None and state["highest_price"] == 101.1
+    assert engine.update(state, 101.5) == 101.5 * 0.995
+
+    state = make_state("SHORT", current_sl_price=102.0)
+    assert engine.update(state, 99.0) == 99.0 * 1.005
+    state["current_sl_price"] = 99.0 * 1.005
+    assert engine.update(state, 99.5) is None and state["lowest_price"] == 99.0
+
+    # Bar extreme: the spike is tracked even though the bar closed lower
+    state = make_state("LONG")
+    assert engine.update(state, 101.0, extreme=103.0) is None  # stop would be above the close
+    assert state["highest_price"] == 103.0 and state["activated"]
+    assert engine.update(state, 102.8) == 103.0 * 0.995
+    assert engine.stats['throttled'] == 1
+    print("✅ Trailing stop engine activates, trails and rate-limits stop moves")
+
+
+def test_strategy_trails_on_quote_ticks():
+    """Quote ticks move the stop without any analysis running."""
+    from strategy.deepseek_strategy import DeepSeekAIStrategy, DeepSeekAIStrategyConfig
+
+    strategy = DeepSeekAIStrategy(DeepSeekAIStrategyConfig(
+        instrument_id="BTCUSDT-PERP.BINANCE",
+        bar_type="BTCUSDT-PERP.BINANCE-15-MINUTE-LAST-EXTERNAL",
+        additional_instrument_ids=("ETHUSDT-PERP.BINANCE",),
+        deepseek_api_key="test_key",
+        sentiment_enabled=False,
+    ))
+    btc, eth = strategy.instrument_contexts.values()
+    strategy._execute_trailing_stop_update = Mock(
+        side_effect=lambda **kwargs: strategy.trailing_stop_state[kwargs['instrument_key']].update(
+            current_sl_price=kwargs['new_sl_price'], instrument=str(strategy.instrument_id),
+        )
+    )
+    strategy.trailing_stop_state[eth.key] = make_state("LONG", entry_price=3000.0, current_sl_price=2940.0)
+
+    def quote(ctx, bid, ask):
+        return SimpleNamespace(instrument_id=ctx.instrument_id, bid_price=bid, ask_price=ask, ts_event=1)
+
+    strategy.on_quote_tick(quote(btc, 90000.0, 90001.0))  # no position: ignored
+    strategy.on_quote_tick(quote(eth, 3029.0, 3031.0))
+    strategy.on_quote_tick(quote(eth, 3031.0, 3033.0))  # 0.07% higher: throttled
+    assert strategy._execute_trailing_stop_update.call_count == 1
+
+    # Executed for the tick's instrument, the active instrument is restored afterwards
+    state = strategy.trailing_stop_state[eth.key]
+    assert state["instrument"] == eth.key and state["current_sl_price"] == 3030.0 * 0.995
+    assert strategy.instrument_id == btc.instrument_id
+
+    with_bars = DeepSeekAIStrategy(DeepSeekAIStrategyConfig(
+        instrument_id="BTCUSDT-PERP.BINANCE",
+        bar_type="BTCUSDT-PERP.BINANCE-15-MINUTE-LAST-EXTERNAL",
+        deepseek_api_key="test_key",
+        sentiment_enabled=False,
+        trailing_price_source="bar_1m",
+    ))
+    assert with_bars.trailing_price_source == "bar_1m"
+    try:
+        DeepSeekAIStrategy(DeepSeekAIStrategyConfig(
+            instrument_id="BTCUSDT-PERP.BINANCE",
+            bar_type="BTCUSDT-PERP.BINANCE-15-MINUTE-LAST-EXTERNAL",
+            deepseek_api_key="test_key",
+            trailing_price_source="ticks",
+        ))
+        raise AssertionError("unknown price source accepted")
+    except ValueError:
+        pass
+    print("✅ Quote ticks drive trailing stops independently of the analysis loop")
+
+
+def test_bar_close_fallback_without_quotes():
+    """Without quote ticks (bar-only backtest) the stop trails on strategy bar closes."""
+    from strategy.deepseek_strategy import DeepSeekAIStrategy, DeepSeekAIStrategyConfig
+
+    strategy = DeepSeekAIStrategy(DeepSeekAIStrategyConfig(
+        instrument_id="BTCUSDT-PERP.BINANCE",
+        bar_type="BTCUSDT-PERP.BINANCE-15-MINUTE-LAST-EXTERNAL",
+        deepseek_api_key="test_key",
+        sentiment_enabled=False,
+    ))
+    btc = strategy._primary_context
+    strategy._execute_trailing_stop_update = Mock()
+    strategy.trailing_stop_state[btc.key] = make_state("LONG", entry_price=100.0)
+    second = 1_000_000_000
+
+    def bar(close, ts):
+        return SimpleNamespace(
+            bar_type=SimpleNamespace(instrument_id=btc.instrument_id),
+            open=close, high=close, low=close, close=close, volume=1.0, ts_init=ts, ts_event=ts,
+        )
+
+    strategy.on_bar(bar(102.0, 900 * second))
+    assert strategy._execute_trailing_stop_update.call_count == 1 and btc.trailing_fallback_warned
+
+    # A quote during the next bar: the feed drives the stop, the bar close does not
+    strategy.on_quote_tick(SimpleNamespace(
+        instrument_id=btc.instrument_id, bid_price=101.0, ask_price=101.0, ts_event=1000 * second,
+    ))
+    strategy.on_bar(bar(104.0, 1800 * second))
+    assert strategy._execute_trailing_stop_update.call_count == 1 and not btc.trailing_fallback_warned
+    assert strategy.trailing_stop_state[btc.key]["highest_price"] == 102.0
+    print("✅ Trailing stops fall back to bar closes when no quotes arrive")
+
+
+def run_all_tests():
+    """Run all trailing stop tests."""
+    tests = [
+        ("Trailing Engine", test_engine_trails_long_and_short),
+        ("Quote Tick Trailing", test_strategy_trails_on_quote_ticks),
+        ("Bar Close Fallback", test_bar_close_fallback_without_quotes),
+    ]
+
+    print("\n" + "="*60)
+    print("Running Trailing Stop Tests")
+    print("="*60 + "\n")
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            print(f"\nTest: {name}")
+            print("-" * 60)
+            test_func()
+            passed += 1
+        except Exception as e:
+            print(f"❌ FAILED: {name}")
+            print(f"   Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("\n" + "="*60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("="*60 + "\n")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
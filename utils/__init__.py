@@ -1,9 +1,10 @@
 """Utility modules for DeepSeek AI trading strategy."""
 
-from .deepseek_client import DeepSeekAnalyzer
+from .deepseek_client import AsyncDeepSeekAnalyzer, DeepSeekAnalyzer
 from .sentiment_client import SentimentDataFetcher
 
 __all__ = [
+    "AsyncDeepSeekAnalyzer",
     "DeepSeekAnalyzer",
     "SentimentDataFetcher",
 ]
@@ -0,0 +1,111 @@
+"""
+Per-Call Metrics for the DeepSeek Analyzer
+
+Counts every decision by source (model, cache, replay, local, fallback) and
+keeps rolling p50/p95/p99 of wall latency and prompt/completion tokens in
+fixed-size log-bucket histograms.
+"""
+
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable
+
+from .latency_histogram import LatencyHistogram
+
+SOURCES = ("model", "cache", "replay", "local", "fallback")
+
+
+class AnalyzerMetrics:
+    """
+    Rolling call metrics.
+
+    Memory is fixed: histograms cover the last ``window`` model calls,
+    counters are cumulative.
+    """
+
+    def __init__(self, window: int = 1024):
+        """
+        Initialize metrics.
+
+        Parameters
+        ----------
+        window : int
+            Number of recent model calls the percentiles are computed over
+        """
+        self._lock = threading.Lock()
+        self.latency = LatencyHistogram(window=window)
+        self.prompt_tokens = LatencyHistogram(window=window, min_value=1.0, max_value=1_000_000.0)
+        self.completion_tokens = LatencyHistogram(window=window, min_value=1.0, max_value=1_000_000.0)
+        self.decisions: Counter = Counter()
+        self.repairs: Counter = Counter()
+        self.retries = 0
+        self.repaired = 0
+        self.hedged = 0
+        self.tokens_total = {'prompt': 0, 'completion': 0}
+
+    @staticmethod
+    def source_of(signal: Dict[str, Any]) -> str:
+        """Where a signal came from (one of ``SOURCES``)."""
+        if signal.get('cached'):
+            return "cache"
+        if signal.get('replayed'):
+            return "replay"
+        if signal.get('local_fallback'):
+            return "local"
+        if signal.get('is_fallback'):
+            return "fallback"
+        return "model"
+
+    def record(
+        self,
+        source: str,
+        wall_sec: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        retries: int = 0,
+        repairs: Iterable[str] = (),
+        hedged: bool = False,
+    ):
+        """
+        Record one decision.
+
+        Latency and tokens feed the histograms only for decisions that
+        reached the provider (model answers and fallbacks after failed calls).
+        """
+        repairs = list(repairs)
+        with self._lock:
+            self.decisions[source] += 1
+            self.retries += retries
+            self.hedged += bool(hedged)
+            if repairs:
+                self.repaired += 1
+                self.repairs.update(repairs)
+            if source in ("model", "fallback"):
+                self.latency.record(wall_sec)
+            if prompt_tokens:
+                self.prompt_tokens.record(prompt_tokens)
+                self.tokens_total['prompt'] += prompt_tokens
+            if completion_tokens:
+                self.completion_tokens.record(completion_tokens)
+                self.tokens_total['completion'] += completion_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Point-in-time metrics (counters, rates and percentiles)."""
+        with self._lock:
+            total = sum(self.decisions.values())
+            model_calls = self.decisions['model'] + self.decisions['fallback']
+            return {
+                'decisions': total,
+                'by_source': {source: self.decisions[source] for source in SOURCES},
+                'fallback_rate': (self.decisions['fallback'] + self.decisions['local']) / total if total else 0.0,
+                'retries': self.retries,
+                'retries_per_call': self.retries / model_calls if model_calls else 0.0,
+                'hedged': self.hedged,
+                'repaired': self.repaired,
+                'repairs': dict(self.repairs),
+                'latency_sec': self.latency.percentiles(),
+                'prompt_tokens': dict(self.prompt_tokens.percentiles(), total=self.tokens_total['prompt']),
+                'completion_tokens': dict(
+                    self.completion_tokens.percentiles(), total=self.tokens_total['completion']
+                ),
+            }
@@ -0,0 +1,172 @@
+"""
+Background Analysis Pipeline for NautilusTrader Strategy
+
+Runs blocking analysis work (sentiment HTTP calls, DeepSeek requests) on a
+bounded thread pool so the Nautilus event thread keeps processing bars, fills
+and order events. Results are queued and handed back to the strategy thread
+via ``drain()``; nothing in here touches strategy state.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+class AnalysisResult:
+    """Outcome of one background analysis job."""
+
+    __slots__ = ("key", "value", "error", "context", "elapsed_sec")
+
+    def __init__(
+        self,
+        key: str,
+        value: Any = None,
+        error: Optional[BaseException] = None,
+        context: Optional[Dict[str, Any]] = None,
+        elapsed_sec: float = 0.0,
+    ):
+        self.key = key
+        self.value = value
+        self.error = error
+        self.context = context or {}
+        self.elapsed_sec = elapsed_sec
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AnalysisPipeline:
+    """
+    Bounded executor for analysis jobs with a thread-safe result queue.
+
+    At most one job per key (instrument) is in flight; submissions for a key
+    that is still being analysed are rejected instead of queueing up stale
+    work behind a slow model call.
+    """
+
+    def __init__(self, max_workers: int = 2, logger: Optional[logging.Logger] = None):
+        """
+        Initialize pipeline.
+
+        Parameters
+        ----------
+        max_workers : int
+            Worker threads (concurrent analyses)
+        logger : logging.Logger, optional
+            Logger instance
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+
+        self.max_workers = max_workers
+        self.logger = logger or logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        # Separate pool for input prefetches, so jobs waiting on them cannot starve them
+        self._io_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-io")
+        self._results: "queue.Queue[AnalysisResult]" = queue.Queue()
+        self._in_flight: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0, 'speculated': 0}
+
+    def submit(self, key: str, job: Callable[[], Any], context: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Run ``job`` in the background.
+
+        Parameters
+        ----------
+        key : str
+            Job key (one in-flight job per key)
+        job : Callable
+            Blocking work; its return value becomes ``AnalysisResult.value``
+        context : Dict, optional
+            Caller data returned unchanged with the result
+
+        Returns
+        -------
+        bool
+            False if a job for ``key`` is still running
+        """
+        with self._lock:
+            if key in self._in_flight:
+                self.stats['rejected'] += 1
+                return False
+            self._in_flight[key] = time.monotonic()
+            self.stats['submitted'] += 1
+
+        future = self._executor.submit(self._run, key, job, context)
+        future.add_done_callback(self._on_done(key))
+        return True
+
+    @staticmethod
+    def _run(key: str, job: Callable[[], Any], context: Optional[Dict[str, Any]]) -> AnalysisResult:
+        start = time.monotonic()
+        try:
+            return AnalysisResult(key, value=job(), context=context,
+                                  elapsed_sec=time.monotonic() - start)
+        except Exception as e:
+            return AnalysisResult(key, error=e, context=context,
+                                  elapsed_sec=time.monotonic() - start)
+
+    def speculate(self, key: str, job: Callable[[], Any], context: Optional[Dict[str, Any]] = None) -> Future:
+        """
+        Run ``job`` speculatively.
+
+        The result is not queued for ``drain()`` and the key is not marked
+        in flight; the caller keeps the returned Future (of an
+        ``AnalysisResult``) and decides later whether to use it.
+        """
+        self.stats['speculated'] += 1
+        return self._executor.submit(self._run, key, job, context)
+
+    def prefetch(self, fn: Callable[[], Any]) -> Future:
+        """
+        Start fetching an analysis input (e.g. sentiment) right away.
+
+        Returns a Future the analysis job can wait on with a deadline.
+        """
+        return self._io_executor.submit(fn)
+
+    def publish(self, result: AnalysisResult):
+        """
+        Queue an interim result (e.g. a provisional decision) from a running job.
+
+        Thread-safe; interim results are drained before the job's final result.
+        """
+        self._results.put(result)
+
+    def _on_done(self, key: str) -> Callable[[Future], None]:
+        def callback(future: Future):
+            if future.cancelled():
+                result = AnalysisResult(key, error=RuntimeError("analysis cancelled"))
+            else:
+                result = future.result()
+            with self._lock:
+                self._in_flight.pop(key, None)
+                self.stats['completed' if result.ok else 'failed'] += 1
+            self._results.put(result)
+        return callback
+
+    def drain(self) -> List[AnalysisResult]:
+        """Return all completed results (call from the strategy thread)."""
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def in_flight(self, key: Optional[str] = None) -> int:
+        """Number of running jobs (for ``key`` only if given)."""
+        with self._lock:
+            if key is not None:
+                return int(key in self._in_flight)
+            return len(self._in_flight)
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work; running jobs finish in the background unless ``wait``."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._io_executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,112 @@
+"""
+Analysis Scheduler for Multi-Instrument Strategy
+
+Staggers periodic AI analyses across instruments and rate-limits them, so N
+symbols sharing one strategy do not all call the model on the same second.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional
+
+NANOS_PER_SECOND = 1_000_000_000
+
+
+class AnalysisScheduler:
+    """
+    Staggered, rate-limited round-robin scheduler.
+
+    Each key (instrument) is analysed once per ``interval_sec``; due times are
+    offset by ``interval_sec / len(keys)`` so analyses are spread evenly over
+    the interval. The caller ticks ``due(now_ns)`` every ``tick_interval_sec``
+    and runs the keys it returns. Keys held back by the rate limit stay due
+    and are returned on a later tick.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        interval_sec: float,
+        max_calls_per_minute: int = 0,
+    ):
+        """
+        Initialize scheduler.
+
+        Parameters
+        ----------
+        keys : List[str]
+            Instruments to schedule, in priority order
+        interval_sec : float
+            Analysis interval per instrument
+        max_calls_per_minute : int
+            Maximum analyses started in any 60-second window (0 = unlimited)
+        """
+        if not keys:
+            raise ValueError("AnalysisScheduler requires at least one key")
+
+        self.keys = list(keys)
+        self.interval_ns = int(interval_sec * NANOS_PER_SECOND)
+        self.stagger_ns = self.interval_ns // len(self.keys)
+        self.max_calls_per_minute = max_calls_per_minute
+
+        self._next_due: Dict[str, int] = {}
+        self._recent_calls: deque = deque()
+        self.stats = {'scheduled': 0, 'rate_limited': 0, 'skipped_cycles': 0}
+
+    @property
+    def tick_interval_sec(self) -> float:
+        """Timer interval the caller should use to drive ``due``."""
+        return self.stagger_ns / NANOS_PER_SECOND
+
+    def start(self, now_ns: int):
+        """Assign staggered first due times; the first key is due one tick from now."""
+        for i, key in enumerate(self.keys):
+            self._next_due[key] = now_ns + (i + 1) * self.stagger_ns
+
+    def due(self, now_ns: int) -> List[str]:
+        """
+        Get keys to analyse now and advance their schedules.
+
+        Parameters
+        ----------
+        now_ns : int
+            Current time (UNIX nanoseconds)
+
+        Returns
+        -------
+        List[str]
+            Keys to analyse, most overdue first
+        """
+        if not self._next_due:
+            self.start(now_ns - self.stagger_ns)
+
+        # Half a tick of tolerance absorbs timer jitter
+        horizon = now_ns + self.stagger_ns // 2
+        ready = sorted(
+            (due_ns, key) for key, due_ns in self._next_due.items() if due_ns <= horizon
+        )
+
+        window_start = now_ns - 60 * NANOS_PER_SECOND
+        while self._recent_calls and self._recent_calls[0] <= window_start:
+            self._recent_calls.popleft()
+
+        granted = []
+        for due_ns, key in ready:
+            if self.max_calls_per_minute and len(self._recent_calls) >= self.max_calls_per_minute:
+                self.stats['rate_limited'] += 1
+                continue
+
+            next_due = due_ns + self.interval_ns
+            while next_due <= horizon:
+                next_due += self.interval_ns
+                self.stats['skipped_cycles'] += 1
+            self._next_due[key] = next_due
+
+            self._recent_calls.append(now_ns)
+            self.stats['scheduled'] += 1
+            granted.append(key)
+
+        return granted
+
+    def next_due(self, key: str) -> Optional[int]:
+        """Next due time (UNIX nanoseconds) for a key, if scheduled."""
+        return self._next_due.get(key)
@@ -0,0 +1,168 @@
+"""
+Change-Detection Gate for AI Analysis
+
+Cheap deterministic pre-filter in front of the DeepSeek call: while the last
+signal was HOLD and nothing material changed since the model was last asked,
+the call is skipped and the previous signal reused.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ChangeDetectionGate:
+    """
+    Decides per instrument whether a new AI analysis is warranted.
+
+    The market state at the last real AI call is kept as a baseline; each
+    cycle is compared against it. Triggers:
+
+    - ``price_move``: price moved more than ``price_move_pct`` from the baseline
+    - ``sr_break``: price crossed the baseline resistance or support
+    - ``rsi_cross``: RSI crossed one of ``rsi_levels``
+    - ``macd_flip``: MACD histogram changed sign
+    - ``position_change``: position side changed
+    - ``max_age``: baseline older than ``max_signal_age_sec``
+    """
+
+    def __init__(
+        self,
+        price_move_pct: float = 0.003,
+        rsi_levels: Tuple[float, ...] = (30.0, 70.0),
+        sr_break: bool = True,
+        macd_flip: bool = True,
+        position_change: bool = True,
+        max_signal_age_sec: float = 3600.0,
+    ):
+        """
+        Initialize change-detection gate.
+
+        Parameters
+        ----------
+        price_move_pct : float
+            Relative price move that triggers an analysis (0 = disabled)
+        rsi_levels : Tuple[float, ...]
+            RSI levels (0-100 scale) whose crossing triggers an analysis
+        sr_break : bool
+            Trigger on a break of the baseline support/resistance
+        macd_flip : bool
+            Trigger on a MACD histogram sign flip
+        position_change : bool
+            Trigger when the position side changes
+        max_signal_age_sec : float
+            Always analyse once the reused signal is this old (0 = no limit)
+        """
+        self.price_move_pct = price_move_pct
+        self.rsi_levels = tuple(rsi_levels)
+        self.sr_break = sr_break
+        self.macd_flip = macd_flip
+        self.position_change = position_change
+        self.max_signal_age_sec = max_signal_age_sec
+
+        self._baselines: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, int] = {'evaluated': 0, 'skipped': 0}
+
+    def record(
+        self,
+        key: str,
+        price: float,
+        technical_data: Dict[str, Any],
+        position_side: Optional[str],
+        now_sec: float,
+    ):
+        """Store the market state at an AI call as the new baseline."""
+        self._baselines[key] = {
+            'price': price,
+            'support': technical_data.get('support'),
+            'resistance': technical_data.get('resistance'),
+            'rsi': float(technical_data.get('rsi_pct') or 0.0),
+            'macd_histogram': technical_data.get('macd_histogram') or 0.0,
+            'position_side': position_side,
+            'time': now_sec,
+        }
+
+    def triggers(
+        self,
+        key: str,
+        price: float,
+        technical_data: Dict[str, Any],
+        position_side: Optional[str],
+        now_sec: float,
+    ) -> List[str]:
+        """
+        Triggers fired since the baseline of ``key``.
+
+        Returns
+        -------
+        List[str]
+            Names of fired triggers (``["no_baseline"]`` before the first call)
+        """
+        base = self._baselines.get(key)
+        if base is None:
+            return ["no_baseline"]
+
+        fired = []
+        if self.price_move_pct > 0 and base['price'] > 0:
+            if abs(price - base['price']) / base['price'] > self.price_move_pct:
+                fired.append("price_move")
+
+        if self.sr_break:
+            resistance, support = base['resistance'], base['support']
+            if resistance and base['price'] <= resistance < price:
+                fired.append("sr_break")
+            elif support and base['price'] >= support > price:
+                fired.append("sr_break")
+
+        if self.rsi_levels:
+            rsi = float(technical_data.get('rsi_pct') or 0.0)
+            if any((base['rsi'] >= level) != (rsi >= level) for level in self.rsi_levels):
+                fired.append("rsi_cross")
+
+        if self.macd_flip:
+            histogram = technical_data.get('macd_histogram') or 0.0
+            if (base['macd_histogram'] >= 0) != (histogram >= 0):
+                fired.append("macd_flip")
+
+        if self.position_change and position_side != base['position_side']:
+            fired.append("position_change")
+
+        if self.max_signal_age_sec > 0 and now_sec - base['time'] >= self.max_signal_age_sec:
+            fired.append("max_age")
+
+        return fired
+
+    def should_skip(
+        self,
+        key: str,
+        last_signal: Optional[Dict[str, Any]],
+        price: float,
+        technical_data: Dict[str, Any],
+        position_side: Optional[str],
+        now_sec: float,
+    ) -> Tuple[bool, List[str]]:
+        """
+        Decide whether the AI call for ``key`` can be skipped.
+
+        Only a genuine (non-fallback) HOLD is ever reused.
+
+        Returns
+        -------
+        Tuple[bool, List[str]]
+            (skip, fired triggers)
+        """
+        self.stats['evaluated'] += 1
+        if not last_signal or last_signal.get('signal') != 'HOLD' or last_signal.get('is_fallback'):
+            return False, ["last_signal"]
+
+        fired = self.triggers(key, price, technical_data, position_side, now_sec)
+        for name in fired:
+            self.stats[name] = self.stats.get(name, 0) + 1
+        if fired:
+            return False, fired
+
+        self.stats['skipped'] += 1
+        return True, []
+
+    def signal_age(self, key: str, now_sec: float) -> Optional[float]:
+        """Seconds since the last AI call for ``key``."""
+        base = self._baselines.get(key)
+        return now_sec - base['time'] if base else None
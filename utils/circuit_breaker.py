@@ -0,0 +1,154 @@
+"""
+Circuit Breaker for the AI Provider
+
+Stops calling a degraded provider: after N consecutive failures (or a p95
+latency above the limit) the breaker opens and callers fast-fail until a
+cooldown has passed. Then a single half-open probe decides whether to close
+again or to reopen with a longer (exponentially backed off) cooldown.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .latency_histogram import LatencyHistogram
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker with adaptive cooldown.
+
+    Every ``allow_request()`` that returns True must be followed by exactly
+    one ``record_success()`` or ``record_failure()``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        p95_latency_sec: float = 0.0,
+        latency_min_samples: int = 10,
+        open_sec: float = 60.0,
+        max_open_sec: float = 900.0,
+        backoff_factor: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Initialize circuit breaker.
+
+        Parameters
+        ----------
+        failure_threshold : int
+            Consecutive failures that open the breaker
+        p95_latency_sec : float
+            Open when the p95 of recent successful calls exceeds this (0 = off)
+        latency_min_samples : int
+            Samples required before the latency rule applies
+        open_sec : float
+            Cooldown before the first half-open probe
+        max_open_sec : float
+            Upper bound of the backed-off cooldown
+        backoff_factor : float
+            Cooldown multiplier for every failed probe
+        clock : Callable
+            Monotonic time source (seconds)
+        logger : logging.Logger, optional
+            Logger instance
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+
+        self.failure_threshold = failure_threshold
+        self.p95_latency_sec = p95_latency_sec
+        self.latency_min_samples = latency_min_samples
+        self.open_sec = open_sec
+        self.max_open_sec = max_open_sec
+        self.backoff_factor = backoff_factor
+        self.clock = clock
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self.latency = LatencyHistogram(window=50)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.cooldown_sec = open_sec
+        self.opened_at: Optional[float] = None
+        self.last_trip_reason = ""
+        self._probe_in_flight = False
+        self.stats: Dict[str, int] = {'trips': 0, 'fast_fails': 0, 'probes': 0}
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the provider now (False = fast-fail)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self.opened_at >= self.cooldown_sec:
+                self.state = HALF_OPEN
+                self.logger.info("🔌 AI circuit half-open, sending probe request")
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self.stats['probes'] += 1
+                return True
+            self.stats['fast_fails'] += 1
+            return False
+
+    def record_success(self, latency_sec: float):
+        """A call answered with a usable signal."""
+        with self._lock:
+            self.consecutive_failures = 0
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self.state = CLOSED
+                self.cooldown_sec = self.open_sec
+                self.latency.clear()
+                self.logger.info("✅ AI circuit closed, provider recovered")
+            self.latency.record(latency_sec)
+
+            if (
+                self.state == CLOSED
+                and self.p95_latency_sec > 0
+                and len(self.latency) >= self.latency_min_samples
+                and self.latency.quantile(0.95) > self.p95_latency_sec
+            ):
+                self._trip(f"p95 latency {self.latency.quantile(0.95):.1f}s > {self.p95_latency_sec:.1f}s")
+
+    def record_failure(self, reason: str = ""):
+        """A call failed (error, timeout or unusable response)."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self.cooldown_sec = min(self.max_open_sec, self.cooldown_sec * self.backoff_factor)
+                self._trip(f"probe failed: {reason}")
+            elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._trip(f"{self.consecutive_failures} consecutive failures ({reason})")
+
+    def _trip(self, reason: str):
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.last_trip_reason = reason
+        self.stats['trips'] += 1
+        self.logger.warning(
+            f"⛔ AI circuit open for {self.cooldown_sec:.0f}s: {reason}"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot for monitoring (/status)."""
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.opened_at + self.cooldown_sec - self.clock())
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'cooldown_sec': self.cooldown_sec,
+                'retry_in_sec': retry_in,
+                'last_trip_reason': self.last_trip_reason,
+                'p95_latency_sec': self.latency.quantile(0.95),
+                **self.stats,
+            }
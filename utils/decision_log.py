@@ -0,0 +1,199 @@
+"""
+Record/Replay Log of AI Decisions
+
+Append-only log of every DeepSeek exchange (prompt hash, prompt, raw
+response, parsed signal, latency), used to replay the exact live decisions in
+a backtest without calling the model.
+
+File format: ``<path>`` holds length-prefixed JSON records
+(``%08d\\t<json>\\n``); ``<path>.idx`` holds one ``hash\\toffset\\tlength`` line
+per record and is rebuilt from the data file when missing or incomplete.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+_PREFIX_LEN = 9  # "%08d\t"
+
+
+def prompt_hash(messages: List[Dict[str, str]], volatile: Tuple[str, ...] = ()) -> str:
+    """
+    Stable hash of a chat request.
+
+    Parameters
+    ----------
+    messages : List[Dict]
+        Chat messages sent to the model
+    volatile : Tuple[str, ...]
+        Substrings removed before hashing (e.g. the wall-clock timestamp, which
+        differs between a live timer and a backtest clock)
+    """
+    digest = hashlib.sha256()
+    for message in messages:
+        content = message['content']
+        for text in volatile:
+            if text:
+                content = content.replace(text, "")
+        digest.update(message['role'].encode())
+        digest.update(b"\x00")
+        digest.update(content.encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()[:32]
+
+
+class DecisionLog:
+    """
+    Append-only decision log with hash index.
+
+    ``mode="record"`` appends records; ``mode="replay"`` maps the log
+    read-only and answers lookups by prompt hash (latest record wins).
+    """
+
+    def __init__(self, path: str, mode: str = "record", logger: Optional[logging.Logger] = None):
+        """
+        Open a decision log.
+
+        Parameters
+        ----------
+        path : str
+            Data file path (index is ``path + ".idx"``)
+        mode : str
+            "record" or "replay"
+        logger : logging.Logger, optional
+            Logger instance
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown decision log mode: {mode}")
+
+        self.path = path
+        self.index_path = path + ".idx"
+        self.mode = mode
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self.stats: Dict[str, int] = {'records': 0, 'hits': 0, 'misses': 0}
+
+        self._data = None
+        self._idx = None
+        self._map: Optional[mmap.mmap] = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+        if mode == "record":
+            self._data = open(path, "ab")
+            self._idx = open(self.index_path, "a", encoding="utf-8")
+        elif os.path.getsize(path):
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _load_index(self):
+        """Load the index, rebuilding it from the data file if stale."""
+        if not os.path.exists(self.path):
+            open(self.path, "ab").close()
+        data_size = os.path.getsize(self.path)
+
+        index: Dict[str, Tuple[int, int]] = {}
+        end = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 3:
+                        continue
+                    offset, length = int(parts[1]), int(parts[2])
+                    index[parts[0]] = (offset, length)
+                    end = max(end, offset + length + 1)
+
+        if end != data_size:
+            self.logger.warning(f"⚠️ Rebuilding decision log index for {self.path}")
+            index = self._scan()
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                for key, (offset, length) in index.items():
+                    f.write(f"{key}\t{offset}\t{length}\n")
+
+        self._index = index
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Walk the length prefixes of the data file (drops a torn last record)."""
+        index: Dict[str, Tuple[int, int]] = {}
+        with open(self.path, "rb") as f:
+            offset = 0
+            while True:
+                prefix = f.read(_PREFIX_LEN)
+                if len(prefix) < _PREFIX_LEN:
+                    break
+                length = int(prefix[:8])
+                payload = f.read(length)
+                if len(payload) < length or f.read(1) != b"\n":
+                    break
+                try:
+                    record = json.loads(payload)
+                except ValueError:
+                    break
+                index[record['hash']] = (offset + _PREFIX_LEN, length)
+                offset += _PREFIX_LEN + length + 1
+        if offset != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+        return index
+
+    def record(
+        self,
+        key: str,
+        messages: List[Dict[str, str]],
+        raw_response: str,
+        signal: Dict[str, Any],
+        latency_sec: float,
+        symbol: str = "",
+    ):
+        """Append one exchange (record mode only)."""
+        if self._data is None:
+            raise RuntimeError("Decision log is not open for recording")
+
+        payload = json.dumps({
+            'hash': key,
+            'symbol': symbol,
+            'recorded_at': time.time(),
+            'latency_sec': latency_sec,
+            'messages': messages,
+            'raw_response': raw_response,
+            'signal': signal,
+        }, ensure_ascii=False, default=str).encode()
+
+        with self._lock:
+            offset = self._data.tell()
+            self._data.write(b"%08d\t" % len(payload) + payload + b"\n")
+            self._data.flush()
+            self._idx.write(f"{key}\t{offset + _PREFIX_LEN}\t{len(payload)}\n")
+            self._idx.flush()
+            self._index[key] = (offset + _PREFIX_LEN, len(payload))
+            self.stats['records'] += 1
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Latest record for a prompt hash (replay mode), or None."""
+        location = self._index.get(key)
+        if location is None or self._map is None:
+            self.stats['misses'] += 1
+            return None
+        offset, length = location
+        self.stats['hits'] += 1
+        return json.loads(self._map[offset:offset + length])
+
+    def close(self):
+        """Close files."""
+        with self._lock:
+            for handle in (self._data, self._idx, self._map):
+                if handle is not None:
+                    handle.close()
+            self._data = self._idx = self._map = None
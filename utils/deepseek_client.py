@@ -6,11 +6,58 @@ Provides AI-powered market analysis and trading signal generation.
 
 import json
 import re
+import random
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from datetime import datetime
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from .ai_metrics import AnalyzerMetrics
+from .circuit_breaker import CircuitBreaker
+from .decision_log import DecisionLog, prompt_hash
+from .json_repair import parse_signal_array, parse_signal_json
+from .json_stream import StreamingFieldExtractor
+from .latency_histogram import LatencyHistogram
+from .prompt_encoder import (
+    COMPACT_BATCH_SYSTEM_PROMPT,
+    COMPACT_SYSTEM_PROMPT,
+    build_compact_batch_prompt,
+    build_compact_prompt,
+    estimate_message_tokens,
+    estimate_tokens,
+    split_symbol,
+)
+from .prompt_renderer import (
+    FULL_PROMPT_FRAMEWORK,
+    FULL_PROMPT_HEADER,
+    render_full_kline_line,
+    render_full_klines,
+)
+from .response_cache import SignalCache
+
+DEFAULT_SYMBOL = "BTCUSDT"
+
+
+def _decide_once(
+    on_decision: Optional[Callable[[Dict[str, Any]], None]],
+) -> Optional[Callable[[Dict[str, Any]], None]]:
+    """Wrap a provisional-decision callback so that it fires at most once."""
+    if on_decision is None:
+        return None
+    decided = False
+
+    def callback(decision: Dict[str, Any]):
+        nonlocal decided
+        if not decided:
+            decided = True
+            on_decision(decision)
+
+    return callback
 
 
 class DeepSeekAnalyzer:
@@ -28,6 +75,13 @@ class DeepSeekAnalyzer:
         temperature: float = 0.1,
         base_url: str = "https://api.deepseek.com",
         max_retries: int = 2,
+        stream: bool = False,
+        cache: Optional[SignalCache] = None,
+        prompt_mode: str = "full",
+        record_log: Optional[DecisionLog] = None,
+        replay_log: Optional[DecisionLog] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        batch_size: int = 4,
     ):
         """
         Initialize DeepSeek analyzer.
@@ -44,17 +98,47 @@ class DeepSeekAnalyzer:
             API base URL
         max_retries : int
             Maximum retry attempts on failure
+        stream : bool
+            Stream responses and report a provisional decision as soon as
+            'signal' and 'confidence' are complete
+        cache : SignalCache, optional
+            Reuse signals for unchanged (quantized) market state
+        prompt_mode : str
+            "full" (verbose framework in every prompt) or "compact" (static
+            system prefix + CSV/JSON market data, same response schema)
+        record_log : DecisionLog, optional
+            Append every model exchange to this log
+        replay_log : DecisionLog, optional
+            Answer from this log by prompt hash instead of calling the model
+            (misses return a fallback HOLD)
+        circuit_breaker : CircuitBreaker, optional
+            Stop calling a degraded provider; while open, signals are computed
+            locally from technical_data (see ``_create_local_signal``)
+        batch_size : int
+            Instruments per request in ``analyze_batch`` (keeps a batch
+            prompt inside the context window)
         """
+        if prompt_mode not in ("full", "compact"):
+            raise ValueError(f"Unknown prompt_mode: {prompt_mode}")
+
         self.client = OpenAI(api_key=api_key, base_url=base_url)
         self.model = model
         self.temperature = temperature
         self.max_retries = max_retries
+        self.stream = stream
+        self.cache = cache
+        self.prompt_mode = prompt_mode
+        self.record_log = record_log
+        self.replay_log = replay_log
+        self.circuit_breaker = circuit_breaker
+        self.batch_size = max(1, batch_size)
+        self.metrics = AnalyzerMetrics()
 
         # Setup logger
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
-        # Track signal history
-        self.signal_history = []
+        # Track signal history per symbol
+        self.signal_history: Dict[str, List[Dict[str, Any]]] = {}
 
     def analyze(
         self,
@@ -62,6 +146,8 @@ class DeepSeekAnalyzer:
         technical_data: Dict[str, Any],
         sentiment_data: Optional[Dict[str, Any]] = None,
         current_position: Optional[Dict[str, Any]] = None,
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Dict[str, Any]:
         """
         Analyze market conditions and generate trading signal.
@@ -69,13 +155,20 @@ class DeepSeekAnalyzer:
         Parameters
         ----------
         price_data : Dict
-            Current price and K-line data
+            Current price and K-line data; optional 'symbol' (default BTCUSDT)
         technical_data : Dict
             Technical indicator values
         sentiment_data : Dict, optional
             Market sentiment data
         current_position : Dict, optional
             Current position information
+        timeframe_data : Dict[str, Dict], optional
+            Higher-timeframe technical data keyed by timeframe (e.g. "1h")
+        on_decision : Callable, optional
+            Streaming mode only: called with a provisional
+            {"signal", "confidence", "provisional", "time_to_decision_sec"}
+            as soon as both fields are complete, before 'reason' arrives;
+            at most once per call (retries and hedges never re-publish)
 
         Returns
         -------
@@ -87,26 +180,404 @@ class DeepSeekAnalyzer:
                 "reason": str,
                 "stop_loss": float,
                 "take_profit": float,
-                "timestamp": str
+                "timestamp": str,
+                "time_to_decision_sec": float,
+                "response_time_sec": float,
+                "prompt_tokens_est": int,
+                "prompt_build_ms": float,
+                "prompt_tokens": int,
+                "completion_tokens": int,
+                "attempts": int,
+                "cached": bool
             }
         """
+        start = time.perf_counter()
+        signal = self._decide(
+            price_data, technical_data, sentiment_data, current_position, timeframe_data,
+            _decide_once(on_decision),
+        )
+        self._record_metrics(signal, time.perf_counter() - start)
+        return signal
+
+    def _decide(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]],
+        current_position: Optional[Dict[str, Any]],
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]],
+        on_decision: Optional[Callable[[Dict[str, Any]], None]],
+    ) -> Dict[str, Any]:
+        """Replay, cache lookup and the attempt loop behind ``analyze``."""
+        if self.replay_log is not None:
+            return self._replay_decision(
+                price_data, technical_data, sentiment_data, current_position, timeframe_data,
+            )
+
+        cache_key, cached = self._cache_lookup(
+            price_data, technical_data, sentiment_data, current_position,
+        )
+        if cached is not None:
+            return cached
+
         for attempt in range(self.max_retries):
+            local_signal = self._breaker_fast_fail(price_data, technical_data)
+            if local_signal is not None:
+                return local_signal
+
             try:
                 signal = self._analyze_with_retry(
-                    price_data, technical_data, sentiment_data, current_position
+                    price_data, technical_data, sentiment_data, current_position,
+                    timeframe_data, on_decision,
                 )
 
                 if signal and not signal.get("is_fallback", False):
-                    return signal
+                    self._breaker_record(signal)
+                    signal['attempts'] = attempt + 1
+                    return self._cache_store(cache_key, signal)
 
+                self._breaker_record(None, "unusable response")
                 self.logger.warning(f"⚠️ Attempt {attempt + 1} failed, retrying...")
 
             except Exception as e:
+                self._breaker_record(None, str(e))
                 self.logger.error(f"❌ Analysis attempt {attempt + 1} failed: {e}")
-                if attempt == self.max_retries - 1:
-                    return self._create_fallback_signal(price_data)
 
-        return self._create_fallback_signal(price_data)
+        return dict(self._create_fallback_signal(price_data), attempts=self.max_retries)
+
+    def _record_metrics(self, signal: Dict[str, Any], wall_sec: float):
+        """Feed one finished decision into ``self.metrics``."""
+        self.metrics.record(
+            AnalyzerMetrics.source_of(signal),
+            wall_sec,
+            prompt_tokens=signal.get('prompt_tokens', 0),
+            completion_tokens=signal.get('completion_tokens', 0),
+            retries=max(0, signal.get('attempts', 1) - 1),
+            repairs=signal.get('parse_repairs', ()),
+            hedged=signal.get('hedged', False),
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of per-call metrics.
+
+        Returns
+        -------
+        Dict
+            Decision counts by source, fallback rate, retries, parse repairs,
+            and p50/p95/p99 of wall latency and prompt/completion tokens
+        """
+        return self.metrics.snapshot()
+
+    @staticmethod
+    def _token_counts(usage: Any, messages: List[Dict[str, str]], result: str) -> Dict[str, Any]:
+        """Prompt/completion tokens from the API usage block, else estimated."""
+        if usage is not None and getattr(usage, 'prompt_tokens', None):
+            return {
+                'prompt_tokens': usage.prompt_tokens,
+                'completion_tokens': usage.completion_tokens or 0,
+                'tokens_estimated': False,
+            }
+        return {
+            'prompt_tokens': estimate_message_tokens(messages),
+            'completion_tokens': estimate_tokens(result or ''),
+            'tokens_estimated': True,
+        }
+
+    def analyze_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze several instruments with one compact request per chunk.
+
+        Parameters
+        ----------
+        requests : List[Dict]
+            Per instrument: price_data (with 'symbol'), technical_data and
+            optionally sentiment_data, current_position, timeframe_data
+        chunk_size : int, optional
+            Instruments per request (default: ``batch_size``)
+
+        Returns
+        -------
+        List[Dict]
+            Signals in request order. Items missing from the response or
+            failing validation get a fallback signal; batch signals are
+            neither cached nor recorded.
+        """
+        signals: List[Dict[str, Any]] = []
+        for chunk in self._batch_chunks(requests, chunk_size):
+            start = time.perf_counter()
+            chunk_signals = self._analyze_chunk(chunk)
+            for signal in chunk_signals:
+                self._record_metrics(signal, time.perf_counter() - start)
+            signals.extend(chunk_signals)
+        return signals
+
+    def _batch_chunks(
+        self,
+        requests: List[Dict[str, Any]],
+        chunk_size: Optional[int],
+    ) -> List[List[Dict[str, Any]]]:
+        size = max(1, chunk_size or self.batch_size)
+        return [requests[i:i + size] for i in range(0, len(requests), size)]
+
+    def _analyze_chunk(self, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attempt loop for one batch request."""
+        messages = self._build_batch_messages(chunk)
+        for attempt in range(self.max_retries):
+            local_signals = self._batch_fast_fail(chunk)
+            if local_signals is not None:
+                return local_signals
+
+            try:
+                start = time.perf_counter()
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=False,
+                    temperature=self.temperature,
+                )
+                result = response.choices[0].message.content
+                signals = self._demux_batch(result, chunk, messages, response.usage, start, attempt)
+                if signals is not None:
+                    return signals
+                self._breaker_record(None, "unusable batch response")
+                self.logger.warning(f"⚠️ Batch attempt {attempt + 1} failed, retrying...")
+
+            except Exception as e:
+                self._breaker_record(None, str(e))
+                self.logger.error(f"❌ Batch attempt {attempt + 1} failed: {e}")
+
+        return [
+            dict(self._create_fallback_signal(request['price_data']), attempts=self.max_retries)
+            for request in chunk
+        ]
+
+    def _batch_fast_fail(self, chunk: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Local signals for the whole chunk if the circuit breaker refuses the call."""
+        if self.circuit_breaker is None or self.circuit_breaker.allow_request():
+            return None
+        return [
+            self._create_local_signal(request['price_data'], request['technical_data'])
+            for request in chunk
+        ]
+
+    def _build_batch_messages(self, chunk: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """System prompt plus one compact section per instrument."""
+        sections = []
+        for request in chunk:
+            price_data = request['price_data']
+            symbol = price_data.get('symbol', DEFAULT_SYMBOL)
+            history = self.signal_history.get(symbol)
+            sections.append((symbol, build_compact_prompt(
+                price_data,
+                request['technical_data'],
+                request.get('sentiment_data'),
+                request.get('current_position'),
+                request.get('timeframe_data'),
+                previous_signal=history[-1] if history else None,
+                symbol=symbol,
+            )))
+        return [
+            {"role": "system", "content": COMPACT_BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": build_compact_batch_prompt(sections)},
+        ]
+
+    def _demux_batch(
+        self,
+        result: str,
+        chunk: List[Dict[str, Any]],
+        messages: List[Dict[str, str]],
+        usage: Any,
+        start: float,
+        attempt: int,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Split a batch response into per-instrument signals.
+
+        Items are matched by 'symbol', else by position when the counts agree.
+        Returns None if nothing usable came back (the chunk is retried).
+        """
+        self.logger.info(f"🤖 DeepSeek Batch Response: {result}")
+        items, repairs = parse_signal_array(result)
+        if not items:
+            self.logger.error(f"❌ Batch JSON parse failed ({', '.join(repairs)}): {result[:200]}")
+            return None
+        if repairs:
+            self.logger.warning(f"🔧 Repaired batch JSON: {', '.join(repairs)}")
+
+        by_symbol = {
+            str(item.get('symbol', '')).upper(): item for item in items if item.get('symbol')
+        }
+        positional = len(items) == len(chunk)
+        elapsed = time.perf_counter() - start
+        tokens = self._token_counts(usage, messages, result)
+
+        signals = []
+        for index, request in enumerate(chunk):
+            price_data = request['price_data']
+            symbol = price_data.get('symbol', DEFAULT_SYMBOL)
+            item = by_symbol.get(symbol.upper())
+            if item is None and positional and not items[index].get('symbol'):
+                item = items[index]
+
+            signal = None
+            if item is not None and self._valid_batch_item(item):
+                item = {k: v for k, v in item.items() if k != 'symbol'}
+                signal = self._finalize_signal(item, list(repairs), price_data)
+            if signal is None or signal.get('is_fallback'):
+                self.logger.warning(f"⚠️ No valid batch signal for {symbol}, using fallback")
+                signal = self._create_fallback_signal(price_data)
+
+            signal.update(
+                response_time_sec=elapsed,
+                attempts=attempt + 1,
+                batch_size=len(chunk),
+                prompt_tokens=tokens['prompt_tokens'] // len(chunk),
+                completion_tokens=tokens['completion_tokens'] // len(chunk),
+                tokens_estimated=tokens['tokens_estimated'],
+            )
+            signals.append(signal)
+
+        self._breaker_record({'response_time_sec': elapsed})
+        return signals
+
+    @staticmethod
+    def _valid_batch_item(item: Dict[str, Any]) -> bool:
+        """Signal/confidence are known values and the price levels are numbers."""
+        return (
+            item.get('signal') in ('BUY', 'SELL', 'HOLD')
+            and item.get('confidence') in ('HIGH', 'MEDIUM', 'LOW')
+            and all(isinstance(item.get(k), (int, float)) for k in ('stop_loss', 'take_profit'))
+        )
+
+    def _breaker_fast_fail(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """Local signal if the circuit breaker refuses the call, else None."""
+        if self.circuit_breaker is None or self.circuit_breaker.allow_request():
+            return None
+        return self._create_local_signal(price_data, technical_data)
+
+    def _breaker_record(self, signal: Optional[Dict[str, Any]], reason: str = ""):
+        """Report an attempt's outcome to the circuit breaker."""
+        if self.circuit_breaker is None:
+            return
+        if signal is None:
+            self.circuit_breaker.record_failure(reason)
+        else:
+            self.circuit_breaker.record_success(signal.get('response_time_sec', 0.0))
+
+    def get_breaker_status(self) -> Optional[Dict[str, Any]]:
+        """Circuit breaker state (None if no breaker is configured)."""
+        return self.circuit_breaker.status() if self.circuit_breaker is not None else None
+
+    def _cache_lookup(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]],
+        current_position: Optional[Dict[str, Any]],
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Look up a cached signal for the current market state.
+
+        Returns
+        -------
+        Tuple[Optional[str], Optional[Dict]]
+            (cache key, cached signal marked ``cached=True`` or None)
+        """
+        if self.cache is None:
+            return None, None
+
+        key = self.cache.make_key(price_data, technical_data, sentiment_data, current_position)
+        signal = self.cache.get(key)
+        if signal is None:
+            return key, None
+
+        signal.update(
+            cached=True,
+            timestamp=datetime.now().isoformat(),
+            time_to_decision_sec=0.0,
+            response_time_sec=0.0,
+        )
+        self.logger.info(
+            f"♻️ Cached signal reused ({signal['cache_age_sec']:.0f}s old): "
+            f"{signal.get('signal')} ({signal.get('confidence')})"
+        )
+        return key, signal
+
+    def _cache_store(self, key: Optional[str], signal: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache a fresh (non-fallback) signal and mark it uncached."""
+        signal['cached'] = False
+        if key is not None:
+            self.cache.put(key, signal)
+        return signal
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Cache counters and hit rate (None if caching is disabled)."""
+        return self.cache.get_stats() if self.cache is not None else None
+
+    def _record_decision(
+        self,
+        messages: List[Dict[str, str]],
+        raw_response: str,
+        signal_data: Dict[str, Any],
+        price_data: Dict[str, Any],
+    ):
+        """Append one model exchange to the record log (if recording)."""
+        if self.record_log is None:
+            return
+        try:
+            self.record_log.record(
+                prompt_hash(messages, volatile=(price_data.get('timestamp', ''),)),
+                messages,
+                raw_response,
+                signal_data,
+                signal_data.get('response_time_sec', 0.0),
+                symbol=price_data.get('symbol', DEFAULT_SYMBOL),
+            )
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to record decision: {e}")
+
+    def _replay_decision(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]],
+        current_position: Optional[Dict[str, Any]],
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Answer from the replay log by prompt hash.
+
+        The recorded raw response goes through ``_process_response`` again, so
+        signal history (and with it the next prompt) evolves exactly as live.
+        """
+        messages = self._build_messages(
+            price_data, technical_data, sentiment_data, current_position, timeframe_data,
+        )
+        key = prompt_hash(messages, volatile=(price_data.get('timestamp', ''),))
+        record = self.replay_log.lookup(key)
+        if record is None:
+            self.logger.warning(f"⚠️ No recorded decision for prompt {key[:12]}, using fallback")
+            signal_data = self._create_fallback_signal(price_data)
+            signal_data['replayed'] = False
+            return signal_data
+
+        signal_data = self._process_response(record['raw_response'], price_data)
+        signal_data.update(
+            replayed=True,
+            recorded_latency_sec=record.get('latency_sec', 0.0),
+            response_time_sec=0.0,
+            time_to_decision_sec=0.0,
+        )
+        return signal_data
 
     def _analyze_with_retry(
         self,
@@ -114,43 +585,188 @@ class DeepSeekAnalyzer:
         technical_data: Dict[str, Any],
         sentiment_data: Optional[Dict[str, Any]],
         current_position: Optional[Dict[str, Any]],
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Dict[str, Any]:
         """Internal analysis with single attempt."""
 
-        # Build comprehensive prompt
-        prompt = self._build_analysis_prompt(
-            price_data, technical_data, sentiment_data, current_position
+        build_start = time.perf_counter()
+        messages = self._build_messages(
+            price_data, technical_data, sentiment_data, current_position,
+            timeframe_data,
+        )
+        prompt_build_ms = (time.perf_counter() - build_start) * 1000
+        prompt_tokens = estimate_message_tokens(messages)
+        self.logger.info(
+            f"📏 Prompt ~{prompt_tokens} tokens ({self.prompt_mode}), built in {prompt_build_ms:.2f}ms"
         )
 
         # Call DeepSeek API
-        response = self.client.chat.completions.create(
+        start = time.perf_counter()
+        usage = None
+        if self.stream:
+            result, decision_sec = self._stream_completion(messages, on_decision, start)
+        else:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=False,
+                temperature=self.temperature
+            )
+            result, decision_sec = response.choices[0].message.content, None
+            usage = response.usage
+
+        signal_data = self._process_response(result, price_data)
+        self._record_latency(signal_data, start, decision_sec)
+        signal_data['prompt_tokens_est'] = prompt_tokens
+        signal_data['prompt_build_ms'] = prompt_build_ms
+        signal_data.update(self._token_counts(usage, messages, result))
+        self._record_decision(messages, result, signal_data, price_data)
+        return signal_data
+
+    def _stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        on_decision: Optional[Callable[[Dict[str, Any]], None]],
+        start: float,
+    ) -> Tuple[str, Optional[float]]:
+        """
+        Stream a completion, emitting the provisional decision early.
+
+        Returns
+        -------
+        Tuple[str, Optional[float]]
+            (full response text, seconds until signal/confidence were complete)
+        """
+        stream = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an elite algorithmic trading system specializing in "
-                        "high-frequency cryptocurrency trading on Binance Futures (BTCUSDT-PERP). "
-                        "You analyze 15-minute K-line data with precision, combining multiple "
-                        "technical indicators, market microstructure, and sentiment analysis. "
-                        "Your decisions must be data-driven, risk-aware, and optimized for "
-                        "15-minute timeframe characteristics. Always return responses strictly in JSON format."
-                    )
-                },
-                {"role": "user", "content": prompt}
-            ],
-            stream=False,
+            messages=messages,
+            stream=True,
             temperature=self.temperature
         )
 
+        extractor = StreamingFieldExtractor()
+        parts = []
+        decision_sec = None
+        for chunk in stream:
+            text = self._chunk_text(chunk)
+            if not text:
+                continue
+            parts.append(text)
+            if decision_sec is None:
+                extractor.feed(text)
+                if extractor.has('signal', 'confidence'):
+                    decision_sec = time.perf_counter() - start
+                    self._emit_decision(extractor.fields, decision_sec, on_decision)
+
+        return ''.join(parts), decision_sec
+
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Text delta of a streamed chunk ('' for usage-only chunks)."""
+        if not chunk.choices:
+            return ''
+        return chunk.choices[0].delta.content or ''
+
+    def _emit_decision(
+        self,
+        fields: Dict[str, Any],
+        decision_sec: float,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]],
+    ):
+        """Report a provisional decision if signal/confidence are valid."""
+        signal = str(fields.get('signal', '')).upper()
+        confidence = str(fields.get('confidence', '')).upper()
+        if signal not in ('BUY', 'SELL', 'HOLD') or confidence not in ('HIGH', 'MEDIUM', 'LOW'):
+            return
+
+        self.logger.info(f"⚡ Provisional decision: {signal} ({confidence}) after {decision_sec:.2f}s")
+        if on_decision is None:
+            return
+        try:
+            on_decision({
+                'signal': signal,
+                'confidence': confidence,
+                'provisional': True,
+                'time_to_decision_sec': decision_sec,
+            })
+        except Exception as e:
+            self.logger.warning(f"⚠️ Provisional decision callback failed: {e}")
+
+    @staticmethod
+    def _record_latency(signal_data: Dict[str, Any], start: float, decision_sec: Optional[float]):
+        """Attach time-to-decision and total response time to a signal."""
+        total_sec = time.perf_counter() - start
+        signal_data['response_time_sec'] = total_sec
+        signal_data['time_to_decision_sec'] = decision_sec if decision_sec is not None else total_sec
+
+    def _build_messages(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]],
+        current_position: Optional[Dict[str, Any]],
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages (system + analysis prompt) for one request."""
+        symbol = price_data.get('symbol', DEFAULT_SYMBOL)
+
+        if self.prompt_mode == "compact":
+            history = self.signal_history.get(symbol)
+            return [
+                {"role": "system", "content": COMPACT_SYSTEM_PROMPT},
+                {"role": "user", "content": build_compact_prompt(
+                    price_data, technical_data, sentiment_data, current_position,
+                    timeframe_data,
+                    previous_signal=history[-1] if history else None,
+                    symbol=symbol,
+                )},
+            ]
+
+        # Build comprehensive prompt
+        prompt = self._build_analysis_prompt(
+            price_data, technical_data, sentiment_data, current_position,
+            timeframe_data,
+        )
+
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "You are an elite algorithmic trading system specializing in "
+                    f"high-frequency cryptocurrency trading on Binance Futures ({symbol}-PERP). "
+                    "You analyze 15-minute K-line data with precision, combining multiple "
+                    "technical indicators, market microstructure, and sentiment analysis. "
+                    "Your decisions must be data-driven, risk-aware, and optimized for "
+                    "15-minute timeframe characteristics. Always return responses strictly in JSON format."
+                )
+            },
+            {"role": "user", "content": prompt}
+        ]
+
+    def _process_response(self, result: str, price_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse and validate a model response, then record it in the signal history."""
         # Parse response
-        result = response.choices[0].message.content
         self.logger.info(f"🤖 DeepSeek Response: {result}")
 
-        signal_data = self._safe_parse_json(result)
+        signal_data, repairs = parse_signal_json(result)
 
         if signal_data is None:
+            self.logger.error(f"❌ JSON parse failed ({', '.join(repairs)}): {result[:200]}")
             return self._create_fallback_signal(price_data)
+        if repairs:
+            self.logger.warning(f"🔧 Repaired model JSON: {', '.join(repairs)}")
+
+        return self._finalize_signal(signal_data, repairs, price_data)
+
+    def _finalize_signal(
+        self,
+        signal_data: Dict[str, Any],
+        repairs: List[str],
+        price_data: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Validate a parsed signal, add defaults/metadata and record it in the signal history."""
+        symbol = price_data.get('symbol', DEFAULT_SYMBOL)
 
         # Validate required fields
         required_fields = ["signal", "reason", "stop_loss", "take_profit", "confidence"]
@@ -168,14 +784,17 @@ class DeepSeekAnalyzer:
 
         # Add metadata
         signal_data["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if repairs:
+            signal_data["parse_repairs"] = repairs
 
         # Store in history
-        self.signal_history.append(signal_data)
-        if len(self.signal_history) > 30:
-            self.signal_history.pop(0)
+        history = self.signal_history.setdefault(symbol, [])
+        history.append(signal_data)
+        if len(history) > 30:
+            history.pop(0)
 
         # Log signal statistics
-        self._log_signal_stats(signal_data)
+        self._log_signal_stats(signal_data, history)
 
         return signal_data
 
@@ -185,243 +804,74 @@ class DeepSeekAnalyzer:
         technical_data: Dict[str, Any],
         sentiment_data: Optional[Dict[str, Any]],
         current_position: Optional[Dict[str, Any]],
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
     ) -> str:
         """Build comprehensive analysis prompt for DeepSeek."""
 
-        # K-line data
-        kline_text = self._format_kline_data(price_data.get("kline_data", []))
+        # K-line data (pre-rendered by the strategy's KlinePromptRenderer when available)
+        if price_data.get('kline_format') == "full":
+            kline_text = price_data['kline_text']
+        else:
+            kline_text = self._format_kline_data(price_data.get("kline_data", []))
 
         # Technical analysis
         technical_text = self._format_technical_data(technical_data)
 
+        # Higher-timeframe context
+        timeframe_text = self._format_timeframe_data(timeframe_data)
+
         # Sentiment data
         sentiment_text = self._format_sentiment_data(sentiment_data)
 
+        symbol = price_data.get('symbol', DEFAULT_SYMBOL)
+        base_asset, quote_asset = split_symbol(symbol)
+        base_asset = price_data.get('base_asset') or base_asset
+        quote_asset = price_data.get('quote_asset') or quote_asset
+
         # Position info
-        position_text = self._format_position_data(current_position)
+        position_text = self._format_position_data(current_position, base_asset, quote_asset)
 
-        # Previous signal
+        # Previous signal (same symbol only)
         signal_text = ""
-        if self.signal_history:
-            last_signal = self.signal_history[-1]
+        history = self.signal_history.get(symbol)
+        if history:
+            last_signal = history[-1]
             signal_text = (
                 f"\n【Previous Signal】\n"
                 f"Signal: {last_signal.get('signal', 'N/A')}\n"
                 f"Confidence: {last_signal.get('confidence', 'N/A')}"
             )
 
-        prompt = f"""
-═══════════════════════════════════════════════════════════════
-  BTC/USDT FUTURES - 15-MINUTE TIMEFRAME ANALYSIS
-═══════════════════════════════════════════════════════════════
-
-【MARKET CONTEXT - REAL-TIME DATA】
-
-{kline_text}
-
-{technical_text}
-
-{sentiment_text}
-
-{signal_text}
-
-【CURRENT MARKET STATE】
-├─ Current Price: ${price_data['price']:,.2f}
-├─ Time: {price_data['timestamp']}
-├─ Period High: ${price_data.get('high', 0):,.2f}
-├─ Period Low: ${price_data.get('low', 0):,.2f}
-├─ Volume: {price_data.get('volume', 0):.2f} BTC
-├─ Price Change: {price_data.get('price_change', 0):+.2f}%
-└─ Current Position: {position_text}
-
-【CRITICAL TECHNICAL STATUS】
-├─ Overall Trend: {technical_data.get('overall_trend', 'N/A')}
-├─ Short-term Trend: {technical_data.get('short_term_trend', 'N/A')}
-├─ RSI: {technical_data.get('rsi', 0):.1f} ({'🔴 Overbought' if technical_data.get('rsi', 0) > 70 else '🟢 Oversold' if technical_data.get('rsi', 0) < 30 else '⚪ Neutral'})
-└─ MACD Direction: {technical_data.get('macd_trend', 'N/A')}
-
-═══════════════════════════════════════════════════════════════
-  TRADING STRATEGY FRAMEWORK - MUST FOLLOW
-═══════════════════════════════════════════════════════════════
-
-【1. DECISION HIERARCHY (Weight Distribution)】
-
-Primary Layer (60% weight) - TECHNICAL ANALYSIS:
-├─ Trend Direction (MA alignment, price action)
-│  ├─ Strong uptrend: Price > SMA5 > SMA20 > SMA50 → BUY bias
-│  ├─ Strong downtrend: Price < SMA5 < SMA20 < SMA50 → SELL bias
-│  └─ Mixed/consolidation: No clear trend → HOLD/Cautious
-├─ Support/Resistance Levels
-│  ├─ Price near resistance with volume → Potential reversal SELL
-│  ├─ Price near support with volume → Potential bounce BUY
-│  └─ Price breaking key levels with volume → Strong signal
-└─ K-line Patterns & Candlestick Formations
-   ├─ Bullish patterns (hammer, engulfing, etc.) → BUY signal
-   ├─ Bearish patterns (shooting star, dark cloud, etc.) → SELL signal
-   └─ Doji/indecision → Wait for confirmation
-
-Secondary Layer (30% weight) - MARKET SENTIMENT:
-├─ Sentiment aligns with technical → Enhance confidence by 1 level
-├─ Sentiment diverges from technical → Follow technical, sentiment as warning
-└─ Sentiment data unavailable/delayed → Ignore, focus on technical
-
-Tertiary Layer (10% weight) - RISK MANAGEMENT:
-├─ Current position P&L status
-├─ Stop-loss placement (should be 1-2% from entry)
-└─ Position sizing constraints
-
-【2. SIGNAL GENERATION LOGIC - STRICT RULES】
-
-BUY Signal Conditions (Require at least 2 of 3):
-├─ ✅ Strong uptrend confirmed by MA alignment
-├─ ✅ Price breaks above resistance with volume surge
-├─ ✅ RSI recovering from oversold (< 40) or healthy momentum (40-60)
-├─ ✅ MACD bullish crossover or positive histogram
-├─ ✅ Bullish K-line pattern (hammer, bullish engulfing, etc.)
-└─ ✅ Sentiment positive (if available, adds confidence)
-
-SELL Signal Conditions (Require at least 2 of 3):
-├─ ✅ Strong downtrend confirmed by MA alignment
-├─ ✅ Price breaks below support with volume surge
-├─ ✅ RSI declining from overbought (> 60) or strong bearish momentum
-├─ ✅ MACD bearish crossover or negative histogram
-├─ ✅ Bearish K-line pattern (shooting star, bearish engulfing, etc.)
-└─ ✅ Sentiment negative (if available, adds confidence)
-
-HOLD Signal Conditions:
-├─ ⚠️ Consolidation/narrow range trading (no clear direction)
-├─ ⚠️ Mixed signals (some indicators bullish, some bearish)
-├─ ⚠️ Waiting for confirmation (potential reversal but not confirmed)
-└─ ⚠️ Low volume with indecisive candles
-
-【3. CONFIDENCE LEVEL ASSIGNMENT】
-
-HIGH Confidence:
-├─ 3+ technical indicators align
-├─ Clear trend with strong volume
-├─ Price action confirms indicator signals
-└─ Sentiment supports (if available)
-
-MEDIUM Confidence:
-├─ 2 technical indicators align
-├─ Moderate trend strength
-├─ Some conflicting signals present
-└─ Sentiment neutral or unavailable
-
-LOW Confidence:
-├─ Only 1 strong indicator
-├─ Mixed signals predominant
-├─ Low volume/consolidation phase
-└─ Sentiment contradicts technical
-
-【4. ANTI-OVERTRADING PRINCIPLES】
-
-1. Trend Continuity:
-   └─ Don't reverse signal based on single candle fluctuation
-   └─ Require 2-3 consecutive bars confirming reversal
-
-2. Position Stability:
-   └─ Maintain direction unless clear reversal pattern
-   └─ Avoid frequent position changes (minimize transaction costs)
-
-3. Signal Confirmation:
-   └─ Wait for confirmation when in doubt
-   └─ Better to HOLD than make wrong move
-
-4. Volume Validation:
-   └─ High-confidence signals require volume confirmation
-   └─ Low volume moves are less reliable
-
-【5. 15-MINUTE TIMEFRAME SPECIFIC CONSIDERATIONS】
-
-├─ Balanced timeframe for both trend following and swing trading
-├─ Signals are more reliable with reduced noise compared to 1-minute
-├─ Volume analysis is important for confirmation
-├─ RSI > 70 or < 30 indicates strong momentum (act with caution)
-└─ MACD crossovers are significant and should be respected
-
-【6. RISK MANAGEMENT INTEGRATION】
-
-Stop-Loss Placement:
-├─ BUY signal: Place 1-2% below entry or below recent support
-├─ SELL signal: Place 1-2% above entry or above recent resistance
-└─ Consider volatility: Tighter stops in volatile conditions
-
-Take-Profit Targets:
-├─ High confidence: 2-3% target
-├─ Medium confidence: 1.5-2% target
-└─ Low confidence: 1% target or consider HOLD
-
-Position Management:
-├─ Existing LONG position:
-│  ├─ Trend continues → Maintain BUY signal
-│  ├─ Trend reverses → Generate SELL signal to close/reverse
-│  └─ Unrealized loss > 2% → Consider cutting losses
-└─ Existing SHORT position:
-   ├─ Trend continues → Maintain SELL signal
-   ├─ Trend reverses → Generate BUY signal to close/reverse
-   └─ Unrealized loss > 2% → Consider cutting losses
-
-═══════════════════════════════════════════════════════════════
-  OUTPUT REQUIREMENTS
-═══════════════════════════════════════════════════════════════
-
-Provide a comprehensive analysis and trading signal.
-
-CRITICAL: Your response MUST be valid JSON only, no additional text.
-
-**IMPORTANT JSON FORMATTING RULES:**
-1. DO NOT use double quotes (") inside string values
-2. Use single quotes (') or parentheses for emphasis instead
-3. The "reason" field must be a single continuous string without internal quotes
-
-JSON Format:
-{{
-    "signal": "BUY|SELL|HOLD",
-    "confidence": "HIGH|MEDIUM|LOW",
-    "reason": "Detailed analysis including: (1) Current trend assessment, (2) Key technical indicators analysis, (3) Support/resistance levels, (4) Volume analysis, (5) Risk factors, (6) Why this signal at this moment. Use ONLY single quotes or parentheses for emphasis, NEVER use double quotes inside this field.",
-    "stop_loss": <numerical_price_value>,
-    "take_profit": <numerical_price_value>,
-    "trend_strength": "STRONG|MODERATE|WEAK",
-    "risk_assessment": "LOW|MEDIUM|HIGH"
-}}
-
-Example stop_loss/take_profit values:
-- BUY: stop_loss should be current_price * 0.98-0.99, take_profit should be current_price * 1.02-1.03
-- SELL: stop_loss should be current_price * 1.01-1.02, take_profit should be current_price * 0.97-0.98
-- HOLD: Set stop_loss and take_profit to current_price
-
-Example CORRECT reason format:
-"reason": "(1) Current trend shows strong downward momentum with price below all SMAs. (2) RSI at 35 indicates oversold conditions. (3) Key support at $110,000 being tested. Use single quotes for 'emphasis' if needed."
-
-Example WRONG reason format (DO NOT USE):
-"reason": "(1) Current trend "assessment" shows..." <- WRONG! Contains internal double quotes
-
-Remember: Be decisive but not reckless. Quality over quantity.
-"""
-        return prompt
+        rsi = technical_data.get('rsi', 0)
+        header = FULL_PROMPT_HEADER.format(
+            base_asset=base_asset,
+            quote_asset=quote_asset,
+            kline_text=kline_text,
+            technical_text=technical_text,
+            timeframe_text=timeframe_text,
+            sentiment_text=sentiment_text,
+            signal_text=signal_text,
+            price=price_data['price'],
+            timestamp=price_data['timestamp'],
+            high=price_data.get('high', 0),
+            low=price_data.get('low', 0),
+            volume=price_data.get('volume', 0),
+            price_change=price_data.get('price_change', 0),
+            position_text=position_text,
+            overall_trend=technical_data.get('overall_trend', 'N/A'),
+            short_term_trend=technical_data.get('short_term_trend', 'N/A'),
+            rsi=rsi,
+            rsi_label='🔴 Overbought' if rsi > 70 else '🟢 Oversold' if rsi < 30 else '⚪ Neutral',
+            macd_trend=technical_data.get('macd_trend', 'N/A'),
+        )
+        return header + FULL_PROMPT_FRAMEWORK
 
     def _format_kline_data(self, kline_data: list) -> str:
         """Format K-line data for prompt."""
-        if not kline_data:
-            return "【Recent K-line Data】\nNo K-line data available"
-
-        kline_text = "【Recent 10 15-minute K-lines (Most Recent)】\n"
-        for i, kline in enumerate(kline_data[-10:], 1):
-            candle_type = "🟢 Bullish" if kline['close'] > kline['open'] else "🔴 Bearish"
-            change = ((kline['close'] - kline['open']) / kline['open']) * 100
-            body_size = abs(kline['close'] - kline['open'])
-            total_range = kline['high'] - kline['low']
-            body_ratio = (body_size / total_range * 100) if total_range > 0 else 0
-            
-            kline_text += (
-                f"K{i}: {candle_type} | "
-                f"O:{kline['open']:.2f} H:{kline['high']:.2f} L:{kline['low']:.2f} C:{kline['close']:.2f} | "
-                f"Change:{change:+.2f}% | "
-                f"Vol:{kline['volume']:.2f} | "
-                f"Body:{body_ratio:.1f}%\n"
-            )
-        return kline_text
+        return render_full_klines([
+            render_full_kline_line(k['open'], k['high'], k['low'], k['close'], k['volume'])
+            for k in kline_data[-10:]
+        ])
 
     def _format_technical_data(self, technical_data: Dict[str, Any]) -> str:
         """Format technical indicator data for prompt."""
@@ -461,6 +911,26 @@ Remember: Be decisive but not reckless. Quality over quantity.
 """
         return text
     
+    def _format_timeframe_data(self, timeframe_data: Optional[Dict[str, Dict[str, Any]]]) -> str:
+        """Format higher-timeframe technical summaries for prompt."""
+        if not timeframe_data:
+            return ""
+
+        def safe_float(val, default=0):
+            return float(val) if val is not None else default
+
+        text = "【Higher Timeframe Context】\n"
+        for timeframe, data in timeframe_data.items():
+            text += (
+                f"{timeframe}: Trend {data.get('overall_trend', 'N/A')} "
+                f"(Short {data.get('short_term_trend', 'N/A')}, Medium {data.get('medium_term_trend', 'N/A')}) | "
+                f"RSI:{safe_float(data.get('rsi_pct')):.1f} | "
+                f"MACD Hist:{safe_float(data.get('macd_histogram')):.4f} ({data.get('macd_trend', 'N/A')}) | "
+                f"BB Pos:{safe_float(data.get('bb_position')):.2%} | "
+                f"S/R:${safe_float(data.get('support')):.2f}/${safe_float(data.get('resistance')):.2f}\n"
+            )
+        return text
+
     def _format_sma_data(self, technical_data: Dict[str, Any]) -> str:
         """Format SMA data dynamically based on available periods."""
         sma_text = ""
@@ -490,70 +960,29 @@ Remember: Be decisive but not reckless. Quality over quantity.
             f"Net {sign}{sentiment_data['net_sentiment']:.3f}"
         )
 
-    def _format_position_data(self, position: Optional[Dict[str, Any]]) -> str:
+    def _format_position_data(
+        self,
+        position: Optional[Dict[str, Any]],
+        base_asset: str = "BTC",
+        quote_asset: str = "USDT",
+    ) -> str:
         """Format position data for prompt."""
         if not position:
             return "No position"
 
         return (
             f"{position['side']} position, "
-            f"Size: {position.get('quantity', 0):.3f} BTC, "
+            f"Size: {position.get('quantity', 0):.3f} {base_asset}, "
             f"Avg Price: ${position.get('avg_px', 0):.2f}, "
-            f"P&L: {position.get('unrealized_pnl', 0):.2f} USDT"
+            f"P&L: {position.get('unrealized_pnl', 0):.2f} {quote_asset}"
         )
 
     def _safe_parse_json(self, json_str: str) -> Optional[Dict[str, Any]]:
-        """Safely parse JSON response, handling format issues."""
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            # Try to extract JSON from response
-            start_idx = json_str.find('{')
-            end_idx = json_str.rfind('}') + 1
-
-            if start_idx != -1 and end_idx != 0:
-                json_str_original = json_str[start_idx:end_idx]
-
-                try:
-                    # Parse line by line and fix quotes in string values
-                    lines = json_str_original.split('\n')
-                    fixed_lines = []
-                    
-                    for line in lines:
-                        # Check if this is a line with a key-value pair containing quotes
-                        if '": "' in line and line.strip().endswith((',', '",')):
-                            # Find the value part (between the first ": " and the last ")
-                            key_end = line.find('": "') + 4
-                            if line.strip().endswith(','):
-                                value_end = line.rfind('",')
-                            else:
-                                value_end = line.rfind('"')
-                            
-                            if key_end > 4 and value_end > key_end:
-                                prefix = line[:key_end]
-                                value = line[key_end:value_end]
-                                suffix = line[value_end:]
-                                
-                                # Replace internal quotes with single quotes
-                                fixed_value = value.replace('"', "'")
-                                fixed_line = prefix + fixed_value + suffix
-                                fixed_lines.append(fixed_line)
-                            else:
-                                fixed_lines.append(line)
-                        else:
-                            fixed_lines.append(line)
-                    
-                    json_str = '\n'.join(fixed_lines)
-                    
-                    # Try parsing
-                    return json.loads(json_str)
-                except json.JSONDecodeError as e:
-                    self.logger.error(f"❌ JSON parse failed: {e}")
-                    self.logger.debug(f"Original content: {json_str_original[:500]}...")
-                except Exception as e:
-                    self.logger.error(f"❌ JSON fix error: {e}")
-
-            return None
+        """Safely parse JSON response, handling format issues (see ``parse_signal_json``)."""
+        signal_data, repairs = parse_signal_json(json_str)
+        if signal_data is None:
+            self.logger.error(f"❌ JSON parse failed ({', '.join(repairs)})")
+        return signal_data
 
     def _create_fallback_signal(self, price_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create conservative fallback signal when AI analysis fails."""
@@ -567,16 +996,662 @@ Remember: Be decisive but not reckless. Quality over quantity.
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
-    def _log_signal_stats(self, signal_data: Dict[str, Any]):
-        """Log signal statistics."""
+    def _create_local_signal(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Deterministic signal from technical_data, used while the AI circuit is open.
+
+        BUY/SELL only when price is on the same side of every SMA and the MACD
+        histogram agrees, and RSI is not stretched in that direction; always
+        LOW confidence. Otherwise HOLD.
+        """
+        price = price_data['price']
+        smas = [float(v) for k, v in technical_data.items() if k.startswith('sma_') and v]
+        histogram = float(technical_data.get('macd_histogram') or 0.0)
+        rsi = float(technical_data.get('rsi_pct') or 50.0)
+
+        signal = "HOLD"
+        if smas and all(price > sma for sma in smas) and histogram > 0 and rsi < 70:
+            signal = "BUY"
+        elif smas and all(price < sma for sma in smas) and histogram < 0 and rsi > 30:
+            signal = "SELL"
+
+        if signal == "BUY":
+            stop_loss, take_profit = price * 0.98, price * 1.02
+        elif signal == "SELL":
+            stop_loss, take_profit = price * 1.02, price * 0.98
+        else:
+            stop_loss = take_profit = price
+
+        breaker = self.get_breaker_status() or {}
+        self.logger.warning(
+            f"⛔ AI circuit {breaker.get('state', 'OPEN')}, local technical signal: {signal}"
+        )
+        return {
+            "signal": signal,
+            "confidence": "LOW",
+            "reason": (
+                f"AI provider unavailable (circuit {breaker.get('state', 'OPEN')}); local rules: "
+                f"price vs {len(smas)} SMAs, MACD histogram {histogram:+.4f}, RSI {rsi:.1f}"
+            ),
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+            "is_fallback": True,
+            "local_fallback": True,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "time_to_decision_sec": 0.0,
+            "response_time_sec": 0.0,
+        }
+
+    def _log_signal_stats(self, signal_data: Dict[str, Any], history: List[Dict[str, Any]]):
+        """Log signal statistics for one symbol's history."""
         signal = signal_data['signal']
-        signal_count = sum(1 for s in self.signal_history if s.get('signal') == signal)
-        total = len(self.signal_history)
+        signal_count = sum(1 for s in history if s.get('signal') == signal)
+        total = len(history)
 
         self.logger.debug(f"📊 Signal Stats: {signal} (appeared {signal_count}/{total} times in recent history)")
 
         # Check for consecutive same signals
-        if len(self.signal_history) >= 3:
-            last_three = [s['signal'] for s in self.signal_history[-3:]]
+        if len(history) >= 3:
+            last_three = [s['signal'] for s in history[-3:]]
             if len(set(last_three)) == 1:
                 self.logger.warning(f"⚠️ Warning: 3 consecutive {signal} signals")
+
+
+class AsyncDeepSeekAnalyzer(DeepSeekAnalyzer):
+    """
+    DeepSeek analyzer on an async client with a persistent connection pool.
+
+    All requests run on one private event loop (in a daemon thread) that owns
+    the keep-alive pool, so TLS connections are reused across calls and
+    across instruments. Retries use exponential backoff with full jitter and
+    every attempt has its own timeout.
+
+    With ``hedge_quantile`` set, a request that is still unanswered at that
+    quantile of recent request latencies gets an identical second request and
+    the first answer wins. ``decision_deadline_sec`` bounds the whole decision
+    (attempts, hedges and backoff); past it a fallback signal is returned.
+
+    ``analyze()`` keeps the synchronous interface (thread-safe, blocks the
+    caller only); ``analyze_async()`` and ``analyze_many()`` are awaitable.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "deepseek-chat",
+        temperature: float = 0.1,
+        base_url: str = "https://api.deepseek.com",
+        max_retries: int = 2,
+        timeout_sec: float = 30.0,
+        backoff_base_sec: float = 0.5,
+        backoff_max_sec: float = 8.0,
+        max_connections: int = 10,
+        http_client: Optional[httpx.AsyncClient] = None,
+        stream: bool = False,
+        cache: Optional[SignalCache] = None,
+        prompt_mode: str = "full",
+        record_log: Optional[DecisionLog] = None,
+        replay_log: Optional[DecisionLog] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        batch_size: int = 4,
+        hedge_quantile: float = 0.0,
+        hedge_min_samples: int = 20,
+        hedge_min_delay_sec: float = 0.5,
+        decision_deadline_sec: float = 0.0,
+        latency_window: int = 256,
+    ):
+        """
+        Initialize async DeepSeek analyzer.
+
+        Parameters
+        ----------
+        api_key : str
+            DeepSeek API key
+        model : str
+            Model name (default: deepseek-chat)
+        temperature : float
+            Temperature for response generation (0.0-1.0)
+        base_url : str
+            API base URL
+        max_retries : int
+            Maximum attempts per analysis
+        timeout_sec : float
+            Timeout of a single attempt
+        backoff_base_sec : float
+            Backoff cap before the second attempt (doubles per attempt)
+        backoff_max_sec : float
+            Maximum backoff between attempts
+        max_connections : int
+            Size of the keep-alive connection pool (also caps concurrent requests)
+        http_client : httpx.AsyncClient, optional
+            Custom HTTP client (e.g. for tests); must only be used by this analyzer
+        stream : bool
+            Stream responses with early decision extraction (see DeepSeekAnalyzer)
+        cache : SignalCache, optional
+            Reuse signals for unchanged (quantized) market state
+        prompt_mode : str
+            "full" or "compact" (see DeepSeekAnalyzer)
+        record_log, replay_log : DecisionLog, optional
+            Record/replay model exchanges (see DeepSeekAnalyzer)
+        circuit_breaker : CircuitBreaker, optional
+            Fast-fail to a local signal while the provider is degraded (see DeepSeekAnalyzer)
+        batch_size : int
+            Instruments per request in ``analyze_batch`` (see DeepSeekAnalyzer)
+        hedge_quantile : float
+            Send a hedge request when the first one is slower than this
+            quantile of recent latencies (e.g. 0.95; 0 = no hedging)
+        hedge_min_samples : int
+            Latency samples required before hedging starts
+        hedge_min_delay_sec : float
+            Never hedge earlier than this
+        decision_deadline_sec : float
+            Overall budget of one decision (0 = unbounded)
+        latency_window : int
+            Number of recent request latencies the hedge threshold is computed from
+        """
+        if not 0.0 <= hedge_quantile < 1.0:
+            raise ValueError(f"hedge_quantile must be in [0, 1): {hedge_quantile}")
+
+        super().__init__(
+            api_key=api_key,
+            model=model,
+            temperature=temperature,
+            base_url=base_url,
+            max_retries=max_retries,
+            stream=stream,
+            cache=cache,
+            prompt_mode=prompt_mode,
+            record_log=record_log,
+            replay_log=replay_log,
+            circuit_breaker=circuit_breaker,
+            batch_size=batch_size,
+        )
+        self.timeout_sec = timeout_sec
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay_sec = hedge_min_delay_sec
+        self.decision_deadline_sec = decision_deadline_sec
+        self.latency_histogram = LatencyHistogram(window=latency_window)
+
+        if http_client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=120.0,
+                ),
+                timeout=httpx.Timeout(timeout_sec, connect=10.0),
+            )
+        # Retries are handled here (with jitter), not by the SDK
+        self.async_client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=http_client,
+        )
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self.stats = {
+            'requests': 0, 'retries': 0, 'timeouts': 0, 'fallbacks': 0,
+            'hedges_fired': 0, 'hedges_won': 0, 'deadline_exceeded': 0,
+        }
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the private event loop thread on first use."""
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, daemon=True, name="DeepSeekAsyncLoop"
+                )
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry ``attempt`` (0-based)."""
+        cap = min(self.backoff_max_sec, self.backoff_base_sec * (2 ** attempt))
+        return random.uniform(0.0, cap)
+
+    async def _analyze_once(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]],
+        current_position: Optional[Dict[str, Any]],
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Single attempt on the async client."""
+        build_start = time.perf_counter()
+        messages = self._build_messages(
+            price_data, technical_data, sentiment_data, current_position,
+            timeframe_data,
+        )
+        prompt_build_ms = (time.perf_counter() - build_start) * 1000
+        prompt_tokens = estimate_message_tokens(messages)
+        self.logger.info(
+            f"📏 Prompt ~{prompt_tokens} tokens ({self.prompt_mode}), built in {prompt_build_ms:.2f}ms"
+        )
+
+        start = time.perf_counter()
+        result, decision_sec, usage, hedged = await self._hedged_completion(
+            messages, on_decision, start,
+        )
+
+        signal_data = self._process_response(result, price_data)
+        self._record_latency(signal_data, start, decision_sec)
+        signal_data['prompt_tokens_est'] = prompt_tokens
+        signal_data['prompt_build_ms'] = prompt_build_ms
+        signal_data['hedged'] = hedged
+        signal_data.update(self._token_counts(usage, messages, result))
+        self._record_decision(messages, result, signal_data, price_data)
+        return signal_data
+
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        on_decision: Optional[Callable[[Dict[str, Any]], None]],
+        start: float,
+    ) -> Tuple[str, Optional[float], Any]:
+        """
+        One request with its own timeout; its latency feeds the histogram.
+
+        Returns
+        -------
+        Tuple[str, Optional[float], Any]
+            (response text, time to decision, API usage block or None)
+        """
+        self.stats['requests'] += 1
+        request_start = time.perf_counter()
+        try:
+            if self.stream:
+                result, decision_sec = await asyncio.wait_for(
+                    self._stream_completion_async(messages, on_decision, start),
+                    timeout=self.timeout_sec,
+                )
+                completion = result, decision_sec, None
+            else:
+                response = await asyncio.wait_for(
+                    self.async_client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        stream=False,
+                        temperature=self.temperature,
+                    ),
+                    timeout=self.timeout_sec,
+                )
+                completion = response.choices[0].message.content, None, response.usage
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # Lower bound of the real latency; dropping it would bias the
+            # hedge threshold towards the fast requests
+            self.latency_histogram.record(time.perf_counter() - request_start)
+            raise
+
+        self.latency_histogram.record(time.perf_counter() - request_start)
+        return completion
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off or not warmed up."""
+        if self.hedge_quantile <= 0 or len(self.latency_histogram) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay_sec, self.latency_histogram.quantile(self.hedge_quantile))
+
+    async def _hedged_completion(
+        self,
+        messages: List[Dict[str, str]],
+        on_decision: Optional[Callable[[Dict[str, Any]], None]],
+        start: float,
+    ) -> Tuple[str, Optional[float], Any, bool]:
+        """
+        Request with an optional hedge.
+
+        Returns
+        -------
+        Tuple[str, Optional[float], Any, bool]
+            (response text, time to decision, API usage block, whether a hedge was sent)
+        """
+        delay = self._hedge_delay()
+        if delay is None:
+            return (*await self._complete(messages, on_decision, start), False)
+
+        callback = _decide_once(on_decision)
+        tasks = [asyncio.ensure_future(self._complete(messages, callback, start))]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.stats['hedges_fired'] += 1
+                self.logger.info(
+                    f"🪃 No response after {delay:.1f}s "
+                    f"(p{self.hedge_quantile * 100:.0f} latency), sending hedge request"
+                )
+                tasks.append(asyncio.ensure_future(self._complete(messages, callback, start)))
+                pending = set(tasks)
+
+            while True:
+                for task in tasks:
+                    if task.done() and task.exception() is None:
+                        if task is not tasks[0]:
+                            self.stats['hedges_won'] += 1
+                        return (*task.result(), len(tasks) > 1)
+                if not pending:
+                    raise tasks[0].exception()
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _stream_completion_async(
+        self,
+        messages: List[Dict[str, str]],
+        on_decision: Optional[Callable[[Dict[str, Any]], None]],
+        start: float,
+    ) -> Tuple[str, Optional[float]]:
+        """Async counterpart of ``_stream_completion``."""
+        stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+            temperature=self.temperature,
+        )
+
+        extractor = StreamingFieldExtractor()
+        parts = []
+        decision_sec = None
+        async for chunk in stream:
+            text = self._chunk_text(chunk)
+            if not text:
+                continue
+            parts.append(text)
+            if decision_sec is None:
+                extractor.feed(text)
+                if extractor.has('signal', 'confidence'):
+                    decision_sec = time.perf_counter() - start
+                    self._emit_decision(extractor.fields, decision_sec, on_decision)
+
+        return ''.join(parts), decision_sec
+
+    async def _analyze_on_loop(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]] = None,
+        current_position: Optional[Dict[str, Any]] = None,
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """One decision with metrics; must run on the analyzer's own event loop."""
+        start = time.perf_counter()
+        signal = await self._decide_on_loop(
+            price_data, technical_data, sentiment_data, current_position, timeframe_data,
+            _decide_once(on_decision),
+        )
+        self._record_metrics(signal, time.perf_counter() - start)
+        return signal
+
+    async def _decide_on_loop(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]],
+        current_position: Optional[Dict[str, Any]],
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]],
+        on_decision: Optional[Callable[[Dict[str, Any]], None]],
+    ) -> Dict[str, Any]:
+        """Cache/replay lookup and deadline-bounded retry loop."""
+        if self.replay_log is not None:
+            return self._replay_decision(
+                price_data, technical_data, sentiment_data, current_position, timeframe_data,
+            )
+
+        cache_key, cached = self._cache_lookup(
+            price_data, technical_data, sentiment_data, current_position,
+        )
+        if cached is not None:
+            return cached
+
+        attempts = self._attempt_loop(
+            cache_key, price_data, technical_data, sentiment_data, current_position,
+            timeframe_data, on_decision,
+        )
+        if self.decision_deadline_sec <= 0:
+            return await attempts
+
+        try:
+            return await asyncio.wait_for(attempts, timeout=self.decision_deadline_sec)
+        except asyncio.TimeoutError:
+            self.stats['deadline_exceeded'] += 1
+            self.stats['fallbacks'] += 1
+            self.logger.error(
+                f"❌ No decision within the {self.decision_deadline_sec:.1f}s deadline, using fallback"
+            )
+            return self._create_fallback_signal(price_data)
+
+    async def _attempt_loop(
+        self,
+        cache_key: Optional[str],
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]],
+        current_position: Optional[Dict[str, Any]],
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]],
+        on_decision: Optional[Callable[[Dict[str, Any]], None]],
+    ) -> Dict[str, Any]:
+        """Attempts with backoff; fallback signal once all attempts failed."""
+        for attempt in range(self.max_retries):
+            if attempt > 0:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff_delay(attempt - 1))
+
+            local_signal = self._breaker_fast_fail(price_data, technical_data)
+            if local_signal is not None:
+                return local_signal
+
+            try:
+                signal = await self._analyze_once(
+                    price_data, technical_data, sentiment_data, current_position,
+                    timeframe_data, on_decision,
+                )
+                if signal and not signal.get("is_fallback", False):
+                    self._breaker_record(signal)
+                    signal['attempts'] = attempt + 1
+                    return self._cache_store(cache_key, signal)
+
+                self._breaker_record(None, "unusable response")
+                self.logger.warning(f"⚠️ Attempt {attempt + 1} failed, retrying...")
+
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                self._breaker_record(None, "timeout")
+                self.logger.error(
+                    f"❌ Analysis attempt {attempt + 1} timed out after {self.timeout_sec:.1f}s"
+                )
+            except asyncio.CancelledError:
+                # Decision deadline hit mid-attempt
+                self._breaker_record(None, "deadline")
+                raise
+            except Exception as e:
+                self._breaker_record(None, str(e))
+                self.logger.error(f"❌ Analysis attempt {attempt + 1} failed: {e}")
+
+        self.stats['fallbacks'] += 1
+        return dict(self._create_fallback_signal(price_data), attempts=self.max_retries)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-call metrics (see DeepSeekAnalyzer) plus request/hedge counters."""
+        return dict(super().get_metrics(), requests=dict(self.stats))
+
+    async def analyze_async(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]] = None,
+        current_position: Optional[Dict[str, Any]] = None,
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Awaitable ``analyze`` (usable from any event loop).
+
+        Returns the same signal dict as ``analyze``; ``on_decision`` is called
+        from the analyzer's loop thread.
+        """
+        coro = self._analyze_on_loop(
+            price_data, technical_data, sentiment_data, current_position, timeframe_data,
+            on_decision,
+        )
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    async def analyze_many(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several instruments concurrently.
+
+        Parameters
+        ----------
+        requests : List[Dict]
+            Keyword arguments for ``analyze`` per instrument (price_data,
+            technical_data and optionally sentiment_data, current_position,
+            timeframe_data); set ``price_data['symbol']`` per instrument
+
+        Returns
+        -------
+        List[Dict]
+            Signals in request order (fallback signals for failed requests)
+        """
+        return list(await asyncio.gather(*(self.analyze_async(**request) for request in requests)))
+
+    def analyze(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]] = None,
+        current_position: Optional[Dict[str, Any]] = None,
+        timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Synchronous wrapper: run the analysis on the private loop and wait.
+
+        Safe to call from several threads at once; must not be called from a
+        coroutine (use ``analyze_async``).
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self._analyze_on_loop(
+                price_data, technical_data, sentiment_data, current_position, timeframe_data,
+                on_decision,
+            ),
+            loop,
+        )
+        return future.result()
+
+    def analyze_many_sync(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Synchronous ``analyze_many``."""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self.analyze_many(requests), loop).result()
+
+    async def _analyze_chunk_async(self, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Async counterpart of ``_analyze_chunk`` (backoff, timeout and hedging apply)."""
+        messages = self._build_batch_messages(chunk)
+        for attempt in range(self.max_retries):
+            if attempt > 0:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff_delay(attempt - 1))
+
+            local_signals = self._batch_fast_fail(chunk)
+            if local_signals is not None:
+                return local_signals
+
+            try:
+                start = time.perf_counter()
+                result, _, usage, _ = await self._hedged_completion(messages, None, start)
+                signals = self._demux_batch(result, chunk, messages, usage, start, attempt)
+                if signals is not None:
+                    return signals
+                self._breaker_record(None, "unusable batch response")
+                self.logger.warning(f"⚠️ Batch attempt {attempt + 1} failed, retrying...")
+
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                self._breaker_record(None, "timeout")
+                self.logger.error(
+                    f"❌ Batch attempt {attempt + 1} timed out after {self.timeout_sec:.1f}s"
+                )
+            except Exception as e:
+                self._breaker_record(None, str(e))
+                self.logger.error(f"❌ Batch attempt {attempt + 1} failed: {e}")
+
+        self.stats['fallbacks'] += 1
+        return [
+            dict(self._create_fallback_signal(request['price_data']), attempts=self.max_retries)
+            for request in chunk
+        ]
+
+    async def _analyze_batch_on_loop(
+        self,
+        requests: List[Dict[str, Any]],
+        chunk_size: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        async def run(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            start = time.perf_counter()
+            signals = await self._analyze_chunk_async(chunk)
+            for signal in signals:
+                self._record_metrics(signal, time.perf_counter() - start)
+            return signals
+
+        chunks = self._batch_chunks(requests, chunk_size)
+        results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        return [signal for signals in results for signal in signals]
+
+    async def analyze_batch_async(
+        self,
+        requests: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Awaitable ``analyze_batch``; chunks are requested concurrently.
+
+        See ``DeepSeekAnalyzer.analyze_batch`` for parameters and results.
+        """
+        coro = self._analyze_batch_on_loop(requests, chunk_size)
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def analyze_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Synchronous ``analyze_batch_async`` (must not be called from a coroutine)."""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(
+            self._analyze_batch_on_loop(requests, chunk_size), loop,
+        ).result()
+
+    def close(self):
+        """Close the connection pool, cache and decision logs, and stop the private loop."""
+        for resource in (self.cache, self.record_log, self.replay_log):
+            if resource is not None:
+                resource.close()
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.async_client.close(), loop).result(timeout=5)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to close DeepSeek client: {e}")
+        loop.call_soon_threadsafe(loop.stop)
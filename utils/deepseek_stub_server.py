@@ -0,0 +1,344 @@
+"""
+Local DeepSeek Stand-in Server
+
+OpenAI-compatible ``/chat/completions`` endpoint for offline and load testing
+of DeepSeekAnalyzer: configurable latency distribution, error rate,
+malformed-response rate and scripted signal sequences. Deterministic for a
+given seed and request order.
+
+Usage:
+    python -m utils.deepseek_stub_server --port 8787 --latency-ms 400 --error-rate 0.05
+    DEEPSEEK_BASE_URL=http://127.0.0.1:8787 python main_live.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+MALFORMED_KINDS = ("truncated", "unescaped_quotes", "prose", "missing_fields")
+
+_PRICE_PATTERNS = (
+    re.compile(r"Current Price: \$([\d,]+\.?\d*)"),
+    re.compile(r"price,high,low,vol,chg\n([\d.]+)"),
+)
+
+
+class DeepSeekStubServer:
+    """
+    Threaded HTTP server answering chat completions with synthetic signals.
+
+    Example
+    -------
+    >>> with DeepSeekStubServer(signals=["BUY", "HOLD"], latency_ms=50) as stub:
+    ...     analyzer = DeepSeekAnalyzer(api_key="stub", base_url=stub.base_url)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        latency_spread_ms: float = 0.0,
+        latency_dist: str = "fixed",
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (500, 502, 503, 429),
+        malformed_rate: float = 0.0,
+        malformed_kinds: Sequence[str] = MALFORMED_KINDS,
+        signals: Optional[Sequence[Union[str, Dict[str, Any]]]] = None,
+        seed: Optional[int] = 0,
+        chunk_size: int = 16,
+    ):
+        """
+        Initialize stub server (call ``start`` or use as a context manager).
+
+        Parameters
+        ----------
+        host : str
+            Bind address
+        port : int
+            Bind port (0 = pick a free port)
+        latency_ms : float
+            Mean response latency
+        latency_spread_ms : float
+            Half-width (uniform), standard deviation (normal) or log-space sigma
+            in ms of ``latency_ms`` (lognormal)
+        latency_dist : str
+            One of "fixed", "uniform", "normal", "lognormal"
+        error_rate : float
+            Fraction of requests answered with an HTTP error
+        error_statuses : Sequence[int]
+            HTTP statuses used for errors (cycled)
+        malformed_rate : float
+            Fraction of successful responses whose content is not a valid signal
+        malformed_kinds : Sequence[str]
+            Malformation kinds to draw from (see MALFORMED_KINDS)
+        signals : Sequence[str or Dict], optional
+            Scripted responses, cycled in request order. A string is a signal
+            ("BUY"/"SELL"/"HOLD"); a dict overrides response fields.
+            Default: always HOLD
+        seed : int, optional
+            Seed for latency/error/malformation draws (None = nondeterministic)
+        chunk_size : int
+            Characters per SSE chunk for streamed responses
+        """
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_dist}")
+        unknown = set(malformed_kinds) - set(MALFORMED_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown malformed kinds: {sorted(unknown)}")
+
+        self.latency_ms = latency_ms
+        self.latency_spread_ms = latency_spread_ms
+        self.latency_dist = latency_dist
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.malformed_rate = malformed_rate
+        self.malformed_kinds = tuple(malformed_kinds)
+        self.signals: List[Union[str, Dict[str, Any]]] = list(signals or ["HOLD"])
+        self.chunk_size = chunk_size
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._index = 0
+        self.stats: Dict[str, int] = {'requests': 0, 'errors': 0, 'malformed': 0, 'streamed': 0}
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Value for DeepSeekAnalyzer(base_url=...)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "DeepSeekStubServer":
+        """Serve in a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, daemon=True, name="DeepSeekStubServer"
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "DeepSeekStubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _plan(self) -> Tuple[float, Optional[int], Optional[str], Union[str, Dict[str, Any]]]:
+        """Draw (latency sec, error status, malformed kind, scripted signal) for the next request."""
+        with self._lock:
+            self.stats['requests'] += 1
+            scripted = self.signals[self._index % len(self.signals)]
+            self._index += 1
+
+            rng = self._random
+            if self.latency_dist == "fixed":
+                latency = self.latency_ms
+            elif self.latency_dist == "uniform":
+                latency = rng.uniform(self.latency_ms - self.latency_spread_ms, self.latency_ms + self.latency_spread_ms)
+            elif self.latency_dist == "normal":
+                latency = rng.gauss(self.latency_ms, self.latency_spread_ms)
+            else:
+                sigma = self.latency_spread_ms / self.latency_ms if self.latency_ms > 0 else 0.0
+                latency = self.latency_ms * rng.lognormvariate(-sigma * sigma / 2, sigma)
+
+            status = None
+            if rng.random() < self.error_rate:
+                status = self.error_statuses[self.stats['errors'] % len(self.error_statuses)]
+                self.stats['errors'] += 1
+
+            malformed = None
+            if status is None and rng.random() < self.malformed_rate:
+                malformed = rng.choice(self.malformed_kinds)
+                self.stats['malformed'] += 1
+
+        return max(latency, 0.0) / 1000, status, malformed, scripted
+
+    @staticmethod
+    def _extract_price(messages: List[Dict[str, Any]]) -> float:
+        """Current price from a full or compact analysis prompt (0 if absent)."""
+        for message in reversed(messages):
+            content = message.get('content') or ''
+            for pattern in _PRICE_PATTERNS:
+                match = pattern.search(content)
+                if match:
+                    return float(match.group(1).replace(',', ''))
+        return 0.0
+
+    @staticmethod
+    def build_signal(scripted: Union[str, Dict[str, Any]], price: float) -> Dict[str, Any]:
+        """Response JSON for a scripted signal at ``price``."""
+        overrides = {'signal': scripted} if isinstance(scripted, str) else dict(scripted)
+        signal = overrides.get('signal', 'HOLD')
+        stop_loss, take_profit = {
+            'BUY': (price * 0.99, price * 1.02),
+            'SELL': (price * 1.01, price * 0.98),
+        }.get(signal, (price, price))
+
+        response = {
+            'signal': signal,
+            'confidence': 'MEDIUM',
+            'reason': f"Stub response ({signal})",
+            'stop_loss': round(stop_loss, 2),
+            'take_profit': round(take_profit, 2),
+            'trend_strength': 'MODERATE',
+            'risk_assessment': 'MEDIUM',
+        }
+        response.update(overrides)
+        return response
+
+    @staticmethod
+    def malform(signal: Dict[str, Any], kind: str) -> str:
+        """Render ``signal`` as a broken response of the given kind."""
+        text = json.dumps(signal, indent=4)
+        if kind == "truncated":
+            return text[: max(1, len(text) // 2)]
+        if kind == "unescaped_quotes":
+            return text.replace(signal['reason'], f'Price "broke" out, {signal["reason"]}', 1)
+        if kind == "prose":
+            return f"Here is my analysis:\n```json\n{text}\n```\nTrade carefully."
+        # missing_fields
+        return json.dumps({'signal': signal['signal'], 'confidence': signal['confidence']})
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict[str, Any]):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {'error': {'message': 'invalid JSON body'}})
+                    return
+
+                if not self.path.rstrip('/').endswith("/chat/completions"):
+                    self._send_json(404, {'error': {'message': f'unknown path {self.path}'}})
+                    return
+
+                latency, status, malformed, scripted = stub._plan()
+                time.sleep(latency)
+
+                if status is not None:
+                    self._send_json(status, {'error': {'message': 'stub error', 'type': 'server_error'}})
+                    return
+
+                signal = stub.build_signal(scripted, stub._extract_price(request.get('messages', [])))
+                content = stub.malform(signal, malformed) if malformed else json.dumps(signal, indent=4)
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                model = request.get('model', 'deepseek-chat')
+
+                if request.get('stream'):
+                    with stub._lock:
+                        stub.stats['streamed'] += 1
+                    self._stream(completion_id, model, content)
+                    return
+
+                self._send_json(200, {
+                    'id': completion_id,
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': content},
+                        'finish_reason': 'stop',
+                    }],
+                    'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+                })
+
+            def _stream(self, completion_id: str, model: str, content: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                pieces = [content[i:i + stub.chunk_size] for i in range(0, len(content), stub.chunk_size)]
+                for i, piece in enumerate(pieces + [None]):
+                    chunk = {
+                        'id': completion_id,
+                        'object': 'chat.completion.chunk',
+                        'created': int(time.time()),
+                        'model': model,
+                        'choices': [{
+                            'index': 0,
+                            'delta': {'content': piece} if piece is not None else {},
+                            'finish_reason': None if piece is not None else 'stop',
+                        }],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+def main():
+    """Run the stub server from the command line."""
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible DeepSeek stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-spread-ms", type=float, default=0.0)
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--signals", default="HOLD", help="Comma-separated signal script, e.g. BUY,HOLD,SELL")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = DeepSeekStubServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        latency_spread_ms=args.latency_spread_ms,
+        latency_dist=args.latency_dist,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        signals=[s.strip().upper() for s in args.signals.split(',') if s.strip()],
+        seed=args.seed,
+    )
+    print(f"🧪 DeepSeek stub listening on {stub.base_url} (Ctrl+C to stop)")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+        print(f"📊 Stats: {stub.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Tolerant JSON Parsing for Model Responses
+
+Single-pass parser for the trading-signal response object. Valid JSON takes
+the ``json.loads`` fast path; anything else is scanned once, repairing the
+mistakes models actually make (code fences, prose around the object,
+unescaped quotes inside strings, raw newlines, trailing commas, numbers as
+strings, truncated output), and reports which repairs were applied.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+SIGNAL_NUMERIC_FIELDS = ("stop_loss", "take_profit")
+SIGNAL_ENUM_FIELDS = ("signal", "confidence", "trend_strength", "risk_assessment")
+
+# One object member. A double quote inside a string value only ends the string
+# when followed by the end of the member (",\s*"key":", "}" or end of input);
+# otherwise it is an unescaped quote belonging to the value.
+_MEMBER = re.compile(r"""
+    (?:"(?P<key>[A-Za-z_][A-Za-z0-9_]*)"|(?P<bare>[A-Za-z_][A-Za-z0-9_]*))\s*:\s*
+    (?:
+        "(?P<str>[^"\\]*(?:(?:\\.|"(?!\s*(?:,\s*(?:"[A-Za-z_][A-Za-z0-9_]*"\s*:|\}|\Z)|[}\]]|\Z)))[^"\\]*)*)"
+      | (?P<num>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)(?=\s*[,}\]]|\s*\Z)
+      | (?P<lit>true|false|null)\b
+      | (?P<nested>[\[{])
+      | (?P<token>[^,}\n]+?)(?=\s*[,}\n])
+    )""", re.VERBOSE)
+_GAP = re.compile(r"[ \t\r\n,]*")
+_CONTROL = re.compile(r"[\x00-\x1f]")
+_LITERALS = {'true': True, 'false': False, 'null': None}
+_RAW_DECODER = json.JSONDecoder()
+
+
+def _decode_string(raw: str, repairs: List[str]) -> str:
+    """Decode a string body matched by ``_MEMBER`` (may hold unescaped quotes/control chars)."""
+    if '"' in raw.replace('\\"', ''):
+        repairs.append("unescaped_quotes")
+        # Escaped quotes stay quotes; unescaped ones become single quotes
+        raw = '\\"'.join(part.replace('"', "'") for part in raw.split('\\"'))
+    if '\\' not in raw:
+        if _CONTROL.search(raw):
+            repairs.append("control_chars")
+        return raw
+    try:
+        return json.loads(f'"{raw}"', strict=False)
+    except ValueError:
+        repairs.append("invalid_escape")
+        return raw
+
+
+def _parse_members(text: str, pos: int, repairs: List[str]) -> Tuple[Dict[str, Any], int]:
+    """
+    Parse object members from ``pos`` (just after the opening brace).
+
+    Returns
+    -------
+    Tuple[Dict, int]
+        (members, position after the closing brace or where parsing stopped)
+    """
+    result: Dict[str, Any] = {}
+    end = len(text)
+    while True:
+        # Between members only whitespace and a comma are expected
+        gap_end = _GAP.match(text, pos).end()
+        if gap_end >= end:
+            repairs.append("truncated")
+            return result, end
+        if text[gap_end] == '}':
+            if ',' in text[pos:gap_end]:
+                repairs.append("trailing_comma")
+            return result, gap_end + 1
+
+        match = _MEMBER.match(text, gap_end)
+        if match is None:
+            repairs.append("truncated")
+            return result, gap_end
+
+        key = match.group('key')
+        if key is None:
+            key = match.group('bare')
+            repairs.append("unquoted_key")
+
+        kind = match.lastgroup
+        pos = match.end()
+        if kind == 'str':
+            value = _decode_string(match.group('str'), repairs)
+        elif kind == 'num':
+            number = match.group('num')
+            value = int(number) if number.lstrip('-').isdigit() else float(number)
+        elif kind == 'lit':
+            value = _LITERALS[match.group('lit')]
+        elif kind == 'nested':
+            try:
+                value, pos = _RAW_DECODER.raw_decode(text, match.start('nested'))
+            except ValueError:
+                repairs.append("truncated")
+                return result, match.start('nested')
+        else:
+            repairs.append("bare_value")
+            value = match.group('token').strip()
+        result[key] = value
+
+
+def _coerce_schema(data: Dict[str, Any], repairs: List[str]):
+    """Normalize known signal fields (numeric strings, enum case/whitespace)."""
+    for field in SIGNAL_NUMERIC_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str):
+            try:
+                data[field] = float(value.replace(',', '').replace('$', '').strip())
+                repairs.append("numeric_string")
+            except ValueError:
+                pass
+    for field in SIGNAL_ENUM_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str):
+            normalized = value.strip().upper()
+            if normalized != value:
+                data[field] = normalized
+                repairs.append("enum_case")
+
+
+def parse_signal_json(text: str) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Parse a model response into the signal dict.
+
+    Returns
+    -------
+    Tuple[Optional[Dict], List[str]]
+        (parsed object or None, names of applied repairs; empty for clean JSON)
+    """
+    repairs: List[str] = []
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            _coerce_schema(data, repairs)
+            return data, repairs
+    except ValueError:
+        pass
+
+    start = text.find('{')
+    if start < 0:
+        return None, ["no_object"]
+    if start > 0 and text[:start].strip():
+        repairs.append("code_fence" if "```" in text[:start] else "leading_text")
+
+    # Valid object wrapped in a fence or prose: still decoded at C speed
+    end = text.rfind('}') + 1
+    if end > start:
+        try:
+            data = json.loads(text[start:end])
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            if text[end:].strip(" \t\r\n`"):
+                repairs.append("trailing_text")
+            _coerce_schema(data, repairs)
+            return data, repairs
+
+    data, end = _parse_members(text, start + 1, repairs)
+    if "truncated" not in repairs and text[end:].strip(" \t\r\n`"):
+        repairs.append("trailing_text")
+    if not data:
+        return None, repairs
+
+    _coerce_schema(data, repairs)
+    return data, repairs
+
+
+def parse_signal_array(text: str) -> Tuple[Optional[List[Dict[str, Any]]], List[str]]:
+    """
+    Parse a batch response (JSON array of signal objects).
+
+    Tolerates the same mistakes as ``parse_signal_json``; a wrapper object
+    (``{"signals": [...]}``) or a single object are accepted too.
+
+    Returns
+    -------
+    Tuple[Optional[List[Dict]], List[str]]
+        (signal objects in response order or None, names of applied repairs)
+    """
+    repairs: List[str] = []
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+
+    if data is None:
+        start = text.find('[')
+        if start > 0 and text[:start].strip():
+            repairs.append("code_fence" if "```" in text[:start] else "leading_text")
+        end = text.rfind(']') + 1
+        if 0 <= start < end:
+            try:
+                data = json.loads(text[start:end])
+            except ValueError:
+                data = None
+            if data is not None and text[end:].strip(" \t\r\n`"):
+                repairs.append("trailing_text")
+
+    if isinstance(data, dict):
+        wrapped = next((value for value in data.values() if isinstance(value, list)), None)
+        if wrapped is not None:
+            repairs.append("wrapped_array")
+            data = wrapped
+        else:
+            repairs.append("single_object")
+            data = [data]
+
+    if data is None:
+        # Object-by-object scan (unescaped quotes, truncation, ...)
+        repairs = []
+        data = []
+        pos = text.find('{')
+        while pos >= 0:
+            item, end = _parse_members(text, pos + 1, repairs)
+            if item:
+                data.append(item)
+            pos = text.find('{', end)
+        if not data:
+            return None, repairs or ["no_object"]
+
+    items = [item for item in data if isinstance(item, dict)]
+    if len(items) != len(data):
+        repairs.append("non_object_items")
+    for item in items:
+        _coerce_schema(item, repairs)
+    return items, list(dict.fromkeys(repairs))
@@ -0,0 +1,126 @@
+"""
+Incremental JSON Field Extraction for Streamed LLM Responses
+
+Lets the analyzer act on ``signal``/``confidence`` as soon as they are
+complete in a streamed completion, without waiting for the rest (typically a
+long ``reason`` string).
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+
+class StreamingFieldExtractor:
+    """
+    Extracts completed top-level scalar fields from a JSON object fed in chunks.
+
+    Text before the first ``{`` (e.g. a Markdown fence) is ignored. Nested
+    objects/arrays are skipped. Each character is examined once, so feeding a
+    response chunk by chunk costs the same as scanning it whole.
+
+    Example
+    -------
+    >>> extractor = StreamingFieldExtractor()
+    >>> extractor.feed('{"signal": "BUY", "confi')
+    {'signal': 'BUY'}
+    >>> extractor.feed('dence": "HIGH", "reason": "...')
+    {'confidence': 'HIGH'}
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._token: List[str] = []
+        self._expect_key = True
+        self._key: Optional[str] = None
+        self._scalar: List[str] = []
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """
+        Consume the next piece of the response.
+
+        Returns
+        -------
+        Dict
+            Fields completed by this chunk
+        """
+        completed: Dict[str, Any] = {}
+        for ch in chunk:
+            if self.done:
+                break
+
+            if not self._started:
+                if ch == '{':
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._end_string(completed)
+                    continue
+                if self._depth == 1:
+                    self._token.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._token = []
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                if self._depth == 1:
+                    self._end_scalar(completed)
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+            elif self._depth != 1:
+                continue
+            elif ch == ':':
+                self._expect_key = False
+            elif ch == ',':
+                self._end_scalar(completed)
+                self._expect_key = True
+                self._key = None
+            elif not ch.isspace() and not self._expect_key:
+                self._scalar.append(ch)
+
+        return completed
+
+    def _end_string(self, completed: Dict[str, Any]):
+        raw = ''.join(self._token)
+        try:
+            text = json.loads(f'"{raw}"')
+        except ValueError:
+            text = raw
+        if self._expect_key:
+            self._key = text
+        elif self._key is not None:
+            self.fields[self._key] = completed[self._key] = text
+
+    def _end_scalar(self, completed: Dict[str, Any]):
+        if not self._scalar:
+            return
+        raw = ''.join(self._scalar)
+        self._scalar = []
+        if self._key is None:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        self.fields[self._key] = completed[self._key] = value
+
+    def has(self, *names: str) -> bool:
+        """True once all given fields are complete."""
+        return all(name in self.fields for name in names)
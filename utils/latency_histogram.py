@@ -0,0 +1,103 @@
+"""
+Rolling Latency Histogram
+
+Fixed-memory histogram over the last N samples with log-spaced (HDR-style)
+buckets: every bucket spans ``growth`` times the previous one, so quantiles
+are accurate to a constant relative error at any latency scale.
+"""
+
+import math
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+
+class LatencyHistogram:
+    """
+    Quantiles over a rolling window of latency samples (seconds).
+
+    Memory is fixed: one counter per bucket plus the bucket index of each
+    sample in the window (to expire the oldest one).
+    """
+
+    def __init__(
+        self,
+        window: int = 256,
+        min_value: float = 0.001,
+        max_value: float = 600.0,
+        growth: float = 1.05,
+    ):
+        """
+        Initialize histogram.
+
+        Parameters
+        ----------
+        window : int
+            Number of most recent samples kept
+        min_value : float
+            Upper bound of the first bucket; smaller samples land in it
+        max_value : float
+            Samples above this land in the last bucket
+        growth : float
+            Bucket width ratio (1.05 = quantiles within ~5%)
+        """
+        if window <= 0:
+            raise ValueError("window must be positive")
+        if not 0 < min_value < max_value or growth <= 1.0:
+            raise ValueError("invalid bucket layout")
+
+        self.window = window
+        self.min_value = min_value
+        self._log_growth = math.log(growth)
+        bucket_count = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 1
+        self._bounds: List[float] = [min_value * growth ** i for i in range(bucket_count)]
+        self._counts: List[int] = [0] * bucket_count
+        self._samples: Deque[int] = deque()
+        self.total = 0  # samples ever recorded
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def _bucket(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int(math.ceil(math.log(value / self.min_value) / self._log_growth))
+        return min(index, len(self._counts) - 1)
+
+    def record(self, value: float):
+        """Add a sample, expiring the oldest once the window is full."""
+        bucket = self._bucket(value)
+        if len(self._samples) == self.window:
+            self._counts[self._samples.popleft()] -= 1
+        self._samples.append(bucket)
+        self._counts[bucket] += 1
+        self.total += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Value at quantile ``q`` (0-1) of the window, or None if empty.
+
+        Returns the upper bound of the bucket holding the quantile.
+        """
+        count = len(self._samples)
+        if count == 0:
+            return None
+        rank = max(1, int(math.ceil(q * count)))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self._bounds[index]
+        return self._bounds[-1]
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 of the window."""
+        return {
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+    def clear(self):
+        """Drop all samples."""
+        self._counts = [0] * len(self._counts)
+        self._samples.clear()
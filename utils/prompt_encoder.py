@@ -0,0 +1,247 @@
+"""
+Compact Prompt Encoding for DeepSeek Analyzer
+
+The strategy framework is a static system prompt (identical on every call, so
+the provider can cache the prefix); market data goes into a short user message
+as dense CSV/JSON tables. The response schema is the same as in the full
+prompt.
+"""
+
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+_COMPACT_ROLE = "You are an algorithmic trading system for Binance USDT-M perpetual futures on 15-minute K-lines."
+
+_COMPACT_INPUT = "header, K-lines CSV oldest->newest (chg/body in %), indicators JSON (rsi 0-100, bb_pos 0-1, vol_ratio x average), optional higher-timeframe CSV, sentiment, position, previous signal."
+
+_COMPACT_RULES = """Weights: technicals 60% (MA alignment, S/R, candle patterns), sentiment 30% (aligned: +1 confidence level; divergent: follow technicals; missing: ignore), risk 10% (position P&L, stops 1-2%, sizing).
+
+BUY (>=2): price>SMA5>SMA20>SMA50; break above resistance on volume; RSI recovering <40 or 40-60 momentum; MACD bullish cross/positive histogram; bullish pattern; positive sentiment.
+SELL (>=2): price<SMA5<SMA20<SMA50; break below support on volume; RSI falling from >60 or strong bearish momentum; MACD bearish cross/negative histogram; bearish pattern; negative sentiment.
+HOLD: range-bound, mixed signals, unconfirmed reversal, low volume indecision.
+
+Confidence: HIGH = 3+ indicators align, clear trend, strong volume; MEDIUM = 2 align, some conflict; LOW = 1 indicator, mixed, low volume or sentiment contradicts.
+
+Anti-overtrading: no reversal on one candle (need 2-3 confirming bars); keep direction unless clear reversal; when in doubt HOLD; high confidence needs volume. RSI >70/<30 = strong momentum, be cautious; respect MACD crossovers.
+
+Risk: BUY stop 1-2% below entry or below support, SELL stop 1-2% above entry or above resistance; tighter in volatility. TP: HIGH 2-3%, MEDIUM 1.5-2%, LOW 1% or HOLD. HOLD: stop_loss = take_profit = current price. With a position: trend continues -> keep direction; reverses -> opposite signal; unrealized loss >2% -> consider cutting."""
+
+_SIGNAL_FIELDS = '"signal":"BUY|SELL|HOLD","confidence":"HIGH|MEDIUM|LOW","reason":"trend, indicators, S/R, volume, risk, why now","stop_loss":<price>,"take_profit":<price>,"trend_strength":"STRONG|MODERATE|WEAK","risk_assessment":"LOW|MEDIUM|HIGH"'
+
+COMPACT_SYSTEM_PROMPT = (
+    f"{_COMPACT_ROLE} Return ONLY a JSON object.\n\n"
+    f"Input (user message): {_COMPACT_INPUT}\n\n"
+    f"{_COMPACT_RULES}\n\n"
+    "Output JSON (no double quotes inside strings; use single quotes or parentheses):\n"
+    f"{{{_SIGNAL_FIELDS}}}"
+)
+
+QUOTE_ASSETS = ("USDT", "USDC", "BUSD", "USD")
+
+
+def split_symbol(symbol: str) -> Tuple[str, str]:
+    """Split an exchange symbol into (base, quote) asset, e.g. ETHUSDC -> (ETH, USDC)."""
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    return symbol, "USDT"
+
+
+# Several instruments per request: same rules, one section per symbol, JSON array out
+COMPACT_BATCH_SYSTEM_PROMPT = (
+    f"{_COMPACT_ROLE} Return ONLY a JSON array with one object per symbol section, in input order.\n\n"
+    f"Input (user message): one section per symbol starting with '### <symbol>'; each section has {_COMPACT_INPUT} "
+    "Judge every symbol on its own data.\n\n"
+    f"{_COMPACT_RULES}\n\n"
+    "Output JSON array (no double quotes inside strings; use single quotes or parentheses):\n"
+    f'[{{"symbol":"<symbol>",{_SIGNAL_FIELDS}}}, ...]'
+)
+
+_INDICATOR_KEYS = (
+    'ema_12', 'ema_26', 'rsi_pct', 'macd', 'macd_signal', 'macd_histogram', 'macd_trend',
+    'bb_upper', 'bb_middle', 'bb_lower', 'bb_position', 'volume_ratio', 'support', 'resistance',
+    'short_term_trend', 'medium_term_trend', 'overall_trend',
+)
+
+_INDICATOR_ALIASES = {
+    'rsi_pct': 'rsi',
+    'macd_signal': 'macd_sig',
+    'macd_histogram': 'macd_hist',
+    'bb_position': 'bb_pos',
+    'volume_ratio': 'vol_ratio',
+    'short_term_trend': 'trend_short',
+    'medium_term_trend': 'trend_medium',
+    'overall_trend': 'trend',
+}
+
+
+def compact_number(value: Any) -> Any:
+    """Round a number for the prompt: 2 decimals >= 1, 4 significant digits below."""
+    if value is None:
+        return None
+    if not isinstance(value, (int, float)):
+        return value
+    value = float(value)
+    if not math.isfinite(value):
+        return None
+    if abs(value) >= 1:
+        rounded = round(value, 2)
+    else:
+        rounded = float(f"{value:.4g}")
+    return int(rounded) if rounded == int(rounded) else rounded
+
+
+KLINE_CSV_HEADER = "o,h,l,c,v,chg,body"
+
+
+def encode_kline_row(o: float, h: float, l: float, c: float, v: float) -> str:
+    """Encode one K-line as a CSV row (o,h,l,c,v,chg%,body%)."""
+    total_range = h - l
+    return ",".join(str(compact_number(value)) for value in (
+        o, h, l, c, v,
+        (c - o) / o * 100 if o else 0.0,
+        abs(c - o) / total_range * 100 if total_range > 0 else 0.0,
+    ))
+
+
+def encode_klines(kline_data: List[Dict[str, Any]], count: int = 10) -> str:
+    """Encode K-lines as CSV (o,h,l,c,v,chg%,body%)."""
+    if not kline_data:
+        return "klines: none"
+
+    rows = [KLINE_CSV_HEADER]
+    for kline in kline_data[-count:]:
+        rows.append(encode_kline_row(
+            kline['open'], kline['high'], kline['low'], kline['close'], kline['volume'],
+        ))
+    return "\n".join(rows)
+
+
+def encode_indicators(technical_data: Dict[str, Any]) -> str:
+    """Encode indicators as compact JSON (SMAs first, RSI on a 0-100 scale)."""
+    indicators: Dict[str, Any] = {}
+    sma_keys = sorted(
+        (key for key in technical_data if key.startswith('sma_')),
+        key=lambda key: int(key.split('_')[1]),
+    )
+    for key in sma_keys:
+        indicators[key] = compact_number(technical_data[key])
+
+    for key in _INDICATOR_KEYS:
+        if key not in technical_data:
+            continue
+        indicators[_INDICATOR_ALIASES.get(key, key)] = compact_number(technical_data[key])
+
+    return json.dumps(indicators, ensure_ascii=False, separators=(',', ':'))
+
+
+def encode_timeframes(timeframe_data: Optional[Dict[str, Dict[str, Any]]]) -> str:
+    """Encode higher-timeframe summaries as CSV."""
+    if not timeframe_data:
+        return ""
+
+    rows = ["tf,trend,short,medium,rsi,macd_hist,macd_trend,bb_pos,support,resistance"]
+    for timeframe, data in timeframe_data.items():
+        rows.append(",".join(str(v) for v in (
+            timeframe,
+            data.get('overall_trend', ''),
+            data.get('short_term_trend', ''),
+            data.get('medium_term_trend', ''),
+            compact_number(data.get('rsi_pct')),
+            compact_number(data.get('macd_histogram')),
+            data.get('macd_trend', ''),
+            compact_number(data.get('bb_position')),
+            compact_number(data.get('support')),
+            compact_number(data.get('resistance')),
+        )))
+    return "\n".join(rows)
+
+
+def build_compact_prompt(
+    price_data: Dict[str, Any],
+    technical_data: Dict[str, Any],
+    sentiment_data: Optional[Dict[str, Any]],
+    current_position: Optional[Dict[str, Any]],
+    timeframe_data: Optional[Dict[str, Dict[str, Any]]] = None,
+    previous_signal: Optional[Dict[str, Any]] = None,
+    symbol: str = "BTCUSDT",
+) -> str:
+    """
+    Build the compact user message for one analysis.
+
+    Returns
+    -------
+    str
+        Market data only; the framework lives in ``COMPACT_SYSTEM_PROMPT``
+    """
+    lines = [
+        f"{symbol} 15m {price_data.get('timestamp', '')}",
+        "price,high,low,vol,chg",
+        ",".join(str(compact_number(v)) for v in (
+            price_data['price'],
+            price_data.get('high', 0),
+            price_data.get('low', 0),
+            price_data.get('volume', 0),
+            price_data.get('price_change', 0),
+        )),
+        "klines:",
+        price_data['kline_text'] if price_data.get('kline_format') == "compact"
+        else encode_klines(price_data.get('kline_data', [])),
+        f"ind:{encode_indicators(technical_data)}",
+    ]
+
+    timeframe_text = encode_timeframes(timeframe_data)
+    if timeframe_text:
+        lines += ["htf:", timeframe_text]
+
+    if sentiment_data:
+        lines.append(
+            f"sent:bull={compact_number(sentiment_data['positive_ratio'])},"
+            f"bear={compact_number(sentiment_data['negative_ratio'])},"
+            f"net={compact_number(sentiment_data['net_sentiment'])}"
+        )
+    else:
+        lines.append("sent:none")
+
+    if current_position:
+        lines.append(
+            f"pos:{current_position['side']},qty={compact_number(current_position.get('quantity', 0))},"
+            f"avg={compact_number(current_position.get('avg_px', 0))},"
+            f"pnl={compact_number(current_position.get('unrealized_pnl', 0))}"
+        )
+    else:
+        lines.append("pos:none")
+
+    if previous_signal:
+        lines.append(f"prev:{previous_signal.get('signal', 'N/A')},{previous_signal.get('confidence', 'N/A')}")
+
+    return "\n".join(lines)
+
+
+def build_compact_batch_prompt(sections: List[Tuple[str, str]]) -> str:
+    """
+    Join per-symbol compact prompts into one batch user message.
+
+    Parameters
+    ----------
+    sections : List[Tuple[str, str]]
+        (symbol, ``build_compact_prompt`` output) per instrument, in the order
+        the signals are expected back
+    """
+    return "\n\n".join(f"### {symbol}\n{prompt}" for symbol, prompt in sections)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate: ~4 ASCII characters per token, one per other character.
+
+    Good enough to compare prompt variants; not an exact tokenizer count.
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Token estimate of a chat request (content plus ~4 tokens per message)."""
+    return sum(estimate_tokens(message['content']) + 4 for message in messages)
@@ -0,0 +1,307 @@
+"""
+Prompt Rendering for DeepSeek Analyzer
+
+Precompiled prompt fragments and an incremental K-line renderer: each closed
+bar is rendered into its prompt line once, so building a prompt only joins
+ready-made lines no matter how many K-lines are sent.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .prompt_encoder import KLINE_CSV_HEADER, encode_kline_row
+
+# Dynamic part of the full prompt (str.format template)
+FULL_PROMPT_HEADER = """
+═══════════════════════════════════════════════════════════════
+  {base_asset}/{quote_asset} FUTURES - 15-MINUTE TIMEFRAME ANALYSIS
+═══════════════════════════════════════════════════════════════
+
+【MARKET CONTEXT - REAL-TIME DATA】
+
+{kline_text}
+
+{technical_text}
+{timeframe_text}
+{sentiment_text}
+
+{signal_text}
+
+【CURRENT MARKET STATE】
+├─ Current Price: ${price:,.2f}
+├─ Time: {timestamp}
+├─ Period High: ${high:,.2f}
+├─ Period Low: ${low:,.2f}
+├─ Volume: {volume:.2f} {base_asset}
+├─ Price Change: {price_change:+.2f}%
+└─ Current Position: {position_text}
+
+【CRITICAL TECHNICAL STATUS】
+├─ Overall Trend: {overall_trend}
+├─ Short-term Trend: {short_term_trend}
+├─ RSI: {rsi:.1f} ({rsi_label})
+└─ MACD Direction: {macd_trend}
+
+"""
+
+# Static part of the full prompt: strategy framework and output requirements
+FULL_PROMPT_FRAMEWORK = """═══════════════════════════════════════════════════════════════
+  TRADING STRATEGY FRAMEWORK - MUST FOLLOW
+═══════════════════════════════════════════════════════════════
+
+【1. DECISION HIERARCHY (Weight Distribution)】
+
+Primary Layer (60% weight) - TECHNICAL ANALYSIS:
+├─ Trend Direction (MA alignment, price action)
+│  ├─ Strong uptrend: Price > SMA5 > SMA20 > SMA50 → BUY bias
+│  ├─ Strong downtrend: Price < SMA5 < SMA20 < SMA50 → SELL bias
+│  └─ Mixed/consolidation: No clear trend → HOLD/Cautious
+├─ Support/Resistance Levels
+│  ├─ Price near resistance with volume → Potential reversal SELL
+│  ├─ Price near support with volume → Potential bounce BUY
+│  └─ Price breaking key levels with volume → Strong signal
+└─ K-line Patterns & Candlestick Formations
+   ├─ Bullish patterns (hammer, engulfing, etc.) → BUY signal
+   ├─ Bearish patterns (shooting star, dark cloud, etc.) → SELL signal
+   └─ Doji/indecision → Wait for confirmation
+
+Secondary Layer (30% weight) - MARKET SENTIMENT:
+├─ Sentiment aligns with technical → Enhance confidence by 1 level
+├─ Sentiment diverges from technical → Follow technical, sentiment as warning
+└─ Sentiment data unavailable/delayed → Ignore, focus on technical
+
+Tertiary Layer (10% weight) - RISK MANAGEMENT:
+├─ Current position P&L status
+├─ Stop-loss placement (should be 1-2% from entry)
+└─ Position sizing constraints
+
+【2. SIGNAL GENERATION LOGIC - STRICT RULES】
+
+BUY Signal Conditions (Require at least 2 of 3):
+├─ ✅ Strong uptrend confirmed by MA alignment
+├─ ✅ Price breaks above resistance with volume surge
+├─ ✅ RSI recovering from oversold (< 40) or healthy momentum (40-60)
+├─ ✅ MACD bullish crossover or positive histogram
+├─ ✅ Bullish K-line pattern (hammer, bullish engulfing, etc.)
+└─ ✅ Sentiment positive (if available, adds confidence)
+
+SELL Signal Conditions (Require at least 2 of 3):
+├─ ✅ Strong downtrend confirmed by MA alignment
+├─ ✅ Price breaks below support with volume surge
+├─ ✅ RSI declining from overbought (> 60) or strong bearish momentum
+├─ ✅ MACD bearish crossover or negative histogram
+├─ ✅ Bearish K-line pattern (shooting star, bearish engulfing, etc.)
+└─ ✅ Sentiment negative (if available, adds confidence)
+
+HOLD Signal Conditions:
+├─ ⚠️ Consolidation/narrow range trading (no clear direction)
+├─ ⚠️ Mixed signals (some indicators bullish, some bearish)
+├─ ⚠️ Waiting for confirmation (potential reversal but not confirmed)
+└─ ⚠️ Low volume with indecisive candles
+
+【3. CONFIDENCE LEVEL ASSIGNMENT】
+
+HIGH Confidence:
+├─ 3+ technical indicators align
+├─ Clear trend with strong volume
+├─ Price action confirms indicator signals
+└─ Sentiment supports (if available)
+
+MEDIUM Confidence:
+├─ 2 technical indicators align
+├─ Moderate trend strength
+├─ Some conflicting signals present
+└─ Sentiment neutral or unavailable
+
+LOW Confidence:
+├─ Only 1 strong indicator
+├─ Mixed signals predominant
+├─ Low volume/consolidation phase
+└─ Sentiment contradicts technical
+
+【4. ANTI-OVERTRADING PRINCIPLES】
+
+1. Trend Continuity:
+   └─ Don't reverse signal based on single candle fluctuation
+   └─ Require 2-3 consecutive bars confirming reversal
+
+2. Position Stability:
+   └─ Maintain direction unless clear reversal pattern
+   └─ Avoid frequent position changes (minimize transaction costs)
+
+3. Signal Confirmation:
+   └─ Wait for confirmation when in doubt
+   └─ Better to HOLD than make wrong move
+
+4. Volume Validation:
+   └─ High-confidence signals require volume confirmation
+   └─ Low volume moves are less reliable
+
+【5. 15-MINUTE TIMEFRAME SPECIFIC CONSIDERATIONS】
+
+├─ Balanced timeframe for both trend following and swing trading
+├─ Signals are more reliable with reduced noise compared to 1-minute
+├─ Volume analysis is important for confirmation
+├─ RSI > 70 or < 30 indicates strong momentum (act with caution)
+└─ MACD crossovers are significant and should be respected
+
+【6. RISK MANAGEMENT INTEGRATION】
+
+Stop-Loss Placement:
+├─ BUY signal: Place 1-2% below entry or below recent support
+├─ SELL signal: Place 1-2% above entry or above recent resistance
+└─ Consider volatility: Tighter stops in volatile conditions
+
+Take-Profit Targets:
+├─ High confidence: 2-3% target
+├─ Medium confidence: 1.5-2% target
+└─ Low confidence: 1% target or consider HOLD
+
+Position Management:
+├─ Existing LONG position:
+│  ├─ Trend continues → Maintain BUY signal
+│  ├─ Trend reverses → Generate SELL signal to close/reverse
+│  └─ Unrealized loss > 2% → Consider cutting losses
+└─ Existing SHORT position:
+   ├─ Trend continues → Maintain SELL signal
+   ├─ Trend reverses → Generate BUY signal to close/reverse
+   └─ Unrealized loss > 2% → Consider cutting losses
+
+═══════════════════════════════════════════════════════════════
+  OUTPUT REQUIREMENTS
+═══════════════════════════════════════════════════════════════
+
+Provide a comprehensive analysis and trading signal.
+
+CRITICAL: Your response MUST be valid JSON only, no additional text.
+
+**IMPORTANT JSON FORMATTING RULES:**
+1. DO NOT use double quotes (") inside string values
+2. Use single quotes (') or parentheses for emphasis instead
+3. The "reason" field must be a single continuous string without internal quotes
+
+JSON Format:
+{
+    "signal": "BUY|SELL|HOLD",
+    "confidence": "HIGH|MEDIUM|LOW",
+    "reason": "Detailed analysis including: (1) Current trend assessment, (2) Key technical indicators analysis, (3) Support/resistance levels, (4) Volume analysis, (5) Risk factors, (6) Why this signal at this moment. Use ONLY single quotes or parentheses for emphasis, NEVER use double quotes inside this field.",
+    "stop_loss": <numerical_price_value>,
+    "take_profit": <numerical_price_value>,
+    "trend_strength": "STRONG|MODERATE|WEAK",
+    "risk_assessment": "LOW|MEDIUM|HIGH"
+}
+
+Example stop_loss/take_profit values:
+- BUY: stop_loss should be current_price * 0.98-0.99, take_profit should be current_price * 1.02-1.03
+- SELL: stop_loss should be current_price * 1.01-1.02, take_profit should be current_price * 0.97-0.98
+- HOLD: Set stop_loss and take_profit to current_price
+
+Example CORRECT reason format:
+"reason": "(1) Current trend shows strong downward momentum with price below all SMAs. (2) RSI at 35 indicates oversold conditions. (3) Key support at $110,000 being tested. Use single quotes for 'emphasis' if needed."
+
+Example WRONG reason format (DO NOT USE):
+"reason": "(1) Current trend "assessment" shows..." <- WRONG! Contains internal double quotes
+
+Remember: Be decisive but not reckless. Quality over quantity.
+"""
+
+FULL_KLINE_TITLE = "【Recent {count} 15-minute K-lines (Most Recent)】\n"
+FULL_KLINE_LINE = (
+    "{candle} | O:{o:.2f} H:{h:.2f} L:{l:.2f} C:{c:.2f} | "
+    "Change:{change:+.2f}% | Vol:{v:.2f} | Body:{body:.1f}%\n"
+)
+FULL_KLINE_EMPTY = "【Recent K-line Data】\nNo K-line data available"
+
+
+def render_full_kline_line(o: float, h: float, l: float, c: float, v: float) -> str:
+    """Render one K-line for the full prompt (without its ``K<i>: `` prefix)."""
+    total_range = h - l
+    return FULL_KLINE_LINE.format(
+        candle="🟢 Bullish" if c > o else "🔴 Bearish",
+        o=o, h=h, l=l, c=c, v=v,
+        change=(c - o) / o * 100,
+        body=abs(c - o) / total_range * 100 if total_range > 0 else 0,
+    )
+
+
+def render_full_klines(lines) -> str:
+    """Join pre-rendered full-prompt K-line lines under the section title."""
+    if not lines:
+        return FULL_KLINE_EMPTY
+    return FULL_KLINE_TITLE.format(count=len(lines)) + "".join(
+        f"K{i}: {line}" for i, line in enumerate(lines, 1)
+    )
+
+
+class KlinePromptRenderer:
+    """
+    Rolling buffer of pre-rendered K-line prompt lines for one instrument.
+
+    ``update`` renders only the newest bar; ``render`` joins the last
+    ``count`` lines and caches the result until the next bar closes.
+    """
+
+    def __init__(self, mode: str = "full", max_bars: int = 10):
+        """
+        Initialize K-line renderer.
+
+        Parameters
+        ----------
+        mode : str
+            Prompt mode of the analyzer ("full" or "compact")
+        max_bars : int
+            Number of K-lines kept (and sent)
+        """
+        if mode not in ("full", "compact"):
+            raise ValueError(f"Unknown prompt mode: {mode}")
+
+        self.mode = mode
+        self.max_bars = max_bars
+        self._render_line = render_full_kline_line if mode == "full" else encode_kline_row
+        self._lines: Deque[str] = deque(maxlen=max_bars)
+        self._rendered: Optional[str] = None
+        self.stats: Dict[str, Any] = {'lines_rendered': 0, 'renders': 0, 'render_cache_hits': 0, 'last_render_ms': 0.0}
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def update(self, o: float, h: float, l: float, c: float, v: float):
+        """Render and append the line of a newly closed bar."""
+        self._lines.append(self._render_line(o, h, l, c, v))
+        self._rendered = None
+        self.stats['lines_rendered'] += 1
+
+    def update_bar(self, bar):
+        """Append a NautilusTrader Bar."""
+        self.update(float(bar.open), float(bar.high), float(bar.low), float(bar.close), float(bar.volume))
+
+    def warm_up(self, ohlcv_arrays: Dict[str, Any]):
+        """Render the last ``max_bars`` bars of columnar OHLCV arrays (see TechnicalIndicatorManager.warm_up)."""
+        start = max(0, len(ohlcv_arrays['close']) - self.max_bars)
+        for o, h, l, c, v in zip(
+            ohlcv_arrays['open'][start:].tolist(),
+            ohlcv_arrays['high'][start:].tolist(),
+            ohlcv_arrays['low'][start:].tolist(),
+            ohlcv_arrays['close'][start:].tolist(),
+            ohlcv_arrays['volume'][start:].tolist(),
+        ):
+            self.update(o, h, l, c, v)
+
+    def render(self) -> str:
+        """K-line section of the prompt in this renderer's mode."""
+        if self._rendered is not None:
+            self.stats['render_cache_hits'] += 1
+            return self._rendered
+
+        start = time.perf_counter()
+        if self.mode == "full":
+            text = render_full_klines(self._lines)
+        elif self._lines:
+            text = KLINE_CSV_HEADER + "\n" + "\n".join(self._lines)
+        else:
+            text = "klines: none"
+        self._rendered = text
+        self.stats['renders'] += 1
+        self.stats['last_render_ms'] = (time.perf_counter() - start) * 1000
+        return text
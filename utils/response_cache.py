@@ -0,0 +1,237 @@
+"""
+Signal Response Cache for DeepSeek Analyzer
+
+Reuses a recent AI signal when the market state, quantized into coarse
+features, is unchanged: same price band, RSI bucket, MACD signs, trend
+labels, position side and sentiment bucket.
+"""
+
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def quantize_market_state(
+    price_data: Dict[str, Any],
+    technical_data: Dict[str, Any],
+    sentiment_data: Optional[Dict[str, Any]] = None,
+    current_position: Optional[Dict[str, Any]] = None,
+    price_band_pct: float = 0.002,
+    rsi_bucket: float = 5.0,
+    sentiment_bucket: float = 0.1,
+) -> str:
+    """
+    Quantize analysis inputs into coarse features (price band, RSI bucket,
+    MACD signs, trend labels, position side, sentiment bucket).
+
+    Two market states with the same key are treated as the same decision
+    input (signal cache, speculative analysis).
+    """
+    price = float(price_data.get('price') or 0.0)
+    price_band = int(math.floor(math.log(price) / math.log1p(price_band_pct))) if price > 0 else 0
+
+    rsi = float(technical_data.get('rsi_pct') or 0.0)
+    rsi_index = int(rsi // rsi_bucket)
+
+    macd_sign = '+' if (technical_data.get('macd') or 0.0) >= 0 else '-'
+    hist_sign = '+' if (technical_data.get('macd_histogram') or 0.0) >= 0 else '-'
+
+    trends = '/'.join(str(technical_data.get(label, '')) for label in (
+        'overall_trend', 'short_term_trend', 'medium_term_trend', 'macd_trend',
+    ))
+
+    position_side = current_position.get('side', 'flat') if current_position else 'flat'
+
+    if sentiment_data and sentiment_data.get('net_sentiment') is not None:
+        sentiment = f"s{int(math.floor(sentiment_data['net_sentiment'] / sentiment_bucket))}"
+    else:
+        sentiment = "s-"
+
+    return '|'.join((
+        str(price_data.get('symbol', 'BTCUSDT')),
+        f"p{price_band}",
+        f"r{rsi_index}",
+        f"m{macd_sign}/{hist_sign}",
+        trends,
+        position_side,
+        sentiment,
+    ))
+
+
+class SignalCache:
+    """
+    TTL + LRU cache of AI signals keyed on quantized market features,
+    with optional SQLite persistence across restarts.
+    """
+
+    def __init__(
+        self,
+        ttl_sec: float = 1800.0,
+        max_entries: int = 256,
+        db_path: Optional[str] = None,
+        price_band_pct: float = 0.002,
+        rsi_bucket: float = 5.0,
+        sentiment_bucket: float = 0.1,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Initialize signal cache.
+
+        Parameters
+        ----------
+        ttl_sec : float
+            Entry lifetime in seconds
+        max_entries : int
+            In-memory LRU bound
+        db_path : str, optional
+            SQLite file for persistence (None = memory only)
+        price_band_pct : float
+            Width of a price band relative to price (0.002 = 0.2%)
+        rsi_bucket : float
+            RSI bucket width in RSI points (0-100 scale)
+        sentiment_bucket : float
+            Net sentiment bucket width
+        logger : logging.Logger, optional
+            Logger instance
+        """
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.price_band_pct = price_band_pct
+        self.rsi_bucket = rsi_bucket
+        self.sentiment_bucket = sentiment_bucket
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'disk_hits': 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS signal_cache "
+                "(key TEXT PRIMARY KEY, stored_at REAL NOT NULL, signal TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "DELETE FROM signal_cache WHERE stored_at < ?", (time.time() - ttl_sec,)
+            )
+            self._db.commit()
+
+    def make_key(
+        self,
+        price_data: Dict[str, Any],
+        technical_data: Dict[str, Any],
+        sentiment_data: Optional[Dict[str, Any]] = None,
+        current_position: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Quantize the analysis inputs into a cache key.
+
+        Returns
+        -------
+        str
+            Key such as ``BTCUSDT|p5706|r11|m+/+|强势上涨/上涨/上涨/bullish|long|s2``
+        """
+        return quantize_market_state(
+            price_data, technical_data, sentiment_data, current_position,
+            price_band_pct=self.price_band_pct,
+            rsi_bucket=self.rsi_bucket,
+            sentiment_bucket=self.sentiment_bucket,
+        )
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a signal.
+
+        Returns
+        -------
+        Dict or None
+            Copy of the cached signal with ``cache_age_sec`` set, or None
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                entry = self._load(key)
+                if entry is not None:
+                    self.stats['disk_hits'] += 1
+                    self._store_memory(key, entry)
+
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            stored_at, signal = entry
+            if now - stored_at > self.ttl_sec:
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                self._entries.pop(key, None)
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return dict(signal, cache_age_sec=now - stored_at)
+
+    def put(self, key: str, signal: Dict[str, Any], now: Optional[float] = None):
+        """Store a signal."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._store_memory(key, (now, dict(signal)))
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO signal_cache (key, stored_at, signal) VALUES (?, ?, ?)",
+                        (key, now, json.dumps(signal, default=str)),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self.logger.warning(f"⚠️ Failed to persist cached signal: {e}")
+
+    def _store_memory(self, key: str, entry: Tuple[float, Dict[str, Any]]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _load(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        try:
+            row = self._db.execute(
+                "SELECT stored_at, signal FROM signal_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"⚠️ Failed to read cached signal: {e}")
+            return None
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus hit rate and current size."""
+        with self._lock:
+            return dict(self.stats, hit_rate=self.hit_rate(), size=len(self._entries))
+
+    def clear(self):
+        """Drop all entries (memory and disk)."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM signal_cache")
+                self._db.commit()
+
+    def close(self):
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,130 @@
+"""
+Speculative Pre-Analysis Before Bar Close
+
+The analysis for a bar is started a few seconds before the bar closes, on
+the forming bar built from trade ticks. When the real bar arrives the
+speculative result is used if the quantized market state (see
+``quantize_market_state``) is unchanged; otherwise the analysis is re-run.
+"""
+
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+
+class FormingBar:
+    """OHLCV of the bar currently forming, updated per trade."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start a new bar (called when the previous bar closes)."""
+        self.open: Optional[float] = None
+        self.high = 0.0
+        self.low = 0.0
+        self.close = 0.0
+        self.volume = 0.0
+        self.trades = 0
+
+    def update(self, price: float, size: float):
+        """Add one trade."""
+        if self.open is None:
+            self.open = self.high = self.low = price
+        elif price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += size
+        self.trades += 1
+
+    @property
+    def is_empty(self) -> bool:
+        return self.open is None
+
+
+class Speculation:
+    """One speculative analysis waiting for its bar to close."""
+
+    __slots__ = ("bar_close_ns", "state_key", "future", "started_ns", "lead_sec")
+
+    def __init__(self, bar_close_ns: int, state_key: str, future: Future, started_ns: int, lead_sec: float):
+        self.bar_close_ns = bar_close_ns
+        self.state_key = state_key
+        self.future = future
+        self.started_ns = started_ns
+        self.lead_sec = lead_sec
+
+
+class SpeculationTracker:
+    """
+    Speculative analyses per instrument key.
+
+    ``resolve()`` is called with the real bar's state key when the bar
+    closes; it returns the speculation to use, or None when the caller
+    must run a regular analysis.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, Speculation] = {}
+        self.stats = {'started': 0, 'confirmed': 0, 'rerun': 0, 'missed': 0}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pending
+
+    def start(self, key: str, speculation: Speculation):
+        """Register a speculation (replaces an unresolved older one)."""
+        old = self._pending.pop(key, None)
+        if old is not None:
+            old.future.cancel()
+            self.stats['missed'] += 1
+        self._pending[key] = speculation
+        self.stats['started'] += 1
+
+    def resolve(self, key: str, bar_close_ns: int, state_key: str) -> Optional[Speculation]:
+        """
+        Match the closed bar against the pending speculation.
+
+        Parameters
+        ----------
+        key : str
+            Instrument key
+        bar_close_ns : int
+            Close time of the bar that just arrived
+        state_key : str
+            Quantized state of the real bar
+
+        Returns
+        -------
+        Speculation or None
+            The speculation if it was for this bar, did not fail and saw the
+            same quantized state; None means re-run
+        """
+        speculation = self._pending.pop(key, None)
+        if speculation is None:
+            return None
+
+        if (
+            speculation.bar_close_ns != bar_close_ns
+            or speculation.state_key != state_key
+            or (speculation.future.done() and not self._succeeded(speculation.future))
+        ):
+            speculation.future.cancel()
+            self.stats['rerun'] += 1
+            return None
+
+        self.stats['confirmed'] += 1
+        return speculation
+
+    @staticmethod
+    def _succeeded(future: Future) -> bool:
+        if future.cancelled():
+            return False
+        result: Any = future.result()
+        return getattr(result, 'ok', True)
+
+    def clear(self):
+        """Cancel all pending speculations."""
+        for speculation in self._pending.values():
+            speculation.future.cancel()
+        self._pending.clear()
@@ -20,6 +20,14 @@ except ImportError:
     TelegramError = Exception
 
 
+def escape_markdown(text: Any) -> str:
+    """Escape Telegram (legacy) Markdown control characters in untrusted text."""
+    text = str(text)
+    for char in ('_', '*', '`', '['):
+        text = text.replace(char, '\\' + char)
+    return text
+
+
 class TelegramBot:
     """
     Telegram Bot for sending trading notifications.
@@ -397,6 +405,8 @@ class TelegramBot:
             - last_signal: str
             - last_signal_time: str
             - uptime: str
+            - ai_breaker: dict, optional (AI circuit breaker status)
+            - ai_metrics: dict, optional (DeepSeekAnalyzer.get_metrics())
         """
         is_running = status_info.get('is_running', False)
         is_paused = status_info.get('is_paused', False)
@@ -425,6 +435,36 @@ class TelegramBot:
         msg += f"*Last Signal*: {status_info.get('last_signal', 'N/A')}\n"
         msg += f"*Signal Time*: {status_info.get('last_signal_time', 'N/A')}\n"
         msg += f"*Uptime*: {status_info.get('uptime', 'N/A')}\n"
+
+        breaker = status_info.get('ai_breaker')
+        if breaker:
+            breaker_emoji = {"CLOSED": "🟢", "HALF_OPEN": "🟡"}.get(breaker['state'], "🔴")
+            msg += f"\n*AI Provider*: {breaker_emoji} {escape_markdown(breaker['state'])}"
+            if breaker.get('retry_in_sec') is not None:
+                msg += f" (probe in {breaker['retry_in_sec']:.0f}s)"
+            msg += f"\n*Circuit Trips*: {breaker.get('trips', 0)} | *Fast-fails*: {breaker.get('fast_fails', 0)}\n"
+            if breaker['state'] != "CLOSED" and breaker.get('last_trip_reason'):
+                # Raw provider error text (e.g. rate_limit_exceeded) must not break the Markdown
+                msg += f"*Reason*: {escape_markdown(breaker['last_trip_reason'])}\n"
+
+        metrics = status_info.get('ai_metrics')
+        if metrics and metrics.get('decisions'):
+            latency = metrics['latency_sec']
+            if latency['p50'] is not None:
+                msg += (
+                    f"\n*AI Latency*: p50 {latency['p50']:.1f}s | "
+                    f"p95 {latency['p95']:.1f}s | p99 {latency['p99']:.1f}s\n"
+                )
+            else:
+                msg += "\n"
+            msg += (
+                f"*AI Tokens*: {metrics['prompt_tokens']['total']:,} in / "
+                f"{metrics['completion_tokens']['total']:,} out\n"
+            )
+            msg += (
+                f"*AI Calls*: {metrics['decisions']} | *Retries*: {metrics['retries']} | "
+                f"*Repaired*: {metrics['repaired']} | *Fallback*: {metrics['fallback_rate']:.0%}\n"
+            )
         
         return msg
     
@@ -84,14 +84,22 @@ class TelegramCommandHandler:
         return is_authorized
     
     async def _send_response(self, update: Update, message: str):
-        """Send response message."""
+        """Send response message (as plain text if the Markdown does not parse)."""
         try:
             await update.message.reply_text(
                 message,
                 parse_mode='Markdown'
             )
         except Exception as e:
-            self.logger.error(f"Failed to send response: {e}")
+            if "can't parse" not in str(e).lower() and "parse entities" not in str(e).lower():
+                self.logger.error(f"Failed to send response: {e}")
+                return
+
+            self.logger.warning(f"⚠️ Markdown parse error, retrying without formatting: {e}")
+            try:
+                await update.message.reply_text(message, parse_mode=None)
+            except Exception as retry_e:
+                self.logger.error(f"Failed to send response even without formatting: {retry_e}")
     
     async def cmd_status(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command."""
@@ -0,0 +1,107 @@
+"""
+Trailing Stop Engine
+
+Tracks the best price of each open position on every price update (quote
+tick or 1-minute bar) and decides when the stop loss should be moved. The
+decision is O(1) per update and independent of the AI analysis loop; order
+handling (cancel / resubmit) stays in the strategy.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+
+class TrailingStopEngine:
+    """
+    Trailing stop decisions on the strategy's ``trailing_stop_state`` entries.
+
+    A state entry holds entry_price, side (LONG/SHORT), highest_price or
+    lowest_price, current_sl_price and activated; ``update()`` mutates it in
+    place and returns the stop price to submit, if any.
+    """
+
+    def __init__(
+        self,
+        activation_pct: float = 0.01,
+        distance_pct: float = 0.005,
+        update_threshold_pct: float = 0.002,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Initialize engine.
+
+        Parameters
+        ----------
+        activation_pct : float
+            Profit (from entry) at which trailing starts
+        distance_pct : float
+            Stop distance from the best price
+        update_threshold_pct : float
+            Minimum stop move before the order is modified (rate limit)
+        logger : logging.Logger, optional
+            Logger instance
+        """
+        self.activation_pct = activation_pct
+        self.distance_pct = distance_pct
+        self.update_threshold_pct = update_threshold_pct
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = {'updates': 0, 'moves': 0, 'throttled': 0}
+
+    def update(self, state: Dict[str, Any], price: float, extreme: Optional[float] = None) -> Optional[float]:
+        """
+        Feed one price for a position.
+
+        Parameters
+        ----------
+        state : Dict
+            Trailing stop state of the position (updated in place)
+        price : float
+            Current price (quote mid or bar close)
+        extreme : float, optional
+            Best price reached since the last update (bar high for LONG,
+            bar low for SHORT); defaults to ``price``
+
+        Returns
+        -------
+        float or None
+            New stop loss price to submit, None to leave the stop unchanged
+        """
+        self.stats['updates'] += 1
+        long = state["side"] == "LONG"
+        best_key = "highest_price" if long else "lowest_price"
+        extreme = price if extreme is None else extreme
+
+        best = state.get(best_key)
+        if best is None or (extreme > best if long else extreme < best):
+            state[best_key] = best = extreme
+
+        if not state["activated"]:
+            entry_price = state["entry_price"]
+            profit_pct = (best - entry_price) / entry_price if long else (entry_price - best) / entry_price
+            if profit_pct < self.activation_pct:
+                return None
+            state["activated"] = True
+            self.logger.info(
+                f"🎯 Trailing stop ACTIVATED for {state['side']} @ ${price:,.2f} "
+                f"(Profit: {profit_pct*100:.2f}%)"
+            )
+
+        new_sl_price = best * (1 - self.distance_pct) if long else best * (1 + self.distance_pct)
+
+        # A stop through the current price would fill immediately (e.g. bar high far above the close)
+        if (new_sl_price >= price) if long else (new_sl_price <= price):
+            return None
+
+        current_sl_price = state.get("current_sl_price")
+        if current_sl_price is not None:
+            move_pct = (
+                (new_sl_price - current_sl_price) if long else (current_sl_price - new_sl_price)
+            ) / current_sl_price
+            if move_pct <= 0:
+                return None
+            if move_pct < self.update_threshold_pct:
+                self.stats['throttled'] += 1
+                return None
+
+        self.stats['moves'] += 1
+        return new_sl_price